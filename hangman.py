@@ -1,4 +1,11 @@
+import math
 import random
+import re
+import sys
+from array import array
+from collections import Counter
+from itertools import chain
+from operator import itemgetter
 
 # Hangman stages
 HANGMAN = [
@@ -74,9 +81,15 @@ WORDS = [
     'variable', 'software', 'hardware', 'developer', 'github'
 ]
 
-def get_word():
+def load_words(path):
+    """Read a dictionary file with one word per line; keeps plain A-Z words."""
+    with open(path, encoding='utf-8') as file:
+        words = {line.strip().upper() for line in file}
+    return sorted(word for word in words if word.isascii() and word.isalpha())
+
+def get_word(words=WORDS):
     """Pick a random word from the list."""
-    return random.choice(WORDS).upper()
+    return random.choice(words).upper()
 
 def get_hint(word, guessed):
     """Get a hint - reveal a random unguessed letter."""
@@ -85,6 +98,230 @@ def get_hint(word, guessed):
         return random.choice(unguessed)
     return None
 
+def letter_positions(word):
+    """Map each letter of a word to a bitmask of the positions it fills."""
+    positions = {}
+    for idx, letter in enumerate(word):
+        positions[letter] = positions.get(letter, 0) | 1 << idx
+    return positions
+
+def _bitset(ids, size):
+    """An int with the bits of the given word ids set."""
+    flags = bytearray((size + 7) // 8)
+    for word_id in ids:
+        flags[word_id >> 3] |= 1 << (word_id & 7)
+    return int.from_bytes(flags, 'little')
+
+def _bit_ids(bits):
+    """The positions of the set bits of an int, ascending."""
+    return [match.start() for match in re.finditer('1', format(bits, 'b')[::-1])]
+
+class WordBucket:
+    """The words of one length with their letter bitsets and pattern index."""
+    
+    # Estimated cost in microseconds of counting one word's key ids, of
+    # looking up one word id of a sparse key, and of a 64-bit word of a
+    # key bitset (see SolverState._update_counts)
+    WORD_COST, ID_COST, BITS_COST = 1.5, 0.05, 0.008
+    
+    def __init__(self, words):
+        self.words = words
+        self.key_of = {}  # (letter, positions bitmask) -> key id
+        self.keys = []  # Index keys by key id
+        self.ids = []  # Ascending word ids by key id
+        self.key_ids = array('I')  # Key ids of every word, one word after another
+        self.offsets = array('I', [0])  # Where each word's key ids start
+        self.memo = {}  # Best letter per game state
+        
+        for word_id, word in enumerate(words):
+            for key in letter_positions(word).items():
+                key_id = self.key_of.get(key)
+                if key_id is None:
+                    key_id = self.key_of[key] = len(self.keys)
+                    self.keys.append(key)
+                    self.ids.append(array('I'))
+                self.ids[key_id].append(word_id)
+                self.key_ids.append(key_id)
+            self.offsets.append(len(self.key_ids))
+        
+        # Keys holding at least one word in 128 also get a bitset, at most
+        # four times the memory of their id array; sparse keys are built
+        # on demand
+        size = len(words)
+        self.everything = (1 << size) - 1
+        self.counts = [len(ids) for ids in self.ids]
+        self.bits = [_bitset(ids, size) if len(ids) * 128 >= size else None for ids in self.ids]
+        self.pickers = [itemgetter(*ids) if bits is None else None for ids, bits in zip(self.ids, self.bits)]
+        self.costs = [len(ids) * self.ID_COST if bits is None else size / 64 * self.BITS_COST + 1
+                      for ids, bits in zip(self.ids, self.bits)]
+        letter_ids = {}
+        for key, ids in zip(self.keys, self.ids):
+            letter_ids.setdefault(key[0], []).append(ids)
+        self.letter_bits = {letter: _bitset(chain.from_iterable(ids), size)
+                            for letter, ids in letter_ids.items()}
+    
+    def key_bits(self, key):
+        """Bitset of the words with the letter in exactly those positions."""
+        key_id = self.key_of.get(key)
+        if key_id is None:
+            return 0
+        bits = self.bits[key_id]
+        return _bitset(self.ids[key_id], len(self.words)) if bits is None else bits
+
+class HangmanSolver:
+    """
+    Index of a word list for filtering candidates and picking hints.
+    
+    Words are grouped by length. Each length gets, on first use, a pattern
+    index from (letter, positions bitmask) to the ascending ids of the
+    words with that letter in exactly those positions, plus bitsets over
+    the word ids per letter and per common pattern. A game keeps its
+    candidates as one such bitset, so a revealed letter or a miss narrows
+    them with a single AND.
+    """
+    
+    def __init__(self, words=WORDS):
+        self.words = list(dict.fromkeys(word.upper() for word in words))
+        self._words = {}
+        for word in self.words:
+            self._words.setdefault(len(word), []).append(word)
+        self._buckets = {}
+    
+    def bucket(self, length):
+        """The WordBucket of one word length, built on first use."""
+        bucket = self._buckets.get(length)
+        if bucket is None:
+            bucket = self._buckets[length] = WordBucket(self._words.get(length, []))
+        return bucket
+    
+    def new_game(self, length):
+        """Start tracking the candidates of a word with this many letters."""
+        return SolverState(self.bucket(length), length)
+
+class SolverState:
+    """
+    The words still possible in one game, updated after every guess.
+    
+    best_letter() needs the number of candidates per (letter, positions)
+    answer. Those counts are kept from the last call and brought up to
+    date from whichever is cheapest: the words removed since, the words
+    kept, or an AND of the candidates with every live key's bitset. A
+    turn therefore costs about the size of the change, not a rescan of
+    every candidate.
+    """
+    
+    MAX_MEMO = 100_000
+    
+    def __init__(self, bucket, length):
+        self.bucket = bucket
+        self.length = length
+        self.guessed = set()
+        self.pattern = ['_'] * length
+        self._bits = bucket.everything  # Bit n set while word n fits
+        self._counts = bucket.counts  # Candidates per key id, as of _counted
+        self._counted = bucket.everything
+        self._live = range(len(bucket.keys))  # Key ids with a non-zero count
+    
+    def __len__(self):
+        return self._bits.bit_count()
+    
+    def candidates(self):
+        """The words that still fit the guesses."""
+        words = self.bucket.words
+        return [words[word_id] for word_id in _bit_ids(self._bits)]
+    
+    def guess(self, letter, word):
+        """Record a guess against the secret word."""
+        letter = letter.upper()
+        self.update(letter, letter_positions(word).get(letter, 0))
+    
+    def update(self, letter, positions):
+        """Record a guess: positions is the bitmask of where it showed up (0 for a miss)."""
+        letter = letter.upper()
+        if letter in self.guessed:
+            return
+        self.guessed.add(letter)
+        
+        if positions:
+            for idx in range(self.length):
+                if positions >> idx & 1:
+                    self.pattern[idx] = letter
+            self._bits &= self.bucket.key_bits((letter, positions))
+        else:
+            self._bits &= ~self.bucket.letter_bits.get(letter, 0)
+    
+    def best_letter(self):
+        """The unguessed letter whose answer tells the most about the word."""
+        # The guessed letters and the revealed pattern fix the candidates
+        key = (''.join(sorted(self.guessed)), ''.join(self.pattern))
+        memo = self.bucket.memo
+        if key not in memo:
+            if len(memo) >= self.MAX_MEMO:
+                memo.clear()
+            memo[key] = self._best_letter()
+        return memo[key]
+    
+    def _update_counts(self):
+        """Bring the per-key candidate counts up to date."""
+        removed_bits = self._counted & ~self._bits  # Candidates only ever shrink
+        if not removed_bits:
+            return
+        bucket = self.bucket
+        removed, kept = removed_bits.bit_count(), len(self)
+        by_words = min(removed, kept) * bucket.WORD_COST
+        by_keys = sum(map(bucket.costs.__getitem__, self._live))
+        
+        if by_keys < by_words:
+            counts = [0] * len(bucket.keys)
+            fits = format(self._bits, f'0{len(bucket.words)}b')[::-1]  # '1' at the index of a candidate
+            for key_id in self._live:
+                bits = bucket.bits[key_id]
+                if bits is None:
+                    counts[key_id] = bucket.pickers[key_id](fits).count('1')
+                else:
+                    counts[key_id] = (self._bits & bits).bit_count()
+        else:
+            if removed <= kept:
+                counts, sign, ids = list(self._counts), -1, _bit_ids(removed_bits)
+            else:
+                counts, sign, ids = [0] * len(bucket.keys), 1, _bit_ids(self._bits)
+            key_ids, offsets = bucket.key_ids, bucket.offsets
+            per_key = Counter(chain.from_iterable(
+                key_ids[offsets[word_id]:offsets[word_id + 1]] for word_id in ids
+            ))
+            for key_id, count in per_key.items():
+                counts[key_id] += sign * count
+        
+        self._counts, self._counted = counts, self._bits
+        self._live = [key_id for key_id in self._live if counts[key_id]]
+    
+    def _best_letter(self):
+        """Pick the letter with the highest entropy over its possible answers."""
+        total = len(self)
+        if not total:
+            return None
+        
+        # Number of candidates per (letter, positions) answer
+        self._update_counts()
+        keys, counts = self.bucket.keys, self._counts
+        answers = {}
+        for key_id in self._live:
+            letter = keys[key_id][0]
+            if letter not in self.guessed:
+                answers.setdefault(letter, []).append(counts[key_id])
+        
+        best, best_score = None, None
+        for letter in sorted(answers):
+            sizes = answers[letter]
+            present = sum(sizes)
+            if present < total:
+                sizes = sizes + [total - present]  # The miss
+            entropy = -sum(size / total * math.log2(size / total) for size in sorted(sizes))
+            score = (entropy, present)  # Ties go to the likelier hit
+            if best_score is None or score > best_score:
+                best, best_score = letter, score
+        return best
+
 def display_game(wrong, word, guessed, hints_used):
     """Show current game state."""
     print("\n" + HANGMAN[wrong])
@@ -102,9 +339,11 @@ def display_game(wrong, word, guessed, hints_used):
     print(f"\nWord: {display}")
     print(f"Guessed letters: {', '.join(sorted(guessed))}")
 
-def play_game():
+def play_game(solver=None):
     """Main game function."""
-    word = get_word()
+    solver = solver or HangmanSolver()
+    word = get_word(solver.words)
+    state = solver.new_game(len(word))
     guessed = set()
     wrong_guesses = 0
     max_wrong = len(HANGMAN) - 1
@@ -127,9 +366,23 @@ def play_game():
             return True
         
         # Get player input
-        print("\nType a letter to guess, or 'hint' for a hint")
+        print("\nType a letter to guess, 'hint' for a hint or 'best' for the best next guess")
         guess = input("Your choice: ").upper()
         
+        # Suggest the most informative letter (uses up a hint)
+        if guess == 'BEST':
+            if hints_used >= max_hints:
+                print("❌ No hints left!")
+                continue
+            
+            best_letter = state.best_letter()
+            if best_letter:
+                print(f"💡 Best guess: '{best_letter}' (words still possible: {len(state)})")
+                hints_used += 1
+            else:
+                print("⚠️ No more letters to suggest!")
+            continue
+        
         # Check for hint request
         if guess == 'HINT':
             if hints_used >= max_hints:
@@ -140,6 +393,7 @@ def play_game():
             if hint_letter:
                 print(f"💡 Hint: The word contains the letter '{hint_letter}'")
                 guessed.add(hint_letter)
+                state.guess(hint_letter, word)
                 hints_used += 1
             else:
                 print("⚠️ No more letters to reveal!")
@@ -156,6 +410,7 @@ def play_game():
         
         # Add to guessed letters
         guessed.add(guess)
+        state.guess(guess, word)
         
         # Check if correct
         if guess in word:
@@ -175,8 +430,16 @@ def main():
     print("     WELCOME TO HANGMAN!")
     print("=" * 40)
     
+    # Optional dictionary file: python hangman.py /usr/share/dict/words
+    words = load_words(sys.argv[1]) if len(sys.argv) > 1 else WORDS
+    if not words:
+        print("❌ The dictionary has no words!")
+        return
+    solver = HangmanSolver(words)
+    print(f"📖 {len(solver.words):,} words")
+    
     while True:
-        play_game()
+        play_game(solver)
         
         # Play again?
         play_again = input("\nPlay again? (y/n): ").lower()
@@ -0,0 +1,288 @@
+# ============================================================
+# Raw-response Archive for the Web Scraper
+# Features: Append-only Compressed Frames | Offset Index | Replay
+# ============================================================
+
+import json
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+ArchivedResponse = namedtuple('ArchivedResponse', 'url status headers body fetched_at')
+
+
+class ArchiveMiss(LookupError):
+    """
+    The requested URL is not in the archive.
+    """
+
+
+class ResponseArchive:
+    """
+    Append-only archive of raw HTTP responses with a random-access index.
+    
+    Every response is stored as one independently compressed frame:
+        
+        b'SRA1' | codec (1 byte) | payload length (4 bytes, little endian)
+        payload = compressed(JSON metadata line + b'\\n' + body)
+    
+    so any record can be read with one seek, a damaged tail only loses the
+    last frame and the archive can be re-indexed by scanning the headers.
+    The offset index lives next to the archive in a SQLite file
+    (<path>.idx) and maps each URL to the frames holding it; get() returns
+    the most recent one.
+    
+    Codecs: 'gzip' (each payload a gzip member), 'zlib' (a raw zlib
+    stream, as written by older archives), 'zstd' (needs the optional
+    zstandard package) and None for no compression.
+    """
+    
+    MAGIC = b'SRA1'
+    HEADER = struct.Struct('<4sBI')
+    CODECS = {None: 0, 'zlib': 1, 'zstd': 2, 'gzip': 3}
+    
+    def __init__(self, path='responses.archive', compression='gzip', level=6, batch_size=100):
+        """
+        Open (or create) an archive for appending and reading.
+        
+        Args:
+            path (str): Archive file; the index is written to <path>.idx
+            compression (str): 'gzip', 'zlib', 'zstd' or None for new frames
+            level (int): Compression level
+            batch_size (int): Frames indexed per SQLite commit
+        """
+        if compression not in self.CODECS:
+            raise ValueError(f"compression must be one of {list(self.CODECS)}, got {compression!r}")
+        
+        self.path = path
+        self.compression = compression
+        self.level = level
+        self.batch_size = batch_size
+        self._codec = self.CODECS[compression]
+        self._zstd = None
+        if compression == 'zstd':
+            self._zstd = self._zstandard()
+        
+        self._lock = threading.Lock()
+        self._pending = []
+        self._file = open(path, 'a+b')
+        self._db = sqlite3.connect(path + '.idx', check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS frames ("
+            " offset INTEGER PRIMARY KEY, url TEXT, length INTEGER,"
+            " status INTEGER, fetched_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS frames_url ON frames (url)")
+        self._db.commit()
+        
+        # Frames written after the last index commit (e.g. a crash) are
+        # picked up again from the archive itself, and a torn last frame is
+        # cut off so new frames follow the last good one
+        indexed = self._db.execute("SELECT MAX(offset + length) FROM frames").fetchone()[0]
+        end = self._reindex(from_offset=indexed + self.HEADER.size if indexed is not None else 0)
+        if os.path.getsize(path) > end:
+            self._file.truncate(end)
+    
+    @staticmethod
+    def _zstandard():
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstd archives need zstandard: pip install zstandard") from None
+        return zstandard
+    
+    # Frames ------------------------------------------------------------
+    
+    def _compress(self, data):
+        if self._codec == 1:
+            return zlib.compress(data, self.level)
+        if self._codec == 2:
+            return self._zstd.ZstdCompressor(level=self.level).compress(data)
+        if self._codec == 3:
+            compressor = zlib.compressobj(self.level, wbits=31)  # 31: gzip header and trailer
+            return compressor.compress(data) + compressor.flush()
+        return data
+    
+    def _decompress(self, codec, payload):
+        if codec == 1:
+            return zlib.decompress(payload)
+        if codec == 2:
+            self._zstd = self._zstd or self._zstandard()
+            return self._zstd.ZstdDecompressor().decompress(payload)
+        if codec == 3:
+            return zlib.decompress(payload, wbits=31)
+        return payload
+    
+    def append(self, url, status, headers, body):
+        """
+        Store one response.
+        
+        Args:
+            url (str): Request URL
+            status (int): HTTP status code
+            headers (dict): Response headers
+            body (bytes): Raw response body
+        
+        Returns:
+            int: Offset of the new frame
+        """
+        fetched_at = time.time()
+        meta = json.dumps({'url': url, 'status': status, 'headers': dict(headers),
+                           'fetched_at': fetched_at}, ensure_ascii=False)
+        payload = self._compress(meta.encode('utf-8') + b'\n' + body)
+        frame = self.HEADER.pack(self.MAGIC, self._codec, len(payload)) + payload
+        
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell()
+            self._file.write(frame)
+            self._pending.append((offset, url, len(payload), status, fetched_at))
+            if len(self._pending) >= self.batch_size:
+                self._commit()
+        return offset
+    
+    def _commit(self):
+        """
+        Make pending frames durable and index them (caller holds the lock).
+        """
+        if not self._pending:
+            return
+        self._file.flush()
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO frames VALUES (?, ?, ?, ?, ?)", self._pending)
+        self._pending = []
+    
+    def flush(self):
+        with self._lock:
+            self._commit()
+    
+    def read(self, offset):
+        """
+        Read the frame at a given offset.
+        
+        Returns:
+            ArchivedResponse
+        """
+        with self._lock:
+            self._commit()
+            self._file.seek(offset)
+            header = self._file.read(self.HEADER.size)
+            magic, codec, length = self.HEADER.unpack(header)
+            if magic != self.MAGIC:
+                raise ValueError(f"No archive frame at offset {offset}")
+            payload = self._file.read(length)
+        return self._decode(codec, payload)
+    
+    def _decode(self, codec, payload):
+        meta, _, body = self._decompress(codec, payload).partition(b'\n')
+        meta = json.loads(meta)
+        return ArchivedResponse(meta['url'], meta['status'], meta['headers'], body, meta['fetched_at'])
+    
+    # Index -------------------------------------------------------------
+    
+    def _frames(self, from_offset=0):
+        """
+        Scan frame headers; yields (offset, codec, payload) and stops at a
+        truncated or damaged tail.
+        """
+        with open(self.path, 'rb') as file:
+            file.seek(from_offset)
+            offset = from_offset
+            while True:
+                header = file.read(self.HEADER.size)
+                if len(header) < self.HEADER.size:
+                    return
+                magic, codec, length = self.HEADER.unpack(header)
+                payload = file.read(length)
+                if magic != self.MAGIC or len(payload) < length:
+                    return
+                yield offset, codec, payload
+                offset += self.HEADER.size + length
+    
+    def _reindex(self, from_offset=0):
+        """
+        Index the frames from an offset on; returns the end of the last one.
+        """
+        rows = []
+        end = from_offset
+        for offset, codec, payload in self._frames(from_offset):
+            response = self._decode(codec, payload)
+            rows.append((offset, response.url, len(payload), response.status, response.fetched_at))
+            end = offset + self.HEADER.size + len(payload)
+        if rows:
+            with self._db:
+                self._db.executemany("INSERT OR REPLACE INTO frames VALUES (?, ?, ?, ?, ?)", rows)
+        return end
+    
+    def rebuild_index(self):
+        """
+        Recreate the offset index from the archive file alone.
+        """
+        with self._lock:
+            self._commit()
+            with self._db:
+                self._db.execute("DELETE FROM frames")
+            self._reindex()
+    
+    def get(self, url):
+        """
+        Random access: the most recent response archived for a URL.
+        
+        Raises:
+            ArchiveMiss: If the URL was never archived
+        """
+        with self._lock:
+            self._commit()
+            row = self._db.execute(
+                "SELECT MAX(offset) FROM frames WHERE url = ?", (url,)
+            ).fetchone()
+        if row[0] is None:
+            raise ArchiveMiss(f"{url} is not in the archive")
+        return self.read(row[0])
+    
+    def __contains__(self, url):
+        with self._lock:
+            self._commit()
+            return self._db.execute("SELECT 1 FROM frames WHERE url = ? LIMIT 1", (url,)).fetchone() is not None
+    
+    def __len__(self):
+        with self._lock:
+            self._commit()
+            return self._db.execute("SELECT COUNT(*) FROM frames").fetchone()[0]
+    
+    def __iter__(self):
+        """
+        Yield every archived response in the order it was stored.
+        """
+        self.flush()
+        for _, codec, payload in self._frames():
+            yield self._decode(codec, payload)
+    
+    def stats(self):
+        """
+        Count frames and compare stored with raw body size.
+        """
+        self.flush()
+        frames = raw = 0
+        for response in self:
+            frames += 1
+            raw += len(response.body)
+        stored = os.path.getsize(self.path)
+        return {'frames': frames, 'body_bytes': raw, 'archive_bytes': stored,
+                'ratio': raw / stored if stored else 0.0}
+    
+    def close(self):
+        with self._lock:
+            self._commit()
+        self._file.close()
+        self._db.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,1319 @@
+# ============================================================
+# Benchmarks for the Web Scraper
+# Runs against a local fixture HTTP server - no network needed
+# ============================================================
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import http.server
+import io
+import json
+import multiprocessing
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import requests
+from bs4 import BeautifulSoup
+
+from scraper_archive import ResponseArchive
+from scraper_dedup import BloomFilter, FingerprintSet, canonicalize_url
+from scraper_delta import ChangeTracker
+from scraper_exporters import FanOutWriter, create_writers
+from scraper_frontier import CrawlFrontier
+from scraper_index import IndexedRecordStore, RecordDatabase
+from scraper_ratelimit import AdaptiveRateLimiter
+from scraper_records import RecordStore
+from scraper_resilience import CircuitBreaker, RetryPolicy
+from web_scraper import AdvancedScraper, WebScraper, default_parser
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+# ============================================================
+# LOCAL FIXTURE SERVER
+# ============================================================
+
+def quotes_page_html(page, pages=10, quotes_per_page=10):
+    """
+    Build a quotes.toscrape.com-style page.
+    
+    Args:
+        page (int): Page number to render
+        pages (int): Total number of pages with quotes
+        quotes_per_page (int): Number of quotes on each page
+    
+    Returns:
+        str: HTML document
+    """
+    if page > pages:
+        return "<html><body><div class='col-md-8'>No quotes found!</div></body></html>"
+    
+    quotes = []
+    for idx in range(quotes_per_page):
+        tags = ''.join(
+            f'<a class="tag" href="/tag/tag{t}/page/1/">tag{t}</a>'
+            for t in range(idx % 4 + 1)
+        )
+        quotes.append(
+            '<div class="quote" itemscope itemtype="http://schema.org/CreativeWork">'
+            f'<span class="text" itemprop="text">“Quote {page}-{idx}: the world as we have created it.”</span>'
+            f'<span>by <small class="author" itemprop="author">Author {idx % 7}</small>'
+            f'<a href="/author/Author-{idx % 7}">(about)</a></span>'
+            f'<div class="tags">Tags: {tags}</div>'
+            '</div>'
+        )
+    
+    pager = f'<li class="next"><a href="/page/{page + 1}/">Next <span>→</span></a></li>' if page < pages else ''
+    return (
+        "<html><head><title>Quotes to Scrape</title></head><body>"
+        f"<div class='container'><div class='col-md-8'>{''.join(quotes)}"
+        f"<nav><ul class='pager'>{pager}</ul></nav></div></div></body></html>"
+    )
+
+
+RATINGS = ['One', 'Two', 'Three', 'Four', 'Five']
+
+
+def books_page_html(page, pages=50, books_per_page=20):
+    """
+    Build a books.toscrape.com-style catalogue page.
+    
+    Args:
+        page (int): Page number to render
+        pages (int): Total number of catalogue pages
+        books_per_page (int): Number of books on each page
+        
+    Returns:
+        str: HTML document
+    """
+    books = []
+    for idx in range(books_per_page):
+        book_id = (page - 1) * books_per_page + idx
+        books.append(
+            '<li class="col-xs-6 col-sm-4 col-md-3 col-lg-3"><article class="product_pod">'
+            f'<div class="image_container"><a href="book-{book_id}/index.html">'
+            f'<img src="media/cache/{book_id}.jpg" alt="Book {book_id}" class="thumbnail"></a></div>'
+            f'<p class="star-rating {RATINGS[book_id % 5]}"><i class="icon-star"></i></p>'
+            f'<h3><a href="book-{book_id}/index.html" title="Book Title {book_id}">Book Title {book_id}</a></h3>'
+            f'<div class="product_price"><p class="price_color">£{10 + book_id % 50}.{book_id % 100:02d}</p>'
+            '<p class="instock availability"><i class="icon-ok"></i>\n    In stock\n</p>'
+            '<form><button type="submit" class="btn btn-primary btn-block">Add to basket</button></form>'
+            '</div></article></li>'
+        )
+    
+    pager = f'<li class="next"><a href="page-{page + 1}.html">next</a></li>' if page < pages else ''
+    return (
+        "<html><head><title>All products | Books to Scrape</title></head><body>"
+        "<div class='container-fluid page'><div class='row'><aside class='sidebar col-sm-4 col-md-3'>"
+        + ''.join(f'<li><a href="../category/books/cat_{c}/index.html">Category {c}</a></li>'
+                  for c in range(50))
+        + f"</aside><section><ol class='row'>{''.join(books)}</ol>"
+        f"<div><ul class='pager'>{pager}</ul></div></section></div></div></body></html>"
+    )
+
+
+def book_page_html(book_id):
+    """
+    Build a books.toscrape.com-style detail page for one book.
+    
+    Args:
+        book_id (int): Book number, as linked from books_page_html
+        
+    Returns:
+        str: HTML document
+    """
+    stock = book_id % 23
+    availability = f"In stock ({stock} available)" if stock else "Out of stock"
+    info = [('UPC', f"{book_id:016x}"), ('Product Type', 'Books'),
+            ('Price (excl. tax)', f"£{10 + book_id % 50}.{book_id % 100:02d}"),
+            ('Tax', '£0.00'), ('Availability', availability), ('Number of reviews', '0')]
+    return (
+        "<html><head><title>Book | Books to Scrape</title></head><body>"
+        "<div class='container-fluid page'><div class='page_inner'><ul class='breadcrumb'>"
+        "<li><a href='../../index.html'>Home</a></li>"
+        "<li><a href='../category/books_1/index.html'>Books</a></li>"
+        f"<li><a href='../category/books/cat_{book_id % 50}/index.html'>Category {book_id % 50}</a></li>"
+        f"<li class='active'>Book Title {book_id}</li></ul>"
+        "<article class='product_page'><div class='row'><div class='col-sm-6 product_main'>"
+        f"<h1>Book Title {book_id}</h1><p class='price_color'>£{10 + book_id % 50}.{book_id % 100:02d}</p>"
+        f"<p class='instock availability'><i class='icon-ok'></i> {availability}</p>"
+        f"<p class='star-rating {RATINGS[book_id % 5]}'><i class='icon-star'></i></p></div></div>"
+        "<div id='product_description' class='sub-header'><h2>Product Description</h2></div>"
+        f"<p>Description of book {book_id}. " + "A long and winding story. " * 20 + "</p>"
+        "<div class='sub-header'><h2>Product Information</h2></div>"
+        "<table class='table table-striped'>"
+        + ''.join(f"<tr><th>{name}</th><td>{value}</td></tr>" for name, value in info)
+        + "</table></article></div></div></body></html>"
+    )
+
+
+class FixtureHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serves generated pages and counts the TCP connections and requests it
+    accepts.
+    """
+    
+    protocol_version = 'HTTP/1.1'  # Needed for keep-alive
+    disable_nagle_algorithm = True  # Avoid delayed-ACK stalls on reused sockets
+    pages = 10
+    quotes_per_page = 10
+    books_per_page = 20
+    latency = 0.0
+    slow_every = 0  # Every Nth request is slow, 0 for none
+    slow_latency = 0.0
+    fail_once = set()  # Paths answered with a single 503
+    connections = 0
+    requests = 0
+    lock = threading.Lock()
+    
+    def setup(self):
+        super().setup()
+        with FixtureHandler.lock:
+            FixtureHandler.connections += 1
+    
+    def do_GET(self):
+        with FixtureHandler.lock:
+            FixtureHandler.requests += 1
+            slow = self.slow_every and FixtureHandler.requests % self.slow_every == 0
+            failed = self.path in FixtureHandler.fail_once
+            FixtureHandler.fail_once.discard(self.path)
+        if failed or self.path.startswith('/down/'):
+            self.send_error(503)  # A host that is down
+            return
+        books = re.match(r'/catalogue/page-(\d+)\.html', self.path)
+        book = re.match(r'/catalogue/book-(\d+)/index\.html', self.path)
+        quotes = re.match(r'/page/(\d+)/', self.path)
+        if book:
+            html = book_page_html(int(book.group(1)))
+        elif books:
+            page = int(books.group(1))
+            if page > self.pages:
+                self.send_error(404)
+                return
+            html = books_page_html(page, self.pages, self.books_per_page)
+        else:
+            page = int(quotes.group(1)) if quotes else 1
+            html = quotes_page_html(page, self.pages, self.quotes_per_page)
+        body = html.encode('utf-8')
+        
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        
+        if self.latency:
+            time.sleep(self.latency)
+        if slow:
+            time.sleep(self.slow_latency)
+        
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output readable
+
+
+def start_fixture_server(pages=10, quotes_per_page=10, books_per_page=20, latency=0.0,
+                         slow_every=0, slow_latency=0.0):
+    """
+    Start the fixture server on a free local port in a background thread.
+    
+    Quotes pages are served under /page/<n>/, book catalogue pages under
+    /catalogue/page-<n>.html and book pages under /catalogue/book-<id>/index.html.
+    Every slow_every-th request takes slow_latency longer, anything under
+    /down/ answers 503, and so does the next request for each path added
+    to FixtureHandler.fail_once.
+    
+    Returns:
+        ThreadingHTTPServer: Call shutdown() when finished
+    """
+    FixtureHandler.pages = pages
+    FixtureHandler.quotes_per_page = quotes_per_page
+    FixtureHandler.books_per_page = books_per_page
+    FixtureHandler.latency = latency
+    FixtureHandler.slow_every = slow_every
+    FixtureHandler.slow_latency = slow_latency
+    FixtureHandler.fail_once = set()
+    FixtureHandler.connections = 0
+    FixtureHandler.requests = 0
+    
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+# ============================================================
+# BENCHMARKS
+# ============================================================
+
+def quiet():
+    """
+    Silence the scraper's progress prints while timing.
+    """
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def bench_connection_pool(pages=200):
+    """
+    Compare one-connection-per-page fetching with the pooled session.
+    """
+    server = start_fixture_server(pages=pages)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    urls = [f"{base_url}/page/{page}/" for page in range(1, pages + 1)]
+    
+    print("\n" + "="*60)
+    print(f"CONNECTION POOL: {pages} PAGES")
+    print("="*60)
+    
+    try:
+        # Baseline: module-level requests.get opens a new connection each time
+        FixtureHandler.connections = 0
+        start = time.perf_counter()
+        for url in urls:
+            requests.get(url, timeout=10).content
+        unpooled = time.perf_counter() - start
+        unpooled_connections = FixtureHandler.connections
+        
+        # Pooled keep-alive session owned by the scraper
+        FixtureHandler.connections = 0
+        with WebScraper(base_url) as scraper:
+            start = time.perf_counter()
+            for url in urls:
+                scraper.session.get(url, timeout=10).content
+            pooled = time.perf_counter() - start
+        pooled_connections = FixtureHandler.connections
+    finally:
+        server.shutdown()
+    
+    print(f"requests.get : {unpooled:.3f}s, {unpooled_connections} connections")
+    print(f"pooled       : {pooled:.3f}s, {pooled_connections} connections")
+    print(f"speedup      : {unpooled / pooled:.2f}x")
+    return {'unpooled_s': unpooled, 'pooled_s': pooled,
+            'unpooled_connections': unpooled_connections,
+            'pooled_connections': pooled_connections}
+
+
+def _measure_parse(html, parser, parse_only, repeats):
+    """
+    Parse a document several times and return (ms per parse, peak MiB).
+    """
+    start = time.perf_counter()
+    for _ in range(repeats):
+        BeautifulSoup(html, parser, parse_only=parse_only)
+    elapsed_ms = (time.perf_counter() - start) * 1000 / repeats
+    
+    tracemalloc.start()
+    soup = BeautifulSoup(html, parser, parse_only=parse_only)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del soup
+    return elapsed_ms, peak / (1024 * 1024)
+
+
+def bench_parsers(page_sizes=(20, 2000), repeats=3):
+    """
+    Compare parser backends and full vs SoupStrainer-limited parsing on
+    typical and large fixture pages.
+    
+    The strainer pays off when a good share of the page is navigation and
+    other markup outside the containers; on pages that are almost all
+    containers it mainly saves memory.
+    """
+    parsers = ['html.parser']
+    if default_parser() != 'html.parser':
+        parsers.append(default_parser())
+    
+    results = {}
+    for records in page_sizes:
+        fixtures = {
+            'quotes': (quotes_page_html(1, quotes_per_page=records).encode('utf-8'),
+                       WebScraper.QUOTE_STRAINER),
+            'books': (books_page_html(1, books_per_page=records).encode('utf-8'),
+                      WebScraper.BOOK_STRAINER),
+        }
+        # Keep the total work per measurement roughly constant
+        page_repeats = max(repeats, repeats * 200 // records)
+        
+        print("\n" + "="*60)
+        print(f"PARSING: {records} RECORDS PER PAGE")
+        print("="*60)
+        
+        for name, (html, strainer) in fixtures.items():
+            print(f"{name} page: {len(html) / 1024:.0f} KiB")
+            for parser in parsers:
+                for label, parse_only in (('full', None), ('strained', strainer)):
+                    elapsed_ms, peak_mib = _measure_parse(html, parser, parse_only, page_repeats)
+                    results[f"{records}/{name}/{parser}/{label}"] = {
+                        'ms': elapsed_ms, 'peak_mib': peak_mib
+                    }
+                    print(f"  {parser:<12} {label:<9}: {elapsed_ms:8.2f} ms  peak {peak_mib:6.2f} MiB")
+    return results
+
+
+def synthetic_quotes(count):
+    """
+    Build quote records shaped like the ones scrape_quotes produces.
+    """
+    return [
+        {
+            'quote': f"“Synthetic quote number {idx}: the world as we have created it.”",
+            'author': f"Author {idx % 500}",
+            'tags': ', '.join(f"tag{t}" for t in range(idx % 4 + 1)),
+            'page': idx // 10 + 1,
+            'scraped_at': '2024-01-01 12:00:00',
+        }
+        for idx in range(count)
+    ]
+
+
+def bench_export(records=1_000_000):
+    """
+    Compare the three separate save_to_* calls with a single export() pass.
+    """
+    scraper = WebScraper('http://127.0.0.1')
+    scraper.data = synthetic_quotes(records)
+    
+    print("\n" + "="*60)
+    print(f"EXPORT: {records:,} RECORDS")
+    print("="*60)
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        base = os.path.join(directory, 'quotes')
+        runs = {
+            'separate': lambda: (scraper.save_to_csv(base + '.csv'),
+                                 scraper.save_to_json(base + '.json'),
+                                 scraper.save_to_txt(base + '.txt')),
+            'export': lambda: scraper.export(['csv', 'json', 'txt'], base),
+            'export threaded': lambda: scraper.export(['csv', 'json', 'txt'], base, threaded=True),
+            'export compact': lambda: scraper.export(['csv', 'json', 'txt'], base, compact_json=True),
+        }
+        for label, run in runs.items():
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            json_mib = os.path.getsize(base + '.json') / (1024 * 1024)
+            results[label] = {'s': elapsed, 'json_mib': json_mib}
+    
+    print()
+    for label, result in results.items():
+        print(f"{label:<16}: {result['s']:7.2f}s  json {result['json_mib']:7.1f} MiB")
+    return results
+
+
+def parsed_quotes(count, per_page=10):
+    """
+    Yield quote records the way extraction produces them: every string is
+    a fresh object, as BeautifulSoup returns new strings for each element.
+    """
+    for idx in range(count):
+        page = idx // per_page + 1
+        yield {
+            'quote': f"“Synthetic quote number {idx}: the world as we have created it.”",
+            'author': f"Author {idx % 500}",
+            'tags': ', '.join(f"tag{t}" for t in range(idx % 4 + 1)),
+            'page': page,
+            'scraped_at': f"2024-01-01 12:{page // 60 % 60:02d}:{page % 60:02d}",
+        }
+
+
+def bench_record_store(records=10_000_000):
+    """
+    Compare bytes per record of a list of dicts with RecordStore.
+    """
+    print("\n" + "="*60)
+    print(f"RECORD STORAGE: {records:,} RECORDS")
+    print("="*60)
+    
+    results = {}
+    for label, factory in (('list of dicts', list), ('RecordStore', RecordStore)):
+        tracemalloc.start()
+        store = factory(parsed_quotes(records))
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del store
+        results[label] = used / records
+        print(f"{label:<14}: {used / (1024 * 1024):9.1f} MiB  {used / records:6.1f} bytes/record")
+    
+    print(f"reduction     : {1 - results['RecordStore'] / results['list of dicts']:.0%}")
+    return results
+
+
+def bench_query(records=1_000_000, repeats=20):
+    """
+    Filtered lookups over scraped quotes: a linear scan of the records
+    against IndexedRecordStore and an exported SQLite database.
+    """
+    print("\n" + "="*60)
+    print(f"QUERIES: {records:,} RECORDS")
+    print("="*60)
+    
+    data = list(parsed_quotes(records))
+    start = time.perf_counter()
+    index = IndexedRecordStore(data)
+    build_s = time.perf_counter() - start
+    
+    queries = {
+        'author': ({'author': 'Author 7'}, lambda r: r['author'] == 'Author 7'),
+        'tag+author': ({'tag': 'tag3', 'author': 'Author 7'},
+                       lambda r: r['author'] == 'Author 7' and 'tag3' in r['tags'].split(', ')),
+        'text': ({'text': '"number 123456"'}, lambda r: 'number 123456:' in r['quote']),
+    }
+    
+    def best_ms(run):
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            found = run()
+            best = min(best, time.perf_counter() - start)
+        return best * 1000, len(found)
+    
+    results = {'build_index_s': build_s}
+    with tempfile.TemporaryDirectory() as directory:
+        base = os.path.join(directory, 'quotes')
+        start = time.perf_counter()
+        with FanOutWriter(create_writers(['sqlite'], base)) as fan_out:
+            fan_out.write_many(data)
+        results['write_sqlite_s'] = time.perf_counter() - start
+        
+        with RecordDatabase(base + '.sqlite') as database:
+            for name, (conditions, matches) in queries.items():
+                result = results[name] = {}
+                result['scan_ms'], expected = best_ms(lambda: [r for r in data if matches(r)])
+                if 'text' not in conditions:
+                    result['index_ms'], found = best_ms(lambda: index.find(**conditions))
+                    assert found == expected, (name, found, expected)
+                result['sqlite_ms'], found = best_ms(lambda: database.find(**conditions))
+                assert found == expected, (name, found, expected)
+                result['matches'] = expected
+    
+    print(f"build index  : {results['build_index_s']:6.2f}s")
+    print(f"write sqlite : {results['write_sqlite_s']:6.2f}s")
+    for name in queries:
+        result = results[name]
+        index_ms = f"{result['index_ms']:8.3f} ms" if 'index_ms' in result else '         -'
+        print(f"{name:<11}: scan {result['scan_ms']:8.2f} ms  index {index_ms}  "
+              f"sqlite {result['sqlite_ms']:8.3f} ms  ({result['matches']} matches)")
+    return results
+
+
+def bench_pipeline(pages=100, quotes_per_page=100, worker_counts=(1, 2, 4)):
+    """
+    Compare in-process fetch+parse with the process-pool pipeline at
+    several parse worker counts.
+    """
+    server = start_fixture_server(pages=pages, quotes_per_page=quotes_per_page)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    urls = [f"{base_url}/page/{page}/" for page in range(1, pages + 1)]
+    
+    print("\n" + "="*60)
+    print(f"FETCH/PARSE PIPELINE: {pages} PAGES x {quotes_per_page} QUOTES, {os.cpu_count()} CPUs")
+    print("="*60)
+    
+    results = {}
+    try:
+        with WebScraper(base_url) as scraper, quiet():
+            start = time.perf_counter()
+            for page, url in enumerate(urls, 1):
+                scraper._extract_quotes(scraper.fetch_page(url, parse_only=scraper.QUOTE_STRAINER), page)
+            results['in-process'] = pages / (time.perf_counter() - start)
+            
+            for workers in worker_counts:
+                start = time.perf_counter()
+                for _ in scraper.iter_pipeline(urls, 'quotes', parse_workers=workers):
+                    pass
+                results[f"{workers} parse workers"] = pages / (time.perf_counter() - start)
+    finally:
+        server.shutdown()
+    
+    for label, pages_per_s in results.items():
+        print(f"{label:<18}: {pages_per_s:7.1f} pages/s")
+    return results
+
+
+def bench_pagination(pages=30, books_per_page=100, latency=0.03):
+    """
+    Compare a fetch-then-parse walk of the "next" links with
+    iter_paginated, which prefetches page N+1 while page N is parsed.
+    """
+    server = start_fixture_server(pages=pages, books_per_page=books_per_page, latency=latency)
+    start_url = f"http://127.0.0.1:{server.server_port}/catalogue/page-1.html"
+    
+    print("\n" + "="*60)
+    print(f"PAGINATION: {pages} PAGES, {latency * 1000:.0f} ms SERVER LATENCY")
+    print("="*60)
+    
+    results = {}
+    try:
+        with WebScraper(start_url) as scraper, quiet():
+            start = time.perf_counter()
+            url, records = start_url, 0
+            while url:
+                content = scraper.fetch_raw(url)
+                records += len(scraper.parse_records('books', content))
+                url = scraper.find_next_link(content, url)
+            results['sequential'] = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            prefetched = sum(1 for _ in scraper.iter_paginated(start_url, 'books', delay=0))
+            results['prefetch'] = time.perf_counter() - start
+    finally:
+        server.shutdown()
+    
+    assert records == prefetched == pages * books_per_page
+    for label, elapsed in results.items():
+        print(f"{label:<11}: {elapsed:6.2f}s  {pages / elapsed:6.1f} pages/s")
+    return results
+
+
+def _find_chain_quotes(soup):
+    """
+    The hand-written find() chains the quote schema replaced.
+    """
+    records = []
+    for quote in soup.find_all('div', class_='quote'):
+        records.append({
+            'quote': quote.find('span', class_='text').get_text(),
+            'author': quote.find('small', class_='author').get_text(),
+            'tags': ', '.join(tag.get_text() for tag in quote.find_all('a', class_='tag')),
+        })
+    return records
+
+
+def _find_chain_books(soup):
+    """
+    The hand-written find() chains the book schema replaced.
+    """
+    records = []
+    for book in soup.find_all('article', class_='product_pod'):
+        records.append({
+            'title': book.find('h3').find('a')['title'],
+            'price': book.find('p', class_='price_color').get_text(),
+            'rating': book.find('p', class_='star-rating')['class'][1],
+            'availability': book.find('p', class_='instock availability').get_text(strip=True),
+        })
+    return records
+
+
+def bench_extraction(quotes_per_page=100, books_per_page=100, repeats=20):
+    """
+    Compare the original per-element find() chains with the compiled
+    extraction schemas, on the extraction step alone and on parse+extract.
+    """
+    print("\n" + "="*60)
+    print(f"EXTRACTION: {quotes_per_page} QUOTES / {books_per_page} BOOKS PER PAGE")
+    print("="*60)
+    
+    scraper = WebScraper('http://127.0.0.1', log=None)
+    parser = default_parser()
+    cases = (
+        ('quotes', quotes_page_html(1, 1, quotes_per_page).encode('utf-8'),
+         scraper.QUOTE_SCHEMA, scraper.QUOTE_STRAINER, _find_chain_quotes, {'page': 1, 'scraped_at': ''}),
+        ('books', books_page_html(1, 1, books_per_page).encode('utf-8'),
+         scraper.BOOK_SCHEMA, scraper.BOOK_STRAINER, _find_chain_books, {'scraped_at': ''}),
+    )
+    
+    def per_page_ms(run):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            result = run()
+        return (time.perf_counter() - start) * 1000 / repeats, result
+    
+    results = {}
+    for kind, html, schema, strainer, find_chain, context in cases:
+        soup = BeautifulSoup(html, parser, parse_only=strainer)
+        tree = schema.parse(html)
+        runs = {
+            'find chains': lambda: find_chain(soup),
+            'schema on soup': lambda: schema.extract_tree(soup, **context),
+            'schema on lxml': lambda: schema.extract_tree(tree, **context),
+            'parse + find chains': lambda: find_chain(BeautifulSoup(html, parser, parse_only=strainer)),
+            'parse + schema': lambda: schema.extract(html, **context),
+        }
+        
+        results[kind] = {}
+        expected = None
+        for label, run in runs.items():
+            elapsed, records = per_page_ms(run)
+            records = [{key: record[key] for key in record if key not in context} for record in records]
+            expected = expected or records
+            assert records == expected, f"{label} output differs from the find chains"
+            results[kind][label] = elapsed
+        
+        print(f"\n{kind}:")
+        for label, elapsed in results[kind].items():
+            print(f"  {label:<20}: {elapsed:8.2f} ms/page")
+        print(f"  extraction speedup  : {results[kind]['find chains'] / results[kind]['schema on lxml']:.1f}x")
+        print(f"  end-to-end speedup  : {results[kind]['parse + find chains'] / results[kind]['parse + schema']:.1f}x")
+    return results
+
+
+def bench_book_details(pages=5, books_per_page=20, latency=0.02, concurrency=(1, 4, 8, 16)):
+    """
+    Time the two-level books crawl (listing + one detail page per book) at
+    several detail fan-outs.
+    """
+    server = start_fixture_server(pages=pages, books_per_page=books_per_page, latency=latency)
+    start_url = f"http://127.0.0.1:{server.server_port}/catalogue/page-1.html"
+    books = pages * books_per_page
+    
+    print("\n" + "="*60)
+    print(f"BOOK DETAILS: {books} BOOKS, {latency * 1000:.0f} ms SERVER LATENCY")
+    print("="*60)
+    
+    results = {}
+    expected = None
+    try:
+        for workers in concurrency:
+            limiter = AdaptiveRateLimiter(initial_rate=1e6, max_rate=1e6)
+            with WebScraper(start_url, pool_maxsize=workers, rate_limiter=limiter, log=None) as scraper:
+                start = time.perf_counter()
+                records = list(scraper.iter_books_with_details(max_pages=None, concurrency=workers))
+                elapsed = time.perf_counter() - start
+            
+            titles = [record['title'] for record in records]
+            expected = expected or titles
+            assert titles == expected and len(records) == books, "detail crawl lost its order"
+            assert all(record['upc'] for record in records)
+            results[workers] = {'s': elapsed, 'books_per_s': books / elapsed}
+    finally:
+        server.shutdown()
+    
+    for workers, result in results.items():
+        print(f"concurrency {workers:>2}: {result['s']:6.2f}s  {result['books_per_s']:7.1f} books/s  "
+              f"({results[concurrency[0]]['s'] / result['s']:.1f}x)")
+    return results
+
+
+def bench_archive(pages=100, quotes_per_page=10, books_per_page=20, latency=0.01, lookups=1000):
+    """
+    Archive a live crawl, then replay it from disk and time random access.
+    """
+    server = start_fixture_server(pages=pages, quotes_per_page=quotes_per_page,
+                                  books_per_page=books_per_page, latency=latency)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    books_url = f"{base_url}/catalogue/page-1.html"
+    
+    print("\n" + "="*60)
+    print(f"RESPONSE ARCHIVE: {pages} QUOTES + {pages} BOOKS PAGES, {latency * 1000:.0f} ms LATENCY")
+    print("="*60)
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'responses.archive')
+        limiter = AdaptiveRateLimiter(initial_rate=1e6, max_rate=1e6)
+        try:
+            with ResponseArchive(path) as archive, quiet():
+                start = time.perf_counter()
+                with WebScraper(base_url, rate_limiter=limiter, archive=archive) as scraper:
+                    scraper.scrape_quotes(pages)
+                    live = [record['quote'] for record in scraper.data]
+                with WebScraper(books_url, rate_limiter=limiter, archive=archive) as scraper:
+                    scraper.scrape_books(None)
+                results['live_s'] = time.perf_counter() - start
+        finally:
+            server.shutdown()
+        
+        with ResponseArchive(path) as archive, quiet():
+            start = time.perf_counter()
+            with WebScraper(base_url, replay=archive) as scraper:
+                scraper.scrape_quotes(pages)
+                replayed = [record['quote'] for record in scraper.data]
+            with WebScraper(books_url, replay=archive) as scraper:
+                scraper.scrape_books(None)
+            results['replay_s'] = time.perf_counter() - start
+            assert replayed == live, "replay produced different records"
+            
+            urls = [f"{base_url}/page/{idx % pages + 1}/" for idx in range(lookups)]
+            start = time.perf_counter()
+            for url in urls:
+                archive.get(url)
+            results['random_access_ms'] = (time.perf_counter() - start) * 1000 / lookups
+            results.update(archive.stats())
+    
+    print(f"live crawl   : {results['live_s']:6.2f}s  {2 * pages / results['live_s']:8.1f} pages/s")
+    print(f"replay       : {results['replay_s']:6.2f}s  {2 * pages / results['replay_s']:8.1f} pages/s")
+    print(f"random access: {results['random_access_ms']:.3f} ms/response")
+    print(f"archive size : {results['archive_bytes'] / 1024:.0f} KiB for "
+          f"{results['body_bytes'] / 1024:.0f} KiB of bodies ({results['ratio']:.1f}x)")
+    return results
+
+
+def bench_incremental(pages=50, quotes_per_page=10, failed_page=3):
+    """
+    Time a first and an unchanged incremental re-scrape, then check that a
+    run cut short by one failed download neither reports nor loses records.
+    """
+    server = start_fixture_server(pages=pages, quotes_per_page=quotes_per_page)
+    base_url = f"http://127.0.0.1:{server.server_port}/page/1/"
+    total = pages * quotes_per_page
+    
+    print("\n" + "="*60)
+    print(f"INCREMENTAL RE-SCRAPE: {pages} PAGES, PAGE {failed_page} FAILING ONCE")
+    print("="*60)
+    
+    limiter = AdaptiveRateLimiter(initial_rate=1e6, max_rate=1e6)
+    
+    def run(tracker, delta_file):
+        with WebScraper(base_url, rate_limiter=limiter) as scraper, quiet():
+            start = time.perf_counter()
+            counts = scraper.scrape_incremental(tracker, delta_file=delta_file, max_pages=pages + 1)
+            return counts, len(scraper.data), time.perf_counter() - start
+    
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            delta_file = os.path.join(directory, 'delta.jsonl')
+            with ChangeTracker(os.path.join(directory, 'state.sqlite3')) as tracker:
+                counts, records, results['first_run_s'] = run(tracker, delta_file)
+                assert counts['insert'] == records == total, counts
+                counts, records, results['unchanged_run_s'] = run(tracker, delta_file)
+                assert not any(counts.values()) and records == total, counts
+                
+                FixtureHandler.fail_once.add(f"/page/{failed_page}/")
+                counts, records, _ = run(tracker, delta_file)
+                assert counts is None, "an incomplete run reported changes"
+                counts, records, _ = run(tracker, delta_file)
+                assert not any(counts.values()) and records == total, \
+                    f"records lost after a failed download: {records} of {total}, {counts}"
+    finally:
+        server.shutdown()
+    
+    print(f"first run     : {results['first_run_s']:6.2f}s")
+    print(f"unchanged run : {results['unchanged_run_s']:6.2f}s")
+    print(f"failed page   : no delta, all {total} records back on the next run")
+    return results
+
+
+def latency_summary(samples):
+    """
+    Mean and tail percentiles of a list of durations, in milliseconds.
+    """
+    ordered = sorted(samples)
+    
+    def pct(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    
+    return {'mean_ms': sum(ordered) * 1000 / len(ordered), 'p50_ms': pct(0.50),
+            'p95_ms': pct(0.95), 'p99_ms': pct(0.99), 'max_ms': ordered[-1] * 1000}
+
+
+def bench_tail_latency(requests_count=500, latency=0.005, slow_every=25, slow_latency=0.5, down_calls=30):
+    """
+    Tail latency of scrape_with_retries against a server where one request
+    in `slow_every` stalls, with and without hedging, and the cost of
+    retrying against a host that is down, with and without the breaker.
+    """
+    server = start_fixture_server(pages=10, latency=latency, slow_every=slow_every, slow_latency=slow_latency)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    
+    print("\n" + "="*60)
+    print(f"TAIL LATENCY: 1 IN {slow_every} REQUESTS +{slow_latency * 1000:.0f} ms, {requests_count} CALLS")
+    print("="*60)
+    
+    results = {}
+    try:
+        policies = {
+            'serial': RetryPolicy(hedge=False),
+            'hedged': RetryPolicy(hedge=True),
+        }
+        for name, policy in policies.items():
+            samples = []
+            with AdvancedScraper(base_url, retry_policy=policy, log=None) as scraper:
+                for idx in range(requests_count):
+                    start = time.perf_counter()
+                    scraper.scrape_with_retries(f"{base_url}/page/{idx % 10 + 1}/")
+                    samples.append(time.perf_counter() - start)
+                results[name] = latency_summary(samples)
+                results[name]['hedges'] = scraper.metrics.snapshot()['counters'].get('hedges', 0)
+        
+        down_url = f"{base_url}/down/"
+        breakers = {
+            'no_breaker': CircuitBreaker(failure_threshold=10 ** 9),
+            'breaker': CircuitBreaker(failure_threshold=5, reset_timeout=30.0),
+        }
+        for name, breaker in breakers.items():
+            policy = RetryPolicy(backoff_base=0.05, hedge=False, breaker=breaker)
+            FixtureHandler.requests = 0
+            with AdvancedScraper(base_url, retry_policy=policy, log=None) as scraper:
+                start = time.perf_counter()
+                for _ in range(down_calls):
+                    scraper.scrape_with_retries(down_url)
+                results[name] = {'elapsed_s': time.perf_counter() - start, 'requests': FixtureHandler.requests}
+    finally:
+        server.shutdown()
+    
+    for name in policies:
+        result = results[name]
+        print(f"{name:<10}: p50 {result['p50_ms']:6.1f} ms  p95 {result['p95_ms']:6.1f} ms  "
+              f"p99 {result['p99_ms']:6.1f} ms  max {result['max_ms']:6.1f} ms  ({result['hedges']} hedges)")
+    for name in breakers:
+        result = results[name]
+        print(f"{name:<10}: {down_calls} calls to a down host in {result['elapsed_s']:.2f}s, "
+              f"{result['requests']} requests sent")
+    return results
+
+
+class _CanonicalStringSet(set):
+    """
+    Baseline seen-set: canonical URL strings in a plain Python set.
+    """
+    
+    def add(self, url):
+        url = canonicalize_url(url)
+        if set.__contains__(self, url):
+            return False
+        set.add(self, url)
+        return True
+    
+    def __contains__(self, url):
+        return set.__contains__(self, canonicalize_url(url))
+
+
+def bench_seen_urls(urls=1_000_000, lookups=200_000):
+    """
+    Compare memory per URL and lookups per second of the seen-URL sets.
+    """
+    print("\n" + "="*60)
+    print(f"SEEN-URL SETS: {urls:,} URLS")
+    print("="*60)
+    
+    url_list = [f"http://books.toscrape.com/catalogue/book-{idx}_{idx * 7}/index.html" for idx in range(urls)]
+    probes = url_list[:lookups // 2] + [url + '?missing=1' for url in url_list[:lookups // 2]]
+    
+    results = {}
+    for label, factory in (('set of str', _CanonicalStringSet),
+                           ('fingerprints', lambda: FingerprintSet(urls)),
+                           ('bloom 1%', lambda: BloomFilter(urls, 0.01))):
+        # Memory and speed are measured on separate builds, as tracemalloc
+        # slows every allocation down
+        tracemalloc.start()
+        seen = factory()
+        for url in url_list:
+            seen.add(url)
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del seen
+        
+        seen = factory()
+        start = time.perf_counter()
+        for url in url_list:
+            seen.add(url)
+        add_rate = urls / (time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        hits = sum(1 for url in probes if url in seen)
+        lookup_rate = len(probes) / (time.perf_counter() - start)
+        false_positives = hits - lookups // 2
+        
+        results[label] = {'bytes_per_url': used / urls, 'adds_per_s': add_rate,
+                          'lookups_per_s': lookup_rate, 'false_positives': false_positives}
+        print(f"{label:<13}: {used / urls:6.1f} bytes/url  {add_rate:9,.0f} adds/s  "
+              f"{lookup_rate:9,.0f} lookups/s  {false_positives} false positives")
+        del seen
+    return results
+
+
+# ============================================================
+# END-TO-END SCRAPE SUITE
+# ============================================================
+
+def peak_rss_mib():
+    """
+    Peak resident set size of the current process, None where unsupported.
+    
+    On Linux this is VmHWM, which starts over when a process is spawned;
+    ru_maxrss would carry over the peak of the parent (e.g. the fixture
+    server after serving a big page).
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_scenario(name, base_url, pages):
+    """
+    Run one scrape path in this (fresh) process and time it.
+    
+    The scraper gets a rate limiter with a very high rate so the polite
+    sleeps are skipped and only the scraper's own work is measured. Parse
+    time comes from the scraper's own metrics.
+    """
+    limiter = AdaptiveRateLimiter(initial_rate=1e6, max_rate=1e6)
+    quotes_url = base_url
+    books_url = f"{base_url}/catalogue/page-1.html"
+    
+    with tempfile.TemporaryDirectory() as directory, quiet():
+        frontier_path = os.path.join(directory, 'frontier.sqlite3')
+        runs = {
+            'scrape_quotes': (WebScraper, quotes_url, lambda s: s.scrape_quotes(pages)),
+            'scrape_quotes_async': (WebScraper, quotes_url,
+                                    lambda s: asyncio.run(s.scrape_quotes_async(pages))),
+            'scrape_books': (WebScraper, books_url, lambda s: s.scrape_books(pages)),
+            'advanced_scrape_quotes': (
+                AdvancedScraper, quotes_url,
+                lambda s: s.scrape_quotes(pages, frontier=CrawlFrontier(frontier_path))
+            ),
+            'advanced_pagination': (AdvancedScraper, quotes_url,
+                                    lambda s: s.scrape_with_pagination(pages)),
+        }
+        scraper_class, url, run = runs[name]
+        with scraper_class(url, rate_limiter=limiter) as scraper:
+            start = time.perf_counter()
+            run(scraper)
+            elapsed = time.perf_counter() - start
+            records = len(scraper.data)
+            parse = scraper.metrics.snapshot()['phases'].get('parse', {'count': 0, 'total_s': 0.0})
+    
+    return {
+        'elapsed_s': elapsed,
+        'records': records,
+        'parsed_pages': parse['count'],
+        'parse_s': parse['total_s'],
+        'peak_rss_mib': peak_rss_mib(),
+    }
+
+
+SCENARIOS = ('scrape_quotes', 'scrape_quotes_async', 'scrape_books',
+             'advanced_scrape_quotes', 'advanced_pagination')
+
+
+def bench_scrape_suite(pages=50, quotes_per_page=10, books_per_page=20, latency=0.0,
+                       scenarios=SCENARIOS):
+    """
+    Run the real scrape paths end to end against the fixture server.
+    
+    Every scenario runs in a fresh process so its peak RSS is its own; the
+    fixture server stays in this process and counts the pages served.
+    
+    Args:
+        pages (int): Pages each scenario crawls
+        quotes_per_page (int): Quotes on each fixture page
+        books_per_page (int): Books on each fixture page
+        latency (float): Artificial server latency per request in seconds
+        scenarios (tuple): Names from SCENARIOS to run
+        
+    Returns:
+        dict: Per scenario pages/s, parse ms/page, records/s and peak RSS
+    """
+    server = start_fixture_server(pages=pages, quotes_per_page=quotes_per_page,
+                                  books_per_page=books_per_page, latency=latency)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    
+    print("\n" + "="*60)
+    print(f"SCRAPE SUITE: {pages} PAGES, {quotes_per_page} QUOTES / {books_per_page} BOOKS "
+          f"PER PAGE, {latency * 1000:.0f} ms LATENCY")
+    print("="*60)
+    
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    try:
+        for name in scenarios:
+            FixtureHandler.requests = 0
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                run = pool.submit(_run_scenario, name, base_url, pages).result()
+            fetched = FixtureHandler.requests
+            elapsed = run['elapsed_s']
+            results[name] = {
+                'pages': fetched,
+                'records': run['records'],
+                'elapsed_s': elapsed,
+                'pages_per_s': fetched / elapsed,
+                'parse_ms_per_page': run['parse_s'] * 1000 / max(1, run['parsed_pages']),
+                'records_per_s': run['records'] / elapsed,
+                'peak_rss_mib': run['peak_rss_mib'],
+            }
+    finally:
+        server.shutdown()
+    
+    for name, result in results.items():
+        rss = f"{result['peak_rss_mib']:6.1f} MiB" if result['peak_rss_mib'] is not None else '   n/a'
+        print(f"{name:<23}: {result['pages_per_s']:7.1f} pages/s  "
+              f"{result['parse_ms_per_page']:6.2f} ms parse/page  "
+              f"{result['records_per_s']:9,.0f} records/s  {rss} peak RSS")
+    return results
+
+
+def _run_stream(mode, url):
+    """
+    Scrape one big quotes page in this (fresh) process, either fetched and
+    parsed whole or streamed, and report its peak RSS. 'idle' only builds
+    the scraper, as the baseline of the process itself.
+    """
+    with WebScraper(url, parser='lxml', log=None) as scraper:
+        start = time.perf_counter()
+        if mode == 'full':
+            records = len(scraper.parse_records('quotes', scraper.fetch_raw(url)) or [])
+        elif mode == 'stream':
+            records = sum(1 for _ in scraper.iter_stream(url))
+        else:
+            records = 0
+        elapsed = time.perf_counter() - start
+    return {'elapsed_s': elapsed, 'records': records, 'peak_rss_mib': peak_rss_mib()}
+
+
+def bench_streaming(quotes_per_page=50_000):
+    """
+    Peak memory of one very large page: full download + tree versus the
+    chunked, incremental iter_stream().
+    """
+    server = start_fixture_server(pages=1, quotes_per_page=quotes_per_page)
+    url = f"http://127.0.0.1:{server.server_port}/page/1/"
+    size = len(quotes_page_html(1, pages=1, quotes_per_page=quotes_per_page).encode('utf-8'))
+    
+    print("\n" + "="*60)
+    print(f"STREAMING: ONE PAGE OF {quotes_per_page:,} QUOTES ({size / 2**20:.1f} MiB)")
+    print("="*60)
+    
+    results = {'body_mib': size / 2**20}
+    context = multiprocessing.get_context('spawn')
+    try:
+        for mode in ('idle', 'full', 'stream'):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results[mode] = pool.submit(_run_stream, mode, url).result()
+    finally:
+        server.shutdown()
+    
+    idle = results['idle']['peak_rss_mib']
+    for mode in ('full', 'stream'):
+        run = results[mode]
+        if idle is not None:
+            run['extra_rss_mib'] = run['peak_rss_mib'] - idle
+            rss = f"{run['extra_rss_mib']:7.1f} MiB above idle"
+        else:
+            rss = '   n/a'
+        print(f"{mode:<6}: {run['elapsed_s']:6.2f}s  {run['records']:,} records  {rss}")
+    return results
+
+
+# ============================================================
+# STARTUP TIME
+# ============================================================
+
+def import_profile(module):
+    """
+    Import a module in a fresh interpreter with -X importtime.
+    
+    Returns:
+        dict: The module's cumulative import time and its five most
+        expensive direct imports, in milliseconds
+    """
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+    ).stderr
+    total, children = 0.0, {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if name.strip() == module and not name.startswith('  '):
+            total = int(cumulative) / 1000
+        elif name.startswith('   ') and not name.startswith('    '):
+            children[name.strip()] = int(cumulative) / 1000  # Direct imports of the module
+    top = dict(sorted(children.items(), key=lambda item: -item[1])[:5])
+    return {'import_ms': total, 'top_imports_ms': top}
+
+
+def bench_startup(repeats=5):
+    """
+    Wall-clock startup of the scraper's entry points in fresh interpreters,
+    and where the import time of web_scraper goes.
+    """
+    print("\n" + "="*60)
+    print(f"STARTUP TIME: BEST OF {repeats} FRESH INTERPRETERS")
+    print("="*60)
+    
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        records = os.path.join(directory, 'records.jsonl')
+        with open(records, 'w', encoding='utf-8') as file:
+            file.writelines(json.dumps(record) + '\n' for record in synthetic_quotes(1000))
+        
+        commands = {
+            'python': ['-c', 'pass'],
+            'import_requests': ['-c', 'import requests'],
+            'import_web_scraper': ['-c', 'import web_scraper'],
+            'cli_help': [os.path.join(here, 'scraper_cli.py'), '--help'],
+            'web_scraper_help': [os.path.join(here, 'web_scraper.py'), '--help'],
+            'cli_export': [os.path.join(here, 'scraper_cli.py'), 'export', records, '-f', 'csv', '-q'],
+        }
+        for name, args in commands.items():
+            best = float('inf')
+            for _ in range(repeats):
+                start = time.perf_counter()
+                subprocess.run([sys.executable, *args], cwd=here, check=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                best = min(best, time.perf_counter() - start)
+            results[name] = {'wall_ms': best * 1000}
+    
+    results['web_scraper_imports'] = import_profile('web_scraper')
+    
+    for name, result in results.items():
+        if 'wall_ms' in result:
+            print(f"{name:<19}: {result['wall_ms']:7.1f} ms")
+    profile = results['web_scraper_imports']
+    print(f"\nimport web_scraper: {profile['import_ms']:.1f} ms, heaviest direct imports:")
+    for name, ms in profile['top_imports_ms'].items():
+        print(f"  {name:<17}: {ms:7.1f} ms")
+    return results
+
+
+# ============================================================
+# RESULTS FILE
+# ============================================================
+
+BENCHMARKS = {
+    'scrape': bench_scrape_suite,
+    'connection_pool': bench_connection_pool,
+    'parsers': bench_parsers,
+    'export': bench_export,
+    'record_store': bench_record_store,
+    'query': bench_query,
+    'pipeline': bench_pipeline,
+    'pagination': bench_pagination,
+    'seen_urls': bench_seen_urls,
+    'extraction': bench_extraction,
+    'book_details': bench_book_details,
+    'archive': bench_archive,
+    'incremental': bench_incremental,
+    'streaming': bench_streaming,
+    'tail_latency': bench_tail_latency,
+    'startup': bench_startup,
+}
+
+
+def environment():
+    """
+    Describe the machine and code version a results file came from.
+    """
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'parser': default_parser(),
+    }
+
+
+def _flatten(results, prefix=''):
+    """
+    Turn nested results into {'scrape.scrape_books.pages_per_s': value}.
+    """
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare_results(baseline, current, threshold=0.05):
+    """
+    Print the metrics that moved by more than `threshold` between two
+    results files.
+    """
+    old = _flatten(baseline['results'])
+    new = _flatten(current['results'])
+    
+    print("\n" + "="*60)
+    print(f"CHANGES VS {baseline['environment'].get('commit') or 'BASELINE'}")
+    print("="*60)
+    
+    changed = 0
+    for name in sorted(old.keys() & new.keys()):
+        if old[name]:
+            delta = (new[name] - old[name]) / abs(old[name])
+            if abs(delta) > threshold:
+                changed += 1
+                print(f"{name:<55}: {old[name]:12.4g} -> {new[name]:12.4g}  ({delta:+.1%})")
+    if not changed:
+        print(f"No metric moved by more than {threshold:.0%}")
+
+
+def main(argv=None):
+    """
+    Run the benchmarks and write the results to a JSON file.
+    """
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the web scraper")
+    parser.add_argument('benchmarks', nargs='*',
+                        help=f"Benchmarks to run, from: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('-o', '--output', default='benchmark_results.json',
+                        help="Results file (default: %(default)s)")
+    parser.add_argument('--compare', metavar='FILE', help="Earlier results file to diff against")
+    parser.add_argument('--pages', type=int, default=50, help="Pages per scrape scenario")
+    parser.add_argument('--quotes-per-page', type=int, default=10)
+    parser.add_argument('--books-per-page', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="Fixture server latency per request in seconds")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    
+    results = {}
+    for name in args.benchmarks or BENCHMARKS:
+        if name == 'scrape':
+            results[name] = bench_scrape_suite(args.pages, args.quotes_per_page,
+                                               args.books_per_page, args.latency)
+        else:
+            results[name] = BENCHMARKS[name]()
+    
+    report = {
+        'environment': environment(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=4)
+    print(f"\n✅ Results saved to {args.output}")
+    
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            compare_results(json.load(file), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+# ============================================================
+# On-disk HTTP Response Cache for the Web Scraper
+# Features: ETag/Last-Modified Revalidation | TTL Mode | LRU Eviction
+# ============================================================
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+class ResponseCache:
+    """
+    Persistent response cache keyed by URL.
+    
+    Bodies are stored as files in the cache directory and their metadata
+    (validators, size, last access) in a small SQLite index.
+    
+    Two modes are supported:
+        'revalidate' - entries younger than ttl are served directly, older
+                       ones are revalidated with If-None-Match /
+                       If-Modified-Since and a 304 reuses the stored body
+        'ttl'        - entries younger than ttl are served without touching
+                       the network, older ones are downloaded again in full
+    """
+    
+    MODES = ('revalidate', 'ttl')
+    
+    def __init__(self, directory='.scraper_cache', max_bytes=100 * 1024 * 1024,
+                 ttl=0, mode='revalidate'):
+        """
+        Open (or create) a cache directory.
+        
+        Args:
+            directory (str): Where bodies and the index are stored
+            max_bytes (int): Total body size kept before LRU eviction
+            ttl (float): Seconds an entry is served without revalidation
+            mode (str): 'revalidate' or 'ttl' (see class docstring)
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"mode must be one of {self.MODES}, got {mode!r}")
+        
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.mode = mode
+        
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.bytes_saved = 0
+        
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(directory, 'index.sqlite3'), check_same_thread=False
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, url TEXT, etag TEXT, last_modified TEXT,"
+            " stored_at REAL, last_access REAL, size INTEGER)"
+        )
+        self._db.commit()
+        self._evict()  # max_bytes may be smaller than on the last run
+    
+    def _key(self, url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+    
+    def _body_path(self, key):
+        return os.path.join(self.directory, key + '.body')
+    
+    def lookup(self, url):
+        """
+        Find the cached entry for a URL.
+        
+        Returns:
+            dict with etag, last_modified, stored_at and size, or None
+        """
+        key = self._key(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, stored_at, size FROM entries WHERE key = ?",
+                (key,)
+            ).fetchone()
+        
+        if row is None or not os.path.exists(self._body_path(key)):
+            return None
+        
+        etag, last_modified, stored_at, size = row
+        return {'key': key, 'url': url, 'etag': etag, 'last_modified': last_modified,
+                'stored_at': stored_at, 'size': size}
+    
+    def is_fresh(self, entry):
+        """
+        Check whether an entry can be served without contacting the server.
+        """
+        return time.time() - entry['stored_at'] < self.ttl
+    
+    def conditional_headers(self, entry):
+        """
+        Build revalidation headers for a stale entry.
+        
+        Returns:
+            dict: Empty in 'ttl' mode, so the page is downloaded in full
+        """
+        headers = {}
+        if self.mode != 'revalidate':
+            return headers
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def read(self, entry):
+        """
+        Read a cached body and mark the entry as recently used.
+        
+        Returns:
+            bytes: The stored response body
+        """
+        with open(self._body_path(entry['key']), 'rb') as file:
+            body = file.read()
+        
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET last_access = ? WHERE key = ?",
+                (time.time(), entry['key'])
+            )
+            self._db.commit()
+        return body
+    
+    def hit(self, entry):
+        """
+        Serve a fresh entry without any request.
+        """
+        self.hits += 1
+        self.bytes_saved += entry['size']
+        return self.read(entry)
+    
+    def revalidated(self, entry, headers):
+        """
+        Serve an entry after the server answered 304 Not Modified.
+        
+        Args:
+            entry (dict): Entry returned by lookup
+            headers (dict): Headers of the 304 response
+        """
+        self.revalidations += 1
+        self.bytes_saved += entry['size']
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET stored_at = ?, etag = COALESCE(?, etag),"
+                " last_modified = COALESCE(?, last_modified) WHERE key = ?",
+                (time.time(), headers.get('ETag'), headers.get('Last-Modified'), entry['key'])
+            )
+            self._db.commit()
+        return self.read(entry)
+    
+    def store(self, url, body, headers):
+        """
+        Store a freshly downloaded body and evict old entries if needed.
+        
+        Args:
+            url (str): Request URL
+            body (bytes): Response body
+            headers (dict): Response headers (for ETag / Last-Modified)
+        """
+        self.misses += 1
+        key = self._key(url)
+        
+        # Write to a temp file first so a crash never leaves a torn body
+        path = self._body_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            file.write(body)
+        os.replace(tmp_path, path)
+        
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, headers.get('ETag'), headers.get('Last-Modified'),
+                 now, now, len(body))
+            )
+            self._db.commit()
+            self._evict()
+    
+    def _evict(self):
+        """
+        Drop least-recently-used entries until the cache fits max_bytes.
+        Caller must hold the lock.
+        """
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        rows = self._db.execute(
+            "SELECT key, size FROM entries ORDER BY last_access ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            try:
+                os.remove(self._body_path(key))
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._db.commit()
+    
+    def stats(self):
+        """
+        Return hit/miss/revalidation counters.
+        """
+        lookups = self.hits + self.misses + self.revalidations
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'bytes_saved': self.bytes_saved,
+            'hit_ratio': (self.hits + self.revalidations) / lookups if lookups else 0.0,
+        }
+    
+    def close(self):
+        """
+        Close the index database.
+        """
+        self._db.close()
@@ -0,0 +1,226 @@
+# ============================================================
+# Batch Command Line for the Web Scraper
+# Features: Unattended Runs | Lazy Imports | Exit Codes for Schedulers
+# ============================================================
+
+# Only the standard library is imported up front: requests, bs4 and the
+# scraper are loaded by the commands that use them, so --help and the
+# export command start in a few milliseconds
+import argparse
+import sys
+import time
+
+DEFAULT_URLS = {
+    'quotes': 'http://quotes.toscrape.com',
+    'books': 'http://books.toscrape.com',
+}
+FORMATS = ('csv', 'json', 'jsonl', 'txt', 'parquet', 'sqlite')
+
+
+def build_parser():
+    """
+    Build the argument parser of the batch CLI.
+    """
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('-p', '--pages', type=int, default=3,
+                        help='pages to scrape, 0 to follow the pager to the end (default: 3)')
+    common.add_argument('-c', '--concurrency', type=int, default=1,
+                        help='parallel downloads (default: 1)')
+    common.add_argument('-f', '--formats', nargs='+', default=['csv', 'json'], metavar='FORMAT',
+                        help=f"output formats: {', '.join(FORMATS)} (default: csv json)")
+    common.add_argument('-o', '--output', default='scraped_data',
+                        help='output path without extension (default: scraped_data)')
+    common.add_argument('--base-url', help='site to scrape (default depends on the target)')
+    common.add_argument('--delay', type=float, default=1.0,
+                        help='pause between pages without --rate, in seconds (default: 1)')
+    common.add_argument('--rate', type=float,
+                        help='adaptive per-host rate limit in requests/s instead of --delay')
+    common.add_argument('--parser', help='BeautifulSoup parser backend (default: fastest installed)')
+    common.add_argument('--cache', metavar='DIR', help='on-disk HTTP response cache')
+    common.add_argument('--archive', metavar='FILE', help='archive every downloaded response, gzip-compressed')
+    common.add_argument('--replay', metavar='FILE', help='serve all pages from a response archive')
+    common.add_argument('--metrics', metavar='FILE', help='write timings and counters (.prom or .json)')
+    common.add_argument('-q', '--quiet', action='store_true', help='no progress output')
+    
+    parser = argparse.ArgumentParser(
+        prog='scraper_cli.py',
+        description='Scrape quotes, books or any listing without prompts.',
+        epilog='Exit status: 0 when records were saved, 1 when nothing was scraped, 2 on usage errors.',
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    commands.add_parser('quotes', parents=[common], help='quotes.toscrape.com-style quotes')
+    books = commands.add_parser('books', parents=[common], help='books.toscrape.com-style catalogue')
+    books.add_argument('--details', action='store_true',
+                       help='also fetch every book page (UPC, description, stock, category)')
+    
+    url = commands.add_parser('url', parents=[common], help='any listing, with a custom schema')
+    url.add_argument('url', help='first page to scrape')
+    url.add_argument('--container', required=True, help='CSS selector of the repeating element')
+    url.add_argument('--fields', required=True,
+                     help='name=selector[@attribute], comma separated (e.g. "text=span.text, link=a@href")')
+    
+    export = commands.add_parser('export', help='convert saved records (.json or .jsonl) to other formats')
+    export.add_argument('input', help='JSON array or JSON lines file')
+    export.add_argument('-f', '--formats', nargs='+', default=['csv'], metavar='FORMAT',
+                        help=f"output formats: {', '.join(FORMATS)} (default: csv)")
+    export.add_argument('-o', '--output', help='output path without extension (default: input name)')
+    export.add_argument('-q', '--quiet', action='store_true', help='no progress output')
+    
+    query = commands.add_parser('query', help='look up records in a database saved with -f sqlite')
+    query.add_argument('database', help='.sqlite file written by the sqlite format')
+    query.add_argument('--text', help='full-text search of the quote (or book title/description)')
+    query.add_argument('--tag', help='records with this tag')
+    query.add_argument('--author', help='quotes by this author')
+    query.add_argument('--rating', help='books with this rating (3 or Three)')
+    query.add_argument('--min-price', type=float, help='lowest book price')
+    query.add_argument('--max-price', type=float, help='highest book price')
+    query.add_argument('-n', '--limit', type=int, help='print at most this many records')
+    return parser
+
+
+def read_records(path):
+    """
+    Yield the records of a JSON array or JSON lines file.
+    """
+    import json
+    
+    with open(path, encoding='utf-8') as file:
+        if path.endswith('.jsonl'):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(file)
+
+
+def run_export(args, log):
+    """
+    Convert a saved record file; needs neither requests nor bs4.
+    """
+    from itertools import islice
+    
+    from scraper_exporters import FanOutWriter, create_writers
+    
+    basename = args.output or args.input.rsplit('.', 1)[0]
+    writers = create_writers(args.formats, basename)
+    records = read_records(args.input)
+    with FanOutWriter(writers) as fan_out:
+        batch = list(islice(records, 1000))
+        while batch:
+            fan_out.write_many(batch)
+            batch = list(islice(records, 1000))
+    
+    for writer in writers:
+        log(f"✅ Data saved to {writer.filename}")
+    return fan_out.count
+
+
+def run_query(args):
+    """
+    Print the matching records of a saved database as JSON lines.
+    """
+    import json
+    
+    from scraper_index import RecordDatabase
+    
+    rating = int(args.rating) if args.rating and args.rating.isdigit() else args.rating
+    with RecordDatabase(args.database) as database:
+        records = database.find(args.text, args.tag, args.author, rating,
+                                args.min_price, args.max_price, args.limit)
+    for record in records:
+        print(json.dumps(record, ensure_ascii=False))
+    return len(records)
+
+
+def run_scrape(args, log):
+    """
+    Scrape the target and export it in one pass over the records.
+    """
+    from web_scraper import WebScraper
+    
+    options = {'parser': args.parser, 'log': log}
+    if args.rate:
+        from scraper_ratelimit import AdaptiveRateLimiter
+        options['rate_limiter'] = AdaptiveRateLimiter(initial_rate=args.rate, max_rate=args.rate)
+    if args.cache:
+        from scraper_cache import ResponseCache
+        options['cache'] = ResponseCache(args.cache)
+    if args.archive or args.replay:
+        from scraper_archive import ResponseArchive
+        if args.archive:
+            options['archive'] = ResponseArchive(args.archive)
+        if args.replay:
+            options['replay'] = ResponseArchive(args.replay)
+    
+    base_url = args.base_url or (args.url if args.command == 'url' else DEFAULT_URLS[args.command])
+    max_pages = args.pages or None
+    with WebScraper(base_url, **options) as scraper:
+        if args.command == 'url':
+            from scraper_schema import Schema
+            scraper.scrape_with_schema(Schema.from_spec(args.container, args.fields), args.url, max_pages)
+            records = None  # scrape_with_schema fills scraper.data
+        elif args.command == 'books' and args.details:
+            records = scraper.iter_books_with_details(max_pages, concurrency=args.concurrency)
+        elif args.command == 'quotes' and args.concurrency > 1 and max_pages:
+            urls = [f"{base_url}/page/{page}/" for page in range(1, max_pages + 1)]
+            records = scraper.iter_pipeline(urls, 'quotes', fetch_workers=args.concurrency)
+        else:
+            records = scraper.iter_paginated(base_url, args.command, max_pages=max_pages, delay=args.delay)
+        
+        count = scraper.export(args.formats, args.output, records=records)
+        if args.metrics:
+            scraper.metrics.save(args.metrics)
+    
+    for archive in (options.get('archive'), options.get('replay')):
+        if archive is not None:
+            archive.close()
+    return count
+
+
+def main(argv=None):
+    """
+    Run the batch CLI.
+    
+    Returns:
+        int: Exit status
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    
+    if args.command == 'query':
+        try:
+            return 0 if run_query(args) else 1
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+    
+    unknown = [fmt for fmt in args.formats if fmt not in FORMATS]
+    if unknown:
+        parser.error(f"unknown formats: {', '.join(unknown)} (choose from {', '.join(FORMATS)})")
+    if args.command != 'export':
+        if args.pages < 0 or args.concurrency < 1:
+            parser.error("--pages must be >= 0 and --concurrency >= 1")
+        if args.command == 'url':
+            from scraper_schema import Schema
+            try:
+                Schema.from_spec(args.container, args.fields)
+            except ValueError as e:
+                parser.error(f"invalid schema: {e}")
+    
+    log = None if args.quiet else print
+    start = time.perf_counter()
+    try:
+        count = run_export(args, log or (lambda message: None)) if args.command == 'export' \
+            else run_scrape(args, log)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    
+    if log is not None:
+        log(f"\n📊 {count} records in {time.perf_counter() - start:.1f}s")
+    return 0 if count else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
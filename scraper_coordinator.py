@@ -0,0 +1,644 @@
+# ============================================================
+# Sharded Crawl Coordinator for the Web Scraper
+# Features: Host/Hash Sharding | Leased Work Queue | Worker Processes | Merge
+# ============================================================
+
+import hashlib
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+from scraper_dedup import canonicalize_url
+from scraper_ratelimit import AdaptiveRateLimiter
+from web_scraper import WebScraper
+
+Task = namedtuple('Task', 'id url page shard attempt')
+
+
+def shard_for(url, shards, by='host'):
+    """
+    Pick the shard of a URL.
+    
+    by='host' keeps every page of a host on one shard, so the worker that
+    owns the shard is the only one talking to that host and its rate
+    limiter stays the host's only limit. by='hash' spreads the pages of a
+    single host over all shards.
+    """
+    if by == 'host':
+        key = urlsplit(url).netloc.lower()
+    elif by == 'hash':
+        key = canonicalize_url(url)
+    else:
+        raise ValueError(f"by must be 'host' or 'hash', got {by!r}")
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') % shards
+
+
+# ------------------------------------------------------------
+# Work queues
+# ------------------------------------------------------------
+
+class WorkQueue:
+    """
+    Interface of the queue the coordinator and its workers share.
+    
+    A task is leased to one worker at a time. Its lease runs out after
+    lease_seconds; a task whose worker crashed is then handed to the next
+    worker that asks for work on its shard. Every lease is a new attempt,
+    and a task that used up max_attempts is marked failed. complete() is
+    only accepted from the worker holding the current attempt, so a slow
+    worker whose lease was taken over cannot finish the task twice.
+    
+    SQLiteWorkQueue serves all processes of one machine; a queue on a
+    shared service (e.g. Redis or a database server) implementing these
+    methods spreads a crawl over several machines, and MemoryWorkQueue
+    stands in for it in tests.
+    """
+    
+    PENDING = 'pending'
+    LEASED = 'leased'
+    DONE = 'done'
+    FAILED = 'failed'
+    
+    @property
+    def crawl_id(self):
+        """
+        Unique name of the crawl this queue holds, the same in every
+        process; merge_shards() only takes output lines tagged with it.
+        """
+        raise NotImplementedError
+    
+    def put(self, tasks):
+        """
+        Add (url, page, shard) tasks; URLs already queued are ignored.
+        
+        Returns:
+            int: Number of tasks added
+        """
+        raise NotImplementedError
+    
+    def lease(self, worker, shards, limit=1, lease_seconds=120):
+        """
+        Lease up to `limit` pending (or expired) tasks from the given shards.
+        
+        Returns:
+            list of Task, oldest first
+        """
+        raise NotImplementedError
+    
+    def complete(self, task, worker):
+        """
+        Mark a leased task done.
+        
+        Returns:
+            bool: False if the lease was lost to another worker
+        """
+        raise NotImplementedError
+    
+    def fail(self, task, worker, error):
+        """
+        Give a task back after an error, to be retried until max_attempts.
+        """
+        raise NotImplementedError
+    
+    def unfinished(self, shards=None):
+        """
+        Count tasks that are neither done nor failed.
+        """
+        raise NotImplementedError
+    
+    def done_attempts(self):
+        """
+        Map every done task id to the attempt that completed it.
+        """
+        raise NotImplementedError
+    
+    def stats(self):
+        """
+        Count tasks per status.
+        """
+        raise NotImplementedError
+    
+    def close(self):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    Work queue in a SQLite file, shared by all worker processes of one
+    machine.
+    
+    Leases are taken in an IMMEDIATE transaction, so two processes never
+    lease the same task. The queue pickles to its path and reconnects, so
+    it can be handed to spawned worker processes as is.
+    """
+    
+    def __init__(self, path='crawl_queue.sqlite3', max_attempts=3):
+        """
+        Args:
+            path (str): SQLite database file
+            max_attempts (int): Leases per task before it is marked failed
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self._connect()
+    
+    def _connect(self):
+        self._db = sqlite3.connect(self.path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE, page INTEGER,"
+            " shard INTEGER, status TEXT, worker TEXT, lease_until REAL,"
+            " attempt INTEGER DEFAULT 0, error TEXT);"
+            "CREATE INDEX IF NOT EXISTS tasks_shard ON tasks (shard, status, id);"
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);"
+        )
+        self._db.execute("INSERT OR IGNORE INTO meta VALUES ('crawl_id', ?)", (uuid.uuid4().hex,))
+        self._crawl_id = self._db.execute("SELECT value FROM meta WHERE key = 'crawl_id'").fetchone()[0]
+        self._lock = threading.Lock()
+    
+    def __getstate__(self):
+        return {'path': self.path, 'max_attempts': self.max_attempts}
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._connect()
+    
+    @property
+    def crawl_id(self):
+        return self._crawl_id
+    
+    def put(self, tasks):
+        rows = [(url, page, shard, self.PENDING) for url, page, shard in tasks]
+        with self._lock:
+            before = self._db.total_changes
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.executemany(
+                "INSERT OR IGNORE INTO tasks (url, page, shard, status) VALUES (?, ?, ?, ?)", rows
+            )
+            self._db.execute("COMMIT")
+            return self._db.total_changes - before
+    
+    def lease(self, worker, shards, limit=1, lease_seconds=120):
+        now = time.time()
+        marks = ','.join('?' * len(shards))
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                # Expired leases that already used their last attempt give up
+                self._db.execute(
+                    f"UPDATE tasks SET status = ?, error = 'lease expired'"
+                    f" WHERE shard IN ({marks}) AND status = ? AND lease_until < ? AND attempt >= ?",
+                    (self.FAILED, *shards, self.LEASED, now, self.max_attempts)
+                )
+                rows = self._db.execute(
+                    f"SELECT id, url, page, shard, attempt FROM tasks WHERE shard IN ({marks})"
+                    f" AND (status = ? OR (status = ? AND lease_until < ?)) ORDER BY id LIMIT ?",
+                    (*shards, self.PENDING, self.LEASED, now, limit)
+                ).fetchall()
+                self._db.executemany(
+                    "UPDATE tasks SET status = ?, worker = ?, lease_until = ?, attempt = ? WHERE id = ?",
+                    [(self.LEASED, worker, now + lease_seconds, attempt + 1, task_id)
+                     for task_id, _, _, _, attempt in rows]
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return [Task(task_id, url, page, shard, attempt + 1) for task_id, url, page, shard, attempt in rows]
+    
+    def complete(self, task, worker):
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE tasks SET status = ?, lease_until = NULL, error = NULL"
+                " WHERE id = ? AND worker = ? AND attempt = ? AND status = ?",
+                (self.DONE, task.id, worker, task.attempt, self.LEASED)
+            )
+            return cursor.rowcount == 1
+    
+    def fail(self, task, worker, error):
+        with self._lock:
+            self._db.execute(
+                "UPDATE tasks SET status = CASE WHEN attempt >= ? THEN ? ELSE ? END,"
+                " lease_until = NULL, error = ? WHERE id = ? AND worker = ? AND attempt = ? AND status = ?",
+                (self.max_attempts, self.FAILED, self.PENDING, str(error),
+                 task.id, worker, task.attempt, self.LEASED)
+            )
+    
+    def unfinished(self, shards=None):
+        query = "SELECT COUNT(*) FROM tasks WHERE status IN (?, ?)"
+        params = [self.PENDING, self.LEASED]
+        if shards is not None:
+            query += f" AND shard IN ({','.join('?' * len(shards))})"
+            params += list(shards)
+        with self._lock:
+            return self._db.execute(query, params).fetchone()[0]
+    
+    def done_attempts(self):
+        with self._lock:
+            return dict(self._db.execute("SELECT id, attempt FROM tasks WHERE status = ?", (self.DONE,)))
+    
+    def stats(self):
+        with self._lock:
+            return dict(self._db.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status"))
+    
+    def close(self):
+        self._db.close()
+
+
+class MemoryWorkQueue(WorkQueue):
+    """
+    In-process work queue with the same semantics as SQLiteWorkQueue.
+    
+    Stands in for a networked queue in tests and for threaded runs
+    (CrawlCoordinator.run(processes=False)); it cannot be shared between
+    processes.
+    """
+    
+    def __init__(self, max_attempts=3):
+        self.max_attempts = max_attempts
+        self._tasks = {}  # id -> [url, page, shard, status, worker, lease_until, attempt, error]
+        self._urls = set()
+        self._lock = threading.Lock()
+        self._crawl_id = uuid.uuid4().hex
+    
+    def __reduce__(self):
+        raise TypeError("MemoryWorkQueue cannot be shared between processes, "
+                        "use SQLiteWorkQueue or run(processes=False)")
+    
+    @property
+    def crawl_id(self):
+        return self._crawl_id
+    
+    def put(self, tasks):
+        added = 0
+        with self._lock:
+            for url, page, shard in tasks:
+                if url in self._urls:
+                    continue
+                self._urls.add(url)
+                self._tasks[len(self._tasks) + 1] = [url, page, shard, self.PENDING, None, None, 0, None]
+                added += 1
+        return added
+    
+    def lease(self, worker, shards, limit=1, lease_seconds=120):
+        now = time.time()
+        leased = []
+        with self._lock:
+            for task_id, task in self._tasks.items():
+                if len(leased) >= limit:
+                    break
+                if task[2] not in shards:
+                    continue
+                expired = task[3] == self.LEASED and task[5] < now
+                if expired and task[6] >= self.max_attempts:
+                    task[3], task[7] = self.FAILED, 'lease expired'
+                    continue
+                if task[3] == self.PENDING or expired:
+                    task[3:7] = [self.LEASED, worker, now + lease_seconds, task[6] + 1]
+                    leased.append(Task(task_id, task[0], task[1], task[2], task[6]))
+        return leased
+    
+    def _held(self, task, worker):
+        entry = self._tasks.get(task.id)
+        if entry is None or entry[3] != self.LEASED or entry[4] != worker or entry[6] != task.attempt:
+            return None
+        return entry
+    
+    def complete(self, task, worker):
+        with self._lock:
+            entry = self._held(task, worker)
+            if entry is None:
+                return False
+            entry[3], entry[5], entry[7] = self.DONE, None, None
+            return True
+    
+    def fail(self, task, worker, error):
+        with self._lock:
+            entry = self._held(task, worker)
+            if entry is not None:
+                entry[3] = self.FAILED if entry[6] >= self.max_attempts else self.PENDING
+                entry[5], entry[7] = None, str(error)
+    
+    def unfinished(self, shards=None):
+        with self._lock:
+            return sum(1 for task in self._tasks.values()
+                       if task[3] in (self.PENDING, self.LEASED) and (shards is None or task[2] in shards))
+    
+    def done_attempts(self):
+        with self._lock:
+            return {task_id: task[6] for task_id, task in self._tasks.items() if task[3] == self.DONE}
+    
+    def stats(self):
+        counts = {}
+        with self._lock:
+            for task in self._tasks.values():
+                counts[task[3]] = counts.get(task[3], 0) + 1
+        return counts
+
+
+# ------------------------------------------------------------
+# Workers
+# ------------------------------------------------------------
+
+def run_worker(queue, shards, base_url, kind='quotes', output_dir='crawl_shards', worker_id=None,
+               batch_size=5, lease_seconds=120, shard_count=None, shard_by='host', follow_next=False,
+               rate=2.0, poll_interval=1.0, log=print):
+    """
+    Crawl the tasks of some shards until none are left.
+    
+    Can run in a coordinator's worker process or on its own on another
+    machine, given a queue every machine can reach. Records go to the
+    worker's own JSON-lines file, <output_dir>/shard-<worker_id>.jsonl,
+    one line per record tagged with the queue's crawl id, its task and
+    its attempt; merge_shards() keeps only the lines of the attempt that
+    completed each task in this crawl, so a task redone after a lost
+    lease is never merged twice, nor are records of an earlier crawl
+    into the same directory.
+    
+    Args:
+        queue (WorkQueue): Shared work queue
+        shards (list): Shard numbers this worker takes tasks from
+        base_url (str): Base URL of the scraper
+        kind (str): 'quotes' or 'books'
+        output_dir (str): Directory of the shard output files
+        worker_id (str): Unique worker name, <hostname>-<pid>-<thread id>
+            by default
+        batch_size (int): Tasks leased at a time
+        lease_seconds (float): Lease length; must cover a whole batch
+        shard_count (int): Total shards, needed with follow_next
+        shard_by (str): Sharding used for followed links ('host' or 'hash')
+        follow_next (bool): Queue each page's "next" link as a new task
+        rate (float): Requests per second per host for this worker, None
+            for no rate limiter
+        poll_interval (float): Wait between checks while other workers
+            still hold leases on these shards
+        log (callable): Progress sink passed to the scraper
+    
+    Returns:
+        dict: Tasks completed and failed and records written
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{threading.get_native_id()}"
+    os.makedirs(output_dir, exist_ok=True)
+    limiter = AdaptiveRateLimiter(initial_rate=rate, max_rate=rate) if rate else None
+    counts = {'completed': 0, 'failed': 0, 'lost': 0, 'records': 0}
+    
+    path = os.path.join(output_dir, f"shard-{worker_id}.jsonl")
+    with open(path, 'a', encoding='utf-8') as output, \
+            WebScraper(base_url, rate_limiter=limiter, log=log) as scraper:
+        while True:
+            tasks = queue.lease(worker_id, shards, batch_size, lease_seconds)
+            if not tasks:
+                if not queue.unfinished(shards):
+                    break
+                time.sleep(poll_interval)  # Leases held elsewhere may still expire
+                continue
+            
+            for task in tasks:
+                content = scraper.fetch_raw(task.url)
+                if content is None:
+                    queue.fail(task, worker_id, 'fetch failed')
+                    counts['failed'] += 1
+                    continue
+                
+                try:
+                    records = scraper.parse_records(kind, content, task.page) or []
+                except Exception as e:
+                    scraper.report_error(f"❌ Error parsing {task.url}: {e}", e)
+                    queue.fail(task, worker_id, repr(e))
+                    counts['failed'] += 1
+                    continue
+                
+                output.writelines(
+                    json.dumps({'crawl': queue.crawl_id, 'task': task.id, 'attempt': task.attempt,
+                                'record': record}, ensure_ascii=False) + '\n'
+                    for record in records
+                )
+                output.flush()  # Records must be on disk before the task is done
+                
+                if follow_next and records:
+                    next_url = scraper.find_next_link(content, task.url)
+                    if next_url:
+                        queue.put([(next_url, task.page + 1, shard_for(next_url, shard_count, shard_by))])
+                
+                if queue.complete(task, worker_id):
+                    counts['completed'] += 1
+                    counts['records'] += len(records)
+                else:
+                    counts['lost'] += 1  # Lease expired and was taken over
+    
+    scraper.log(f"✅ Worker {worker_id} finished: {counts['completed']} tasks, "
+                f"{counts['records']} records, {counts['failed']} failed")
+    return counts
+
+
+def _worker_process(queue, shards, options):
+    run_worker(queue, shards, **options)
+
+
+# ------------------------------------------------------------
+# Merging
+# ------------------------------------------------------------
+
+def merge_shards(queue, output_dir='crawl_shards'):
+    """
+    Combine the worker output files into one record stream in task order.
+    
+    Lines from attempts that did not complete their task (a crashed or
+    overtaken worker) and from other crawls that wrote to the same
+    directory are dropped. Records are sorted through a temporary
+    SQLite file, so memory does not grow with the size of the crawl.
+    
+    Yields:
+        dict: One record
+    """
+    accepted = queue.done_attempts()
+    crawl_id = queue.crawl_id
+    with tempfile.TemporaryDirectory() as directory:
+        db = sqlite3.connect(os.path.join(directory, 'merge.sqlite3'))
+        db.execute("CREATE TABLE records (task INTEGER, seq INTEGER, data TEXT)")
+        seq = 0
+        for name in sorted(os.listdir(output_dir)):
+            if not (name.startswith('shard-') and name.endswith('.jsonl')):
+                continue
+            rows = []
+            with open(os.path.join(output_dir, name), encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Torn last line of a crashed worker
+                    if entry.get('crawl') == crawl_id and accepted.get(entry['task']) == entry['attempt']:
+                        seq += 1
+                        rows.append((entry['task'], seq, json.dumps(entry['record'], ensure_ascii=False)))
+            db.executemany("INSERT INTO records VALUES (?, ?, ?)", rows)
+        db.commit()
+        
+        try:
+            for (data,) in db.execute("SELECT data FROM records ORDER BY task, seq"):
+                yield json.loads(data)
+        finally:
+            db.close()
+
+
+# ------------------------------------------------------------
+# Coordinator
+# ------------------------------------------------------------
+
+class CrawlCoordinator:
+    """
+    Splits a crawl over worker processes by shard and merges the results.
+    
+    URLs are sharded by host (or hash) into `shards` shards and every
+    worker owns a fixed set of shards. A worker process that dies is
+    restarted for the same shards; its leased tasks go to the new worker
+    once their leases run out. merge()/export() then combine the shard
+    outputs into one export.
+    """
+    
+    def __init__(self, queue, base_url, kind='quotes', shards=4, shard_by='host',
+                 output_dir='crawl_shards', log=print):
+        """
+        Args:
+            queue (WorkQueue): Shared work queue (e.g. SQLiteWorkQueue)
+            base_url (str): Base URL of the workers' scrapers
+            kind (str): 'quotes' or 'books'
+            shards (int): Number of shards the URL space is split into
+            shard_by (str): 'host' or 'hash' (see shard_for)
+            output_dir (str): Directory of the shard output files
+            log (callable): Progress sink, None for silence
+        """
+        self.queue = queue
+        self.base_url = base_url
+        self.kind = kind
+        self.shards = shards
+        self.shard_by = shard_by
+        self.output_dir = output_dir
+        self.log_sink = log
+    
+    def log(self, message):
+        if self.log_sink is not None:
+            self.log_sink(message)
+    
+    def seed(self, urls, first_page=1):
+        """
+        Queue start URLs, numbered as pages from first_page on.
+        
+        Returns:
+            int: Number of new tasks
+        """
+        added = self.queue.put(
+            (url, page, shard_for(url, self.shards, self.shard_by))
+            for page, url in enumerate(urls, first_page)
+        )
+        self.log(f"📥 Queued {added} URLs over {self.shards} shards")
+        return added
+    
+    def assignments(self, workers):
+        """
+        Split the shards round-robin over `workers` workers.
+        """
+        workers = min(workers, self.shards)
+        return [list(range(idx, self.shards, workers)) for idx in range(workers)]
+    
+    def run(self, workers=None, processes=True, max_restarts=3, **worker_options):
+        """
+        Crawl every queued task with a pool of workers.
+        
+        Args:
+            workers (int): Number of workers, one per shard by default
+            processes (bool): Use worker processes; False runs the workers
+                as threads of this process (e.g. with a MemoryWorkQueue)
+            max_restarts (int): Restarts per worker after it crashed
+            **worker_options: Passed to run_worker (batch_size,
+                lease_seconds, follow_next, rate, ...)
+        
+        Returns:
+            dict: Task counts per status
+        """
+        options = dict(worker_options, base_url=self.base_url, kind=self.kind, output_dir=self.output_dir,
+                       shard_count=self.shards, shard_by=self.shard_by)
+        options.setdefault('log', self.log_sink if processes is False else None)
+        assignments = self.assignments(workers or self.shards)
+        self.log(f"🚀 Starting {len(assignments)} workers for {self.shards} shards")
+        
+        if not processes:
+            # Links followed into a shard whose worker already finished
+            # are picked up by another round
+            pending = assignments
+            while pending:
+                threads = [threading.Thread(target=run_worker, args=(self.queue, shards), kwargs=options)
+                           for shards in pending]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                pending = [shards for shards in assignments if self.queue.unfinished(shards)]
+        else:
+            context = multiprocessing.get_context('spawn')
+            
+            def start(shards):
+                process = context.Process(target=_worker_process, args=(self.queue, shards, options))
+                process.start()
+                return process
+            
+            running = {idx: start(shards) for idx, shards in enumerate(assignments)}
+            restarts = dict.fromkeys(running, 0)
+            while running:
+                for idx, process in list(running.items()):
+                    process.join(timeout=0.2)
+                    if process.exitcode is None:
+                        continue
+                    del running[idx]
+                    shards = assignments[idx]
+                    if process.exitcode == 0 or not self.queue.unfinished(shards):
+                        continue
+                    if restarts[idx] < max_restarts:
+                        restarts[idx] += 1
+                        self.log(f"⚠️ Worker for shards {shards} exited with code "
+                                 f"{process.exitcode}, restarting")
+                        running[idx] = start(shards)
+                    else:
+                        restarts[idx] = None
+                        self.log(f"❌ Worker for shards {shards} keeps crashing, giving up")
+                
+                if not running:
+                    # Links followed into a shard whose worker already finished
+                    for idx, shards in enumerate(assignments):
+                        if restarts[idx] is not None and self.queue.unfinished(shards):
+                            running[idx] = start(shards)
+        
+        stats = self.queue.stats()
+        self.log(f"📊 Crawl finished: {stats}")
+        return stats
+    
+    def merge(self):
+        """
+        Yield the merged records of all shards, in task order.
+        """
+        return merge_shards(self.queue, self.output_dir)
+    
+    def export(self, formats=('csv', 'json'), basename='scraped_data', **export_options):
+        """
+        Merge the shard outputs and write them with WebScraper.export().
+        
+        Returns:
+            int: Number of records written
+        """
+        with WebScraper(self.base_url, log=self.log_sink) as scraper:
+            return scraper.export(formats, basename, records=self.merge(), **export_options)
@@ -0,0 +1,178 @@
+# ============================================================
+# Incremental Re-scrape Change Tracking for the Web Scraper
+# Features: Record Hashes | Page Body Hashes | Insert/Update/Delete Delta
+# ============================================================
+
+import hashlib
+import json
+import sqlite3
+
+
+class ChangeTracker:
+    """
+    Remembers what the previous run scraped so the next run can report
+    only what changed.
+    
+    Each record is identified by a key (quote text + author for quotes,
+    title for books) and stored with a hash of its content. Each page is
+    stored with a hash of its raw body: when the body has not changed the
+    page is not parsed at all and its stored records are reused.
+    
+    Usage per run: begin(), then unchanged_page()/observe() for every page
+    (fetch_failed() for a page that could not be downloaded), then finish()
+    to collect the deletions and get the full change list.
+    Nothing is saved until finish() (or commit() after finish(commit=False));
+    a run that is interrupted or closed early is rolled back.
+    """
+    
+    INSERT = 'insert'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    
+    def __init__(self, path='scrape_state.sqlite3', key_fields=None, ignore_fields=('scraped_at',)):
+        """
+        Args:
+            path (str): SQLite file holding the previous run's state
+            key_fields (tuple): Fields identifying a record, guessed from
+                the record shape when None
+            ignore_fields (tuple): Fields left out of the content hash
+        """
+        self.path = path
+        self.key_fields = key_fields
+        self.ignore_fields = frozenset(ignore_fields)
+        self.run = None
+        self.changes = []
+        self.failed = []
+        self._db = sqlite3.connect(path)
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, body_hash TEXT);"
+            "CREATE TABLE IF NOT EXISTS records ("
+            " key TEXT PRIMARY KEY, url TEXT, hash TEXT, data TEXT, run INTEGER);"
+            "CREATE INDEX IF NOT EXISTS records_url ON records (url, key);"
+        )
+        self._db.commit()
+    
+    def record_key(self, record):
+        """
+        Build the identity of a record.
+        """
+        fields = self.key_fields
+        if fields is None:
+            fields = ('quote', 'author') if 'quote' in record else ('title',)
+        return json.dumps([record.get(field) for field in fields], ensure_ascii=False)
+    
+    def content_hash(self, record):
+        content = {key: value for key, value in record.items() if key not in self.ignore_fields}
+        text = json.dumps(content, sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def begin(self):
+        """
+        Start a new run.
+        """
+        last = self._db.execute("SELECT COALESCE(MAX(run), 0) FROM records").fetchone()[0]
+        self.run = last + 1
+        self.changes = []
+        self.failed = []
+    
+    def unchanged_page(self, url, content):
+        """
+        Compare a page body with the previous run.
+        
+        Returns:
+            list of the page's stored records if the body is unchanged
+            (those records are marked as still present), otherwise None
+        """
+        body_hash = hashlib.blake2b(content, digest_size=16).hexdigest()
+        row = self._db.execute("SELECT body_hash FROM pages WHERE url = ?", (url,)).fetchone()
+        self._db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?)", (url, body_hash))
+        if row is None or row[0] != body_hash:
+            return None
+        
+        self._db.execute("UPDATE records SET run = ? WHERE url = ?", (self.run, url))
+        rows = self._db.execute("SELECT data FROM records WHERE url = ? ORDER BY rowid", (url,))
+        return [json.loads(data) for (data,) in rows]
+    
+    def fetch_failed(self, url):
+        """
+        Note a page that could not be downloaded. The run then did not see
+        the whole listing, so finish() reports no deletions.
+        """
+        self.failed.append(url)
+    
+    def observe(self, url, records):
+        """
+        Compare freshly parsed records with the previous run.
+        
+        Returns:
+            list of (op, key, record) changes found on this page
+        """
+        changes = []
+        for record in records:
+            key = self.record_key(record)
+            digest = self.content_hash(record)
+            row = self._db.execute("SELECT hash FROM records WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                changes.append((self.INSERT, key, record))
+            elif row[0] != digest:
+                changes.append((self.UPDATE, key, record))
+            
+            # Re-insert so the page's records keep document order by rowid
+            self._db.execute("DELETE FROM records WHERE key = ?", (key,))
+            self._db.execute(
+                "INSERT INTO records VALUES (?, ?, ?, ?, ?)",
+                (key, url, digest, json.dumps(record, ensure_ascii=False), self.run)
+            )
+        self.changes.extend(changes)
+        return changes
+    
+    def finish(self, commit=True):
+        """
+        Close the run: records not seen this run are reported as deleted,
+        unless a page failed to download (see fetch_failed).
+        
+        Args:
+            commit (bool): Save the new state now; with False call commit()
+                once the changes have been stored elsewhere, or rollback()
+                
+        Returns:
+            list of (op, key, record) for the whole run
+        """
+        if not self.failed:
+            rows = self._db.execute(
+                "SELECT key, data FROM records WHERE run < ? ORDER BY rowid", (self.run,)
+            ).fetchall()
+            self.changes.extend((self.DELETE, key, json.loads(data)) for key, data in rows)
+            # Forget the body hashes of the pages those records came from, or
+            # an unchanged page would come back as one without records
+            self._db.execute(
+                "DELETE FROM pages WHERE url IN (SELECT url FROM records WHERE run < ?)", (self.run,)
+            )
+            self._db.execute("DELETE FROM records WHERE run < ?", (self.run,))
+        if commit:
+            self.commit()
+        return self.changes
+    
+    def commit(self):
+        """
+        Make the finished run the state the next run compares against.
+        """
+        self._db.commit()
+    
+    def rollback(self):
+        """
+        Drop everything recorded since the last commit.
+        """
+        self._db.rollback()
+    
+    def close(self):
+        self.rollback()  # Only finish()/commit() make a run durable
+        self._db.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.rollback()
+        self.close()
@@ -0,0 +1,520 @@
+# ============================================================
+# Incremental Record Writers for the Web Scraper
+# Formats: CSV | JSON Array | JSON Lines | TXT | Parquet | SQLite
+# ============================================================
+
+import csv
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+
+
+class RecordWriter:
+    """
+    Base class for writers that receive records one at a time.
+    
+    Records are buffered and formatted/written to disk a batch at a time
+    every `batch_size` records, so a crash loses at most one batch and
+    memory does not grow with the number of records.
+    """
+    
+    def __init__(self, filename, batch_size=100):
+        """
+        Args:
+            filename (str): Output file path
+            batch_size (int): Records buffered before each flush
+        """
+        self.filename = filename
+        self.batch_size = batch_size
+        self.count = 0
+        self.written = 0
+        self._buffer = []
+        self._file = None
+    
+    def open(self):
+        self._file = open(self.filename, 'w', newline='', encoding='utf-8')
+        self.write_header()
+        return self
+    
+    def write(self, record):
+        """
+        Buffer one record, flushing full batches.
+        """
+        self.count += 1
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+    
+    def write_many(self, records):
+        """
+        Buffer a list of records, flushing full batches.
+        """
+        self.count += len(records)
+        self._buffer.extend(records)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        if self._buffer:
+            self.write_batch(self._buffer)
+            self.written += len(self._buffer)
+            self._buffer = []
+        self._file.flush()
+    
+    def close(self):
+        if self._file is None:
+            return
+        try:
+            self.flush()
+            self.write_footer()
+        finally:
+            self._file.close()
+            self._file = None
+    
+    def __enter__(self):
+        return self.open()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    # Format hooks
+    def write_header(self):
+        pass
+    
+    def write_batch(self, records):
+        raise NotImplementedError
+    
+    def write_footer(self):
+        pass
+
+
+class CsvRecordWriter(RecordWriter):
+    """
+    CSV rows; the header comes from the keys of the first record.
+    """
+    
+    def __init__(self, filename, batch_size=100):
+        super().__init__(filename, batch_size)
+        self._writer = None
+    
+    def write_batch(self, records):
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=records[0].keys())
+            self._writer.writeheader()
+        self._writer.writerows(records)
+
+
+class JsonRecordWriter(RecordWriter):
+    """
+    A streamed JSON array, byte-identical to json.dump(records, indent=4)
+    when indent is 4. Use indent=None for compact output.
+    """
+    
+    def __init__(self, filename, batch_size=100, indent=4):
+        super().__init__(filename, batch_size)
+        self.indent = indent
+    
+    def write_header(self):
+        self._file.write('[')
+    
+    def write_batch(self, records):
+        # Encode the whole batch as one array and splice it into the stream
+        if self.indent is None:
+            text = json.dumps(records, ensure_ascii=False, separators=(',', ':'))[1:-1]
+        else:
+            text = json.dumps(records, indent=self.indent, ensure_ascii=False)[1:-2]
+        self._file.write(',' + text if self.written else text)
+    
+    def write_footer(self):
+        self._file.write('\n]' if self.written and self.indent is not None else ']')
+
+
+class JsonLinesRecordWriter(RecordWriter):
+    """
+    One compact JSON object per line.
+    """
+    
+    def write_batch(self, records):
+        encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+        self._file.write(''.join([encode(record) + '\n' for record in records]))
+
+
+class TxtRecordWriter(RecordWriter):
+    """
+    Numbered "key: value" blocks, same layout as WebScraper.save_to_txt.
+    """
+    
+    def write_batch(self, records):
+        lines = []
+        for idx, record in enumerate(records, self.written + 1):
+            lines.append(f"--- Record {idx} ---\n")
+            lines.extend([f"{key}: {value}\n" for key, value in record.items()])
+            lines.append("\n")
+        self._file.write(''.join(lines))
+
+
+def parse_price(value):
+    """
+    Turn a scraped price such as '£51.77' into a float (None if unparseable).
+    """
+    if isinstance(value, (int, float)) or value is None:
+        return value
+    try:
+        return float(re.sub(r'[^0-9.]', '', value))
+    except ValueError:
+        return None
+
+
+def split_tags(value):
+    """
+    Tags of a record: a list, or the ', '-joined string of QUOTE_SCHEMA.
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [tag.strip() for tag in value if tag.strip()]
+
+
+class ParquetRecordWriter(RecordWriter):
+    """
+    Columnar Parquet output, one row group per batch.
+    
+    Requires the optional pyarrow package. The schema is taken from the
+    first batch: repetitive text fields are dictionary-encoded, prices are
+    stored as float64 and integers as int64, so analytics jobs can filter
+    on them without parsing strings.
+    """
+    
+    DICTIONARY_FIELDS = frozenset(['author', 'tags', 'rating', 'availability', 'scraped_at'])
+    NUMERIC_FIELDS = frozenset(['price'])
+    INTEGER_FIELDS = frozenset(['page', 'stock'])
+    
+    def __init__(self, filename, batch_size=50000, compression='snappy'):
+        """
+        Args:
+            filename (str): Output file path
+            batch_size (int): Rows per row group
+            compression (str): Parquet compression codec
+        """
+        super().__init__(filename, batch_size)
+        self.compression = compression
+        self._schema = None
+    
+    def open(self):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Parquet export needs pyarrow: pip install pyarrow") from None
+        
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        return self
+    
+    def _build_schema(self, records):
+        """
+        Column types of known fields are fixed; others follow the first
+        non-None value in the batch. Every column is nullable, so a failed
+        detail page (stock=None) does not decide the type of the column.
+        """
+        pa = self._pa
+        fields = []
+        for name in records[0]:
+            value = next((record.get(name) for record in records if record.get(name) is not None), None)
+            if name in self.NUMERIC_FIELDS:
+                fields.append(pa.field(name, pa.float64()))
+            elif name in self.INTEGER_FIELDS:
+                fields.append(pa.field(name, pa.int64()))
+            elif name in self.DICTIONARY_FIELDS:
+                fields.append(pa.field(name, pa.dictionary(pa.int32(), pa.string())))
+            elif isinstance(value, int) and not isinstance(value, bool):
+                fields.append(pa.field(name, pa.int64()))
+            else:
+                fields.append(pa.field(name, pa.string()))
+        return pa.schema(fields)
+    
+    def write_batch(self, records):
+        if self._schema is None:
+            self._schema = self._build_schema(records)
+            self._file = self._pq.ParquetWriter(
+                self.filename, self._schema, compression=self.compression
+            )
+        
+        columns = []
+        for field in self._schema:
+            values = [record[field.name] for record in records]
+            if field.name in self.NUMERIC_FIELDS:
+                values = [parse_price(value) for value in values]
+            columns.append(self._pa.array(values, type=field.type))
+        
+        table = self._pa.Table.from_arrays(columns, schema=self._schema)
+        self._file.write_table(table, row_group_size=len(records))
+    
+    def flush(self):
+        if self._buffer:
+            self.write_batch(self._buffer)
+            self.written += len(self._buffer)
+            self._buffer = []
+    
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class SQLiteRecordWriter(RecordWriter):
+    """
+    A queryable SQLite database, one transaction per batch.
+    
+    Records go into a `records` table whose columns come from the first
+    record (prices stored as REAL), with indexes on author, rating and
+    price, a `record_tags` table mapping each tag to its records, and an
+    FTS5 full-text index over the text fields. Read it back with
+    scraper_index.RecordDatabase.
+    """
+    
+    TEXT_FIELDS = ('quote', 'text', 'title', 'description')
+    INDEXED_FIELDS = ('author', 'rating', 'price')
+    NUMERIC_FIELDS = frozenset(['price'])
+    
+    def __init__(self, filename, batch_size=1000):
+        super().__init__(filename, batch_size)
+        self._columns = None
+        self._text_fields = None
+        self._insert = None
+    
+    def open(self):
+        if os.path.exists(self.filename):
+            os.remove(self.filename)  # Same as truncating the other formats' files
+        self._file = sqlite3.connect(self.filename)
+        # WAL commits a batch without syncing every one to disk
+        self._file.execute("PRAGMA journal_mode = WAL")
+        self._file.execute("PRAGMA synchronous = NORMAL")
+        return self
+    
+    def _create_tables(self, record):
+        self._columns = list(record)
+        columns = []
+        for name, value in record.items():
+            if name in self.NUMERIC_FIELDS:
+                kind = 'REAL'
+            elif isinstance(value, int) and not isinstance(value, bool):
+                kind = 'INTEGER'
+            else:
+                kind = 'TEXT'
+            columns.append(f'"{name}" {kind}')
+        
+        statements = [
+            f"CREATE TABLE records (id INTEGER PRIMARY KEY, {', '.join(columns)})",
+            "CREATE TABLE record_tags (tag TEXT, record_id INTEGER, PRIMARY KEY (tag, record_id)) WITHOUT ROWID",
+        ]
+        for name in self.INDEXED_FIELDS:
+            if name in record:
+                collate = ' COLLATE NOCASE' if name == 'author' else ''
+                statements.append(f'CREATE INDEX records_{name} ON records ("{name}"{collate})')
+        self._text_fields = [name for name in self.TEXT_FIELDS if name in record]
+        if self._text_fields:
+            fields = ', '.join(f'"{name}"' for name in self._text_fields)
+            statements.append(
+                f"CREATE VIRTUAL TABLE records_fts USING fts5({fields}, content='records', content_rowid='id')"
+            )
+        self._file.executescript(';'.join(statements))
+        
+        placeholders = ', '.join('?' * (len(self._columns) + 1))
+        self._insert = f"INSERT INTO records VALUES ({placeholders})"
+    
+    def write_batch(self, records):
+        if self._columns is None:
+            self._create_tables(records[0])
+        
+        rows, tags = [], []
+        for record_id, record in enumerate(records, self.written + 1):
+            row = [record_id]
+            for name in self._columns:
+                value = record.get(name)
+                if name in self.NUMERIC_FIELDS:
+                    value = parse_price(value)
+                elif isinstance(value, (list, tuple)):
+                    value = ', '.join(map(str, value))
+                row.append(value)
+            rows.append(row)
+            
+            tags.extend({(tag.casefold(), record_id) for tag in split_tags(record.get('tags'))})
+        
+        with self._file:
+            self._file.executemany(self._insert, rows)
+            self._file.executemany("INSERT INTO record_tags VALUES (?, ?)", tags)
+            if self._text_fields:
+                fields = ', '.join(f'"{name}"' for name in self._text_fields)
+                placeholders = ', '.join('?' * (len(self._text_fields) + 1))
+                self._file.executemany(
+                    f"INSERT INTO records_fts (rowid, {fields}) VALUES ({placeholders})",
+                    [[row[0]] + [record.get(name) for name in self._text_fields]
+                     for row, record in zip(rows, records)]
+                )
+    
+    def flush(self):
+        if self._buffer:
+            self.write_batch(self._buffer)
+            self.written += len(self._buffer)
+            self._buffer = []
+    
+    def close(self):
+        if self._file is None:
+            return
+        try:
+            self.flush()
+            # Table statistics let the query planner start from the most
+            # selective index; back to a single file for read-only readers
+            self._file.execute("ANALYZE")
+            self._file.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            self._file.close()
+            self._file = None
+
+
+class FanOutWriter:
+    """
+    Sends each record to several writers in a single pass.
+    
+    Records are handed over in batches to keep per-record overhead low.
+    With threaded=True every writer runs on its own background thread and
+    receives records in batches through a bounded queue, so file I/O for
+    the formats overlaps instead of running one after another.
+    """
+    
+    def __init__(self, writers, threaded=False, batch_size=1000, queue_size=4):
+        """
+        Args:
+            writers (list): RecordWriter instances
+            threaded (bool): Run each writer on a background thread
+            batch_size (int): Records handed to the writers at a time
+            queue_size (int): Batches queued per writer before write() blocks
+        """
+        self.writers = writers
+        self.threaded = threaded
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.count = 0
+        self._batch = []
+        self._queues = []
+        self._threads = []
+        self._errors = []
+    
+    def open(self):
+        for writer in self.writers:
+            writer.open()
+        
+        if self.threaded:
+            for writer in self.writers:
+                batches = queue.Queue(maxsize=self.queue_size)
+                thread = threading.Thread(target=self._drain, args=(writer, batches), daemon=True)
+                thread.start()
+                self._queues.append(batches)
+                self._threads.append(thread)
+        return self
+    
+    def _drain(self, writer, batches):
+        """
+        Background loop: write batches until the None sentinel arrives.
+        """
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+            if self._errors:
+                continue  # Keep draining so the producer never blocks
+            try:
+                writer.write_many(batch)
+            except Exception as e:
+                self._errors.append(e)
+    
+    def write(self, record):
+        self.count += 1
+        self._batch.append(record)
+        if len(self._batch) >= self.batch_size:
+            self._dispatch()
+    
+    def write_many(self, records):
+        self.count += len(records)
+        self._batch.extend(records)
+        if len(self._batch) >= self.batch_size:
+            self._dispatch()
+    
+    def _dispatch(self):
+        if self._batch:
+            if self.threaded:
+                for batches in self._queues:
+                    batches.put(self._batch)
+            else:
+                for writer in self.writers:
+                    writer.write_many(self._batch)
+            self._batch = []
+        if self._errors:
+            raise self._errors[0]
+    
+    def close(self):
+        try:
+            self._dispatch()
+        finally:
+            for batches in self._queues:
+                batches.put(None)
+            for thread in self._threads:
+                thread.join()
+            for writer in self.writers:
+                writer.close()
+        if self._errors:
+            raise self._errors[0]
+    
+    def __enter__(self):
+        return self.open()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+WRITERS = {
+    'csv': CsvRecordWriter,
+    'json': JsonRecordWriter,
+    'jsonl': JsonLinesRecordWriter,
+    'txt': TxtRecordWriter,
+    'parquet': ParquetRecordWriter,
+    'sqlite': SQLiteRecordWriter,
+}
+
+
+def create_writers(formats, basename, batch_size=1000, compact_json=False):
+    """
+    Build one writer per format, writing <basename>.<format>.
+    
+    Args:
+        formats (iterable): Any of the WRITERS keys
+        basename (str): Output path without extension
+        batch_size (int): Records buffered per writer between flushes
+        compact_json (bool): Write JSON without indentation
+        
+    Raises:
+        ValueError: For unknown formats
+    """
+    unknown = [fmt for fmt in formats if fmt not in WRITERS]
+    if unknown:
+        raise ValueError(f"Unknown export formats: {', '.join(unknown)}")
+    
+    writers = []
+    for fmt in formats:
+        filename = f"{basename}.{fmt}"
+        if fmt == 'json':
+            writers.append(JsonRecordWriter(filename, batch_size, indent=None if compact_json else 4))
+        elif fmt == 'parquet':
+            writers.append(ParquetRecordWriter(filename))  # Keep row groups large
+        else:
+            writers.append(WRITERS[fmt](filename, batch_size))
+    return writers
+
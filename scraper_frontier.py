@@ -0,0 +1,133 @@
+# ============================================================
+# Resumable Crawl Frontier for the Web Scraper
+# Features: Persistent Checkpoints | Batched Writes | Record Replay
+# ============================================================
+
+import json
+import sqlite3
+
+
+class CrawlFrontier:
+    """
+    SQLite-backed record of which pages a crawl still has to fetch, which
+    ones are done and the records each finished page produced.
+    
+    Page completions are buffered and written in one transaction every
+    `batch_size` pages (and on checkpoint/close), so checkpointing costs
+    almost nothing per page. After a crash at most one batch of pages is
+    fetched again.
+    """
+    
+    PENDING = 'pending'
+    DONE = 'done'
+    END = 'end'  # The page was the end of the crawl (e.g. no more quotes)
+    
+    def __init__(self, path='crawl_frontier.sqlite3', batch_size=50):
+        """
+        Args:
+            path (str): SQLite database file
+            batch_size (int): Finished pages buffered between commits
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self._finished = []
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS frontier ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE,"
+            " page INTEGER, status TEXT);"
+            "CREATE TABLE IF NOT EXISTS records ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT, data TEXT);"
+            "CREATE INDEX IF NOT EXISTS records_url ON records (url);"
+        )
+        self._db.commit()
+    
+    def add(self, urls):
+        """
+        Queue (url, page) pairs; URLs already known are left as they are.
+        """
+        self._db.executemany(
+            "INSERT OR IGNORE INTO frontier (url, page, status) VALUES (?, ?, ?)",
+            [(url, page, self.PENDING) for url, page in urls]
+        )
+        self._db.commit()
+    
+    def pending(self):
+        """
+        Return the (url, page) pairs still to fetch, in crawl order.
+        """
+        return self._db.execute(
+            "SELECT url, page FROM frontier WHERE status = ? ORDER BY seq",
+            (self.PENDING,)
+        ).fetchall()
+    
+    def is_finished(self):
+        """
+        Check whether an earlier run already reached the end of the crawl.
+        """
+        return self._db.execute(
+            "SELECT 1 FROM frontier WHERE status = ? LIMIT 1", (self.END,)
+        ).fetchone() is not None
+    
+    def mark_done(self, url, records=()):
+        """
+        Record a finished page and the records extracted from it.
+        """
+        self._finished.append((url, self.DONE, list(records)))
+        if len(self._finished) >= self.batch_size:
+            self.checkpoint()
+    
+    def mark_end(self, url):
+        """
+        Record that this page ended the crawl.
+        """
+        self._finished.append((url, self.END, []))
+        self.checkpoint()
+    
+    def checkpoint(self):
+        """
+        Write all buffered page completions in a single transaction.
+        """
+        if not self._finished:
+            return
+        with self._db:
+            self._db.executemany(
+                "UPDATE frontier SET status = ? WHERE url = ?",
+                [(status, url) for url, status, _ in self._finished]
+            )
+            self._db.executemany(
+                "INSERT INTO records (url, data) VALUES (?, ?)",
+                [(url, json.dumps(record, ensure_ascii=False))
+                 for url, _, records in self._finished for record in records]
+            )
+        self._finished = []
+    
+    def completed_records(self):
+        """
+        Yield the records saved by earlier runs, in crawl order.
+        """
+        rows = self._db.execute(
+            "SELECT records.data FROM records JOIN frontier ON frontier.url = records.url"
+            " ORDER BY frontier.seq, records.id"
+        )
+        for (data,) in rows:
+            yield json.loads(data)
+    
+    def stats(self):
+        """
+        Count pages per status.
+        """
+        counts = dict(self._db.execute("SELECT status, COUNT(*) FROM frontier GROUP BY status"))
+        counts['records'] = self._db.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+        return counts
+    
+    def close(self):
+        self.checkpoint()
+        self._db.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
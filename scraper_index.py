@@ -0,0 +1,280 @@
+# ============================================================
+# Indexed Queries over Scraped Records
+# Features: Inverted Index | Price Ranges | SQLite Full-text Search
+# ============================================================
+
+import os
+import sqlite3
+from array import array
+from bisect import bisect_left, bisect_right
+
+from scraper_exporters import parse_price, split_tags
+from scraper_records import RecordStore
+
+RATING_WORDS = {1: 'One', 2: 'Two', 3: 'Three', 4: 'Four', 5: 'Five'}
+
+
+def rating_word(rating):
+    """
+    Accept 3 as well as 'Three' for book ratings.
+    """
+    return RATING_WORDS.get(rating, rating)
+
+
+def _intersect(small, large):
+    """
+    Intersect two ascending id arrays by binary search from the smaller.
+    """
+    result = array('I')
+    lo = 0
+    for record_id in small:
+        lo = bisect_left(large, record_id, lo)
+        if lo == len(large):
+            break
+        if large[lo] == record_id:
+            result.append(record_id)
+    return result
+
+
+class IndexedRecordStore(RecordStore):
+    """
+    A RecordStore that indexes records as they are appended.
+    
+    Tags, authors and ratings go into an inverted index (value -> array of
+    record positions, ascending because positions only grow), prices into
+    a column that is sorted on the first range query after new records
+    arrived. find() intersects the posting lists smallest first, so a
+    query costs about the size of its most selective condition instead
+    of a scan over every record. Tags and authors match case-insensitively.
+    """
+    
+    KEYWORD_FIELDS = ('tags', 'author', 'rating')
+    
+    def __init__(self, records=None):
+        """
+        Args:
+            records (iterable): Optional dicts to load
+        """
+        self._postings = {field: {} for field in self.KEYWORD_FIELDS}
+        self._targets = {field: {} for field in self.KEYWORD_FIELDS}  # Raw value -> posting lists
+        self._prices = array('d')
+        self._price_ids = array('I')
+        self._sorted_prices = array('d')
+        self._sorted_price_ids = array('I')
+        super().__init__(records)
+    
+    def append(self, record):
+        super().append(record)
+        record_id = self._length - 1
+        for field, targets_of in self._targets.items():
+            value = record.get(field)
+            if value is None:
+                continue
+            try:
+                targets = targets_of.get(value)
+            except TypeError:  # A list of tags
+                targets = self._posting_lists(field, value)
+            else:
+                if targets is None:
+                    targets = targets_of[value] = self._posting_lists(field, value)
+            for ids in targets:
+                ids.append(record_id)
+        
+        if 'price' in record:
+            price = parse_price(record['price'])
+            if price is not None:
+                self._prices.append(price)
+                self._price_ids.append(record_id)
+    
+    def _posting_lists(self, field, value):
+        """
+        The posting lists a raw field value is added to, created as needed.
+        """
+        postings = self._postings[field]
+        values = split_tags(value) if field == 'tags' else [value]
+        targets = []
+        for key in dict.fromkeys(self._key(field, value) for value in values):
+            ids = postings.get(key)
+            if ids is None:
+                ids = postings[key] = array('I')
+            targets.append(ids)
+        return targets
+    
+    @staticmethod
+    def _key(field, value):
+        if field == 'rating':
+            return rating_word(value)
+        return value.casefold() if isinstance(value, str) else value
+    
+    def _price_range(self, min_price, max_price):
+        if len(self._sorted_prices) != len(self._prices):
+            order = sorted(range(len(self._prices)), key=self._prices.__getitem__)
+            self._sorted_prices = array('d', [self._prices[i] for i in order])
+            self._sorted_price_ids = array('I', [self._price_ids[i] for i in order])
+        
+        prices = self._sorted_prices
+        lo = 0 if min_price is None else bisect_left(prices, min_price)
+        hi = len(prices) if max_price is None else bisect_right(prices, max_price)
+        return array('I', sorted(self._sorted_price_ids[lo:hi]))
+    
+    def find_ids(self, tag=None, author=None, rating=None, min_price=None, max_price=None):
+        """
+        Positions of the records matching every given condition.
+        
+        Returns:
+            array of ascending record positions
+        """
+        conditions = []
+        for field, value in (('tags', tag), ('author', author), ('rating', rating)):
+            if value is not None:
+                conditions.append(self._postings[field].get(self._key(field, value), array('I')))
+        if min_price is not None or max_price is not None:
+            conditions.append(self._price_range(min_price, max_price))
+        if not conditions:
+            return array('I', range(self._length))
+        
+        conditions.sort(key=len)
+        ids = conditions[0]
+        for other in conditions[1:]:
+            if not ids:
+                break
+            ids = _intersect(ids, other)
+        return ids
+    
+    def find(self, tag=None, author=None, rating=None, min_price=None, max_price=None, limit=None):
+        """
+        Records matching every given condition, in scrape order.
+        
+        Args:
+            tag (str): One of the record's tags
+            author (str): Quote author
+            rating (str or int): Book rating, 'Three' or 3
+            min_price (float): Lowest price, inclusive
+            max_price (float): Highest price, inclusive
+            limit (int): Return at most this many records
+        
+        Returns:
+            list of record dicts
+        """
+        ids = self.find_ids(tag, author, rating, min_price, max_price)
+        return [self._row(record_id) for record_id in ids[:limit]]
+    
+    def count(self, **conditions):
+        """
+        Number of records matching the find() conditions.
+        """
+        return len(self.find_ids(**conditions))
+    
+    def facets(self, field):
+        """
+        How many records carry each value of 'tags', 'author' or 'rating',
+        most frequent first.
+        """
+        postings = self._postings[field]
+        return dict(sorted(((key, len(ids)) for key, ids in postings.items()), key=lambda item: -item[1]))
+
+
+class RecordDatabase:
+    """
+    Queries over a SQLite file written by the 'sqlite' export format.
+    
+    Same conditions as IndexedRecordStore.find plus `text`, an FTS5 match
+    over the quote text (or book title and description); with `text` the
+    results come best match first. Every condition is served by an index,
+    so lookups stay fast without loading the records into memory.
+    """
+    
+    def __init__(self, path):
+        """
+        Args:
+            path (str): SQLite file written by SQLiteRecordWriter
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No such database: {path}")
+        self.path = path
+        self._db = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        tables = {name for (name,) in self._db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if 'records' not in tables:
+            self._db.close()
+            raise ValueError(f"{path} is not a scraped records database")
+        self.full_text = 'records_fts' in tables
+        self.columns = [row[1] for row in self._db.execute("PRAGMA table_info(records)")]
+    
+    def find(self, text=None, tag=None, author=None, rating=None, min_price=None, max_price=None,
+             limit=None):
+        """
+        Records matching every given condition.
+        
+        Args:
+            text (str): FTS5 query, e.g. 'life' or '"be yourself"'
+            tag, author, rating, min_price, max_price, limit: As in
+                IndexedRecordStore.find
+        
+        Returns:
+            list of record dicts
+        """
+        for column, value in (('author', author), ('rating', rating),
+                              ('price', min_price if max_price is None else max_price)):
+            if value is not None and column not in self.columns:
+                raise ValueError(f"{self.path} has no {column} column")
+        
+        query = "SELECT r.* FROM records r"
+        where, params = [], []
+        order = "r.id"
+        if text is not None:
+            if not self.full_text:
+                raise ValueError(f"{self.path} has no full-text index")
+            query += " JOIN records_fts f ON f.rowid = r.id"
+            where.append("records_fts MATCH ?")
+            params.append(text)
+            order = "f.rank"
+        if tag is not None:
+            # A join rather than IN (...) lets the planner start from the
+            # author index when that is the more selective condition
+            query += " JOIN record_tags t ON t.record_id = r.id"
+            where.append("t.tag = ?")
+            params.append(tag.casefold())
+        if author is not None:
+            where.append("r.author = ? COLLATE NOCASE")
+            params.append(author)
+        if rating is not None:
+            where.append("r.rating = ?")
+            params.append(rating_word(rating))
+        if min_price is not None:
+            where.append("r.price >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            where.append("r.price <= ?")
+            params.append(max_price)
+        
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += f" ORDER BY {order}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        try:
+            rows = self._db.execute(query, params).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid query: {e}") from None  # e.g. FTS5 syntax
+        
+        records = []
+        for row in rows:
+            record = dict(row)
+            del record['id']
+            records.append(record)
+        return records
+    
+    def count(self):
+        return self._db.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+    
+    def close(self):
+        self._db.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,172 @@
+# ============================================================
+# Per-phase Timing Instrumentation for the Web Scraper
+# Features: Phase Timers | Labelled Counters | Prometheus & JSON Export
+# ============================================================
+
+import json
+import threading
+import time
+
+
+class _PhaseTimer:
+    """
+    Running count, total and max of one phase's durations.
+    """
+    
+    __slots__ = ('count', 'total', 'max')
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class _Timing:
+    """
+    Context manager returned by ScraperMetrics.time().
+    """
+    
+    __slots__ = ('metrics', 'phase', 'start')
+    
+    def __init__(self, metrics, phase):
+        self.metrics = metrics
+        self.phase = phase
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.metrics.observe(self.phase, time.perf_counter() - self.start)
+
+
+class ScraperMetrics:
+    """
+    Thread-safe timers and counters for a scraper.
+    
+    Timers keep only a count, a running total and a maximum per phase, and
+    counters are plain integers, so recording costs one lock and a few
+    additions: cheap enough to stay on for every request.
+    
+    Counters split by a label are exported with the label name from
+    LABELS (errors by exception type, responses by HTTP status).
+    
+    Phases used by WebScraper:
+        wait      time spent waiting for the rate limiter
+        sleep     fixed politeness and retry sleeps
+        request   connection setup + time to the response headers
+        download  reading the response body
+        parse     building the BeautifulSoup tree
+        extract   turning the tree into records
+        archive   appending responses to a ResponseArchive
+        export_*  writing a file (export_csv, export_json, ...)
+    """
+    
+    LABELS = {'errors': 'type', 'responses': 'status', 'cache': 'result'}
+    
+    def __init__(self, namespace='scraper'):
+        """
+        Args:
+            namespace (str): Prefix of the exported Prometheus metric names
+        """
+        self.namespace = namespace
+        self.started = time.time()
+        self._timers = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+    
+    def time(self, phase):
+        """
+        Time a block: `with metrics.time('parse'): ...`
+        """
+        return _Timing(self, phase)
+    
+    def observe(self, phase, seconds):
+        """
+        Add one measured duration to a phase.
+        """
+        with self._lock:
+            timer = self._timers.get(phase)
+            if timer is None:
+                timer = self._timers[phase] = _PhaseTimer()
+            timer.count += 1
+            timer.total += seconds
+            if seconds > timer.max:
+                timer.max = seconds
+    
+    def inc(self, name, value=1, label=None):
+        """
+        Increase a counter, optionally split by one label value
+        (e.g. inc('errors', label='Timeout')).
+        """
+        key = (name, label)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+    
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+            self.started = time.time()
+    
+    def snapshot(self):
+        """
+        Return all current values as plain dicts.
+        """
+        with self._lock:
+            phases = {
+                phase: {'count': timer.count, 'total_s': timer.total, 'max_s': timer.max,
+                        'avg_ms': timer.total * 1000 / timer.count if timer.count else 0.0}
+                for phase, timer in self._timers.items()
+            }
+            counters = {}
+            for (name, label), value in self._counters.items():
+                if label is None:
+                    counters[name] = value
+                else:
+                    counters.setdefault(name, {})[label] = value
+        return {'uptime_s': time.time() - self.started, 'phases': phases, 'counters': counters}
+    
+    def to_json(self, indent=4):
+        return json.dumps(self.snapshot(), indent=indent)
+    
+    def to_prometheus(self):
+        """
+        Render the metrics in the Prometheus text exposition format.
+        """
+        ns = self.namespace
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {ns}_phase_seconds_total Time spent per scrape phase.",
+            f"# TYPE {ns}_phase_seconds_total counter",
+        ]
+        phases = sorted(snapshot['phases'].items())
+        lines += [f'{ns}_phase_seconds_total{{phase="{phase}"}} {values["total_s"]:.6f}'
+                  for phase, values in phases]
+        lines += [f"# HELP {ns}_phase_calls_total Times each scrape phase ran.",
+                  f"# TYPE {ns}_phase_calls_total counter"]
+        lines += [f'{ns}_phase_calls_total{{phase="{phase}"}} {values["count"]}'
+                  for phase, values in phases]
+        lines += [f"# HELP {ns}_phase_max_seconds Longest single run of each phase.",
+                  f"# TYPE {ns}_phase_max_seconds gauge"]
+        lines += [f'{ns}_phase_max_seconds{{phase="{phase}"}} {values["max_s"]:.6f}'
+                  for phase, values in phases]
+        
+        for name, value in sorted(snapshot['counters'].items()):
+            metric = f"{ns}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            if isinstance(value, dict):
+                label = self.LABELS.get(name, 'label')
+                lines += [f'{metric}{{{label}="{key}"}} {count}' for key, count in sorted(value.items())]
+            else:
+                lines.append(f"{metric} {value}")
+        return '\n'.join(lines) + '\n'
+    
+    def save(self, filename='scraper_metrics.json'):
+        """
+        Write the metrics to a file: Prometheus text for .prom/.txt files
+        (e.g. for the node exporter textfile collector), JSON otherwise.
+        """
+        text = self.to_prometheus() if filename.endswith(('.prom', '.txt')) else self.to_json()
+        with open(filename, 'w', encoding='utf-8') as file:
+            file.write(text)
@@ -0,0 +1,184 @@
+# ============================================================
+# Adaptive Per-Host Rate Limiter for the Web Scraper
+# Features: Token Buckets | AIMD | Retry-After | Async Support
+# ============================================================
+
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+
+def parse_retry_after(value):
+    """
+    Convert a Retry-After header (seconds or HTTP date) into seconds.
+
+    Returns:
+        float or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _HostBucket:
+    __slots__ = ('rate', 'tokens', 'updated', 'blocked_until',
+                 'requests', 'throttled', 'total_wait', 'last_latency')
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.last_latency = None
+
+
+class AdaptiveRateLimiter:
+    """
+    Token-bucket rate limiter with one bucket per host.
+
+    Each host's rate adapts with AIMD: it grows by `increase` requests/s
+    after every fast successful response and is multiplied by `decrease`
+    after a 429/503, a failed request or a response slower than
+    `target_latency`. A Retry-After header pauses the host for that long.
+    Hosts never wait on each other.
+    """
+
+    THROTTLE_STATUSES = frozenset([429, 503])
+
+    def __init__(self, initial_rate=2.0, min_rate=0.1, max_rate=50.0, burst=1,
+                 increase=0.5, decrease=0.5, target_latency=1.0):
+        """
+        Args:
+            initial_rate (float): Requests per second for a new host
+            min_rate (float): Lowest rate AIMD may reach
+            max_rate (float): Highest rate AIMD may reach
+            burst (int): Requests a host may make back to back
+            increase (float): Rate added after each fast success
+            decrease (float): Factor applied to the rate on overload
+            target_latency (float): Seconds above which a response counts
+                as a sign of overload
+        """
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.target_latency = target_latency
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host):
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _HostBucket(self.initial_rate, self.burst)
+        return bucket
+
+    def reserve(self, url):
+        """
+        Take a token for the URL's host.
+
+        Returns:
+            float: Seconds the caller must wait before sending the request
+        """
+        host = urlsplit(url).netloc
+        with self._lock:
+            bucket = self._bucket(host)
+            now = time.monotonic()
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+
+            wait = 0.0
+            if bucket.tokens < 1:
+                wait = (1 - bucket.tokens) / bucket.rate
+            bucket.tokens -= 1
+            wait = max(wait, bucket.blocked_until - now)
+
+            bucket.requests += 1
+            bucket.total_wait += wait
+            return wait
+
+    def acquire(self, url):
+        """
+        Block the calling thread until the host allows another request.
+
+        Returns:
+            float: Seconds waited
+        """
+        wait = self.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, url):
+        """
+        Wait without blocking the event loop, so other hosts keep going.
+
+        Returns:
+            float: Seconds waited
+        """
+        wait = self.reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def record(self, url, latency=None, status=None, retry_after=None):
+        """
+        Feed a request outcome back into the host's rate.
+
+        Args:
+            url (str): Request URL
+            latency (float): Response time in seconds, None if it failed
+            status (int): HTTP status code, None if no response arrived
+            retry_after (str): Retry-After header value, if any
+        """
+        host = urlsplit(url).netloc
+        pause = parse_retry_after(retry_after)
+        with self._lock:
+            bucket = self._bucket(host)
+            bucket.last_latency = latency
+
+            overloaded = (
+                status is None
+                or status in self.THROTTLE_STATUSES
+                or (latency is not None and latency > self.target_latency)
+            )
+            if overloaded:
+                bucket.throttled += 1
+                bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+            elif status < 400:
+                bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+
+            if pause:
+                bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + pause)
+
+    def stats(self):
+        """
+        Return current rate and wait figures per host for monitoring.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                host: {
+                    'rate': round(bucket.rate, 3),
+                    'requests': bucket.requests,
+                    'throttled': bucket.throttled,
+                    'total_wait_s': round(bucket.total_wait, 3),
+                    'avg_wait_s': round(bucket.total_wait / bucket.requests, 3) if bucket.requests else 0.0,
+                    'blocked_for_s': round(max(0.0, bucket.blocked_until - now), 3),
+                    'last_latency_s': bucket.last_latency,
+                }
+                for host, bucket in self._buckets.items()
+            }
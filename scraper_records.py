@@ -0,0 +1,133 @@
+# ============================================================
+# Compact Column-Oriented Record Store for the Web Scraper
+# Features: Interned Strings | Packed Integers | Dict-like Access
+# ============================================================
+
+import sys
+from array import array
+from bisect import bisect_left
+
+
+class RecordStore:
+    """
+    Stores scraped records column by column instead of one dict each.
+    
+    Behaves like the list of dicts it replaces: len(), indexing, slicing,
+    iteration, append() and extend() all work with plain dicts, and every
+    record read back is a fresh dict with the original field order. Field
+    names are stored once, integer columns are packed into arrays and
+    repeated strings (authors, tags, ratings, timestamps) share one object.
+    
+    The columns follow the fields of the first record. A record with other
+    fields (e.g. books scraped after quotes) is kept as a plain dict at its
+    position instead.
+    """
+    
+    # Columns whose values repeat a lot across records
+    INTERNED = frozenset(['author', 'tags', 'rating', 'availability', 'scraped_at'])
+    
+    def __init__(self, records=None):
+        """
+        Args:
+            records (iterable): Optional dicts to load
+        """
+        self.fields = None
+        self._columns = []
+        self._interned = []
+        self._other_rows = array('I')  # Ascending positions of the plain dicts
+        self._others = []
+        self._length = 0
+        if records is not None:
+            self.extend(records)
+    
+    def _create_columns(self, record):
+        """
+        Derive the column layout from the first record.
+        """
+        self.fields = tuple(record)
+        for name, value in record.items():
+            packed = isinstance(value, int) and not isinstance(value, bool)
+            self._columns.append(array('q') if packed else [])
+            self._interned.append(name in self.INTERNED)
+    
+    def append(self, record):
+        """
+        Add one record dict.
+        """
+        if self.fields is None:
+            self._create_columns(record)
+        elif tuple(record) != self.fields:
+            self._other_rows.append(self._length)
+            self._others.append(dict(record))
+            self._length += 1
+            return
+        
+        columns = self._columns
+        for idx, value in enumerate(record.values()):
+            if self._interned[idx] and type(value) is str:
+                value = sys.intern(value)
+            try:
+                columns[idx].append(value)
+            except TypeError:
+                # A non-integer arrived in a packed column: fall back to a list
+                columns[idx] = list(columns[idx])
+                columns[idx].append(value)
+        self._length += 1
+    
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+    
+    def _row(self, idx):
+        if self._others:
+            pos = bisect_left(self._other_rows, idx)
+            if pos < len(self._other_rows) and self._other_rows[pos] == idx:
+                return dict(self._others[pos])
+            idx -= pos  # Column index: plain dicts before it take no column slot
+        return dict(zip(self.fields, [column[idx] for column in self._columns]))
+    
+    def __len__(self):
+        return self._length
+    
+    def __bool__(self):
+        return self._length > 0
+    
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._row(i) for i in range(*idx.indices(self._length))]
+        if idx < 0:
+            idx += self._length
+        if not 0 <= idx < self._length:
+            raise IndexError("record index out of range")
+        return self._row(idx)
+    
+    def __iter__(self):
+        if self.fields is None:
+            return
+        fields = self.fields
+        if not self._others:
+            for values in zip(*self._columns):
+                yield dict(zip(fields, values))
+            return
+        rows = zip(*self._columns)
+        others = zip(self._other_rows, self._others)
+        next_other, other = next(others, (None, None))
+        for idx in range(self._length):
+            if idx == next_other:
+                yield dict(other)
+                next_other, other = next(others, (None, None))
+            else:
+                yield dict(zip(fields, next(rows)))
+    
+    def column(self, name):
+        """
+        Return the raw values of one column without building record dicts
+        (only the records with the store's fields have a column entry).
+        """
+        return self._columns[self.fields.index(name)]
+    
+    def clear(self):
+        self.__init__()
+    
+    def __repr__(self):
+        return f"RecordStore({self._length} records, fields={self.fields})"
@@ -0,0 +1,212 @@
+# ============================================================
+# Latency-aware Retry Policy for the Web Scraper
+# Features: Jittered Backoff | Hedged Requests | Per-host Circuit Breaker
+# ============================================================
+
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+
+class CircuitOpen(RuntimeError):
+    """
+    The host's circuit breaker is open, so the request was not sent.
+    """
+
+
+class LatencyTracker:
+    """
+    Recent response times per host, for picking hedge delays.
+    
+    Keeps the last `window` successful latencies of every host and
+    answers quantile queries over them once `min_samples` are in.
+    """
+    
+    def __init__(self, window=200, min_samples=20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, url, seconds):
+        host = urlsplit(url).netloc
+        with self._lock:
+            samples = self._samples.get(host)
+            if samples is None:
+                samples = self._samples[host] = deque(maxlen=self.window)
+            samples.append(seconds)
+    
+    def quantile(self, url, q=0.95):
+        """
+        Returns:
+            float: The q-quantile of the host's recent latencies, or None
+            while there are fewer than min_samples
+        """
+        with self._lock:
+            samples = self._samples.get(urlsplit(url).netloc)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _Circuit:
+    __slots__ = ('state', 'failures', 'opened_at', 'probing')
+    
+    def __init__(self):
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+    
+    After `failure_threshold` consecutive failures a host's circuit opens
+    and every request to it fails fast for `reset_timeout` seconds. Then
+    the circuit is half-open: one probe request is let through, and its
+    outcome closes the circuit again or re-opens it for another timeout.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+    
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """
+        Args:
+            failure_threshold (int): Consecutive failures that open a circuit
+            reset_timeout (float): Seconds a circuit stays open before a probe
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._circuits = {}
+        self._lock = threading.Lock()
+    
+    def _circuit(self, url):
+        host = urlsplit(url).netloc
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            circuit = self._circuits[host] = _Circuit()
+        return circuit
+    
+    def allow(self, url):
+        """
+        Check whether a request to the URL's host may be sent now.
+        """
+        with self._lock:
+            circuit = self._circuit(url)
+            if circuit.state == self.CLOSED:
+                return True
+            if circuit.state == self.OPEN:
+                if time.monotonic() - circuit.opened_at < self.reset_timeout:
+                    return False
+                circuit.state = self.HALF_OPEN
+            if circuit.probing:
+                return False  # Only one probe at a time
+            circuit.probing = True
+            return True
+    
+    def record_success(self, url):
+        with self._lock:
+            circuit = self._circuit(url)
+            circuit.state = self.CLOSED
+            circuit.failures = 0
+            circuit.probing = False
+    
+    def record_failure(self, url):
+        with self._lock:
+            circuit = self._circuit(url)
+            circuit.failures += 1
+            circuit.probing = False
+            if circuit.state == self.HALF_OPEN or circuit.failures >= self.failure_threshold:
+                circuit.state = self.OPEN
+                circuit.opened_at = time.monotonic()
+    
+    def state(self, url):
+        with self._lock:
+            return self._circuit(url).state
+    
+    def stats(self):
+        with self._lock:
+            return {host: {'state': circuit.state, 'failures': circuit.failures}
+                    for host, circuit in self._circuits.items()}
+
+
+class RetryPolicy:
+    """
+    How AdvancedScraper.scrape_with_retries retries, hedges and gives up.
+    
+    - Backoff between attempts is "full jitter": a random delay between 0
+      and min(backoff_cap, backoff_base * 2 ** attempt), so retries of many
+      pages do not hit a recovering host in lockstep.
+    - A request still running after the host's recent p95 latency (or
+      `hedge_after` seconds until enough samples exist) gets one duplicate;
+      the first answer wins. Hedges are capped at `hedge_budget` of all
+      requests so a slow host does not get twice the load.
+    - A CircuitBreaker fails fast while a host is down.
+    """
+    
+    def __init__(self, backoff_base=0.5, backoff_cap=10.0, hedge=True, hedge_quantile=0.95,
+                 hedge_after=None, hedge_budget=0.1, breaker=None, latency=None, rng=None):
+        """
+        Args:
+            backoff_base (float): Backoff ceiling of the first retry in seconds
+            backoff_cap (float): Largest backoff ceiling
+            hedge (bool): Send hedged duplicates of slow requests
+            hedge_quantile (float): Latency quantile after which to hedge
+            hedge_after (float): Hedge delay used before the host has enough
+                latency samples, None to not hedge until then
+            hedge_budget (float): Largest fraction of requests hedged
+            breaker (CircuitBreaker): Per-host breaker, a default one if None
+            latency (LatencyTracker): Latency history, a new one if None
+            rng (random.Random): Random source of the jitter
+        """
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_after = hedge_after
+        self.hedge_budget = hedge_budget
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.latency = latency if latency is not None else LatencyTracker()
+        self.rng = rng or random.Random()
+        self.requests = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+    
+    def backoff(self, attempt):
+        """
+        Seconds to wait before retry number `attempt` (0 for the first).
+        """
+        return self.rng.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+    
+    def hedge_delay(self, url):
+        """
+        Seconds after which a request to this URL gets a hedge, or None.
+        """
+        if not self.hedge:
+            return None
+        delay = self.latency.quantile(url, self.hedge_quantile)
+        return self.hedge_after if delay is None else delay
+    
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+    
+    def take_hedge(self):
+        """
+        Spend hedge budget on one duplicate request.
+        
+        Returns:
+            bool: False when the budget is used up
+        """
+        with self._lock:
+            if self.hedges + 1 > self.hedge_budget * self.requests:
+                return False
+            self.hedges += 1
+            return True
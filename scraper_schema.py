@@ -0,0 +1,339 @@
+# ============================================================
+# Declarative Extraction Schemas for the Web Scraper
+# Features: CSS/XPath Fields | Compiled Once | lxml Fast Path
+# ============================================================
+
+import re
+
+from bs4 import BeautifulSoup, Tag, UnicodeDammit
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # Optional: schemas then run on BeautifulSoup trees
+    etree = None
+
+try:
+    import soupsieve
+except ImportError:  # Bundled with beautifulsoup4 >= 4.7
+    soupsieve = None
+
+
+class SchemaError(ValueError):
+    """
+    A required field could not be extracted from a container.
+    """
+
+
+# ------------------------------------------------------------
+# CSS -> XPath for the lxml fast path
+# ------------------------------------------------------------
+
+_CSS_TOKEN = re.compile(r'''
+    \s*(?P<combinator>>)\s*
+  | (?P<space>\s+)
+  | (?P<tag>\*|[A-Za-z][\w-]*)
+  | \.(?P<cls>[\w-]+)
+  | \#(?P<id>[\w-]+)
+  | \[\s*(?P<attr>[\w-]+)\s*(?:(?P<op>[~^$*|]?=)\s*(?P<value>"[^"]*"|'[^']*'|[^\]\s]+)\s*)?\]
+''', re.VERBOSE)
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _attr_test(attr, op, value):
+    if op is None:
+        return f"@{attr}"
+    if value[0] in '"\'':
+        value = value[1:-1]
+    literal = f'"{value}"' if "'" in value else f"'{value}'"
+    if op == '=':
+        return f"@{attr} = {literal}"
+    if op == '~=':
+        return f"contains(concat(' ', normalize-space(@{attr}), ' '), concat(' ', {literal}, ' '))"
+    if op == '^=':
+        return f"starts-with(@{attr}, {literal})"
+    if op == '$=':
+        return f"substring(@{attr}, string-length(@{attr}) - string-length({literal}) + 1) = {literal}"
+    if op == '*=':
+        return f"contains(@{attr}, {literal})"
+    return f"(@{attr} = {literal} or starts-with(@{attr}, concat({literal}, '-')))"  # |=
+
+
+def css_to_xpath(selector):
+    """
+    Translate a simple CSS selector into a relative XPath expression.
+    
+    Supports type, universal, class, id and attribute selectors combined
+    with descendant and child combinators, and selector lists (a, b).
+    
+    Raises:
+        ValueError: For anything else (pseudo-classes, sibling combinators)
+    """
+    paths = []
+    for part in selector.split(','):
+        steps, axis, tag, tests = [], 'descendant::', None, []
+        text = part.strip()
+        pos = 0
+        while pos < len(text):
+            match = _CSS_TOKEN.match(text, pos)
+            if match is None or match.end() == pos:
+                raise ValueError(f"Unsupported CSS selector: {selector!r}")
+            pos = match.end()
+            if match.group('combinator') or match.group('space'):
+                if tag is None and not tests:
+                    raise ValueError(f"Unsupported CSS selector: {selector!r}")
+                steps.append(axis + (tag or '*') + ''.join(f"[{test}]" for test in tests))
+                axis = 'child::' if match.group('combinator') else 'descendant::'
+                tag, tests = None, []
+            elif match.group('tag'):
+                tag = match.group('tag').lower()
+            elif match.group('cls'):
+                tests.append(_has_class(match.group('cls')))
+            elif match.group('id'):
+                tests.append(f"@id = '{match.group('id')}'")
+            else:
+                tests.append(_attr_test(match.group('attr'), match.group('op'), match.group('value')))
+        if tag is None and not tests:
+            raise ValueError(f"Unsupported CSS selector: {selector!r}")
+        steps.append(axis + (tag or '*') + ''.join(f"[{test}]" for test in tests))
+        paths.append('/'.join(steps))
+    return ' | '.join(paths)
+
+
+# ------------------------------------------------------------
+# Fields and schemas
+# ------------------------------------------------------------
+
+class Field:
+    """
+    One output field: where its value is inside a container and how to
+    turn the matched element(s) into that value.
+    """
+    
+    def __init__(self, selector=None, xpath=None, attr=None, strip=False, many=False,
+                 transform=None, context=None, required=True, default=None):
+        """
+        Args:
+            selector (str): CSS selector relative to the container, None for
+                the container itself
+            xpath (str): XPath relative to the container, instead of a
+                selector (needs lxml)
+            attr (str): Read this attribute instead of the text
+            strip (bool): Strip every text fragment, like get_text(strip=True)
+            many (bool): Use every match and produce a list of values
+            transform (callable): Applied to the value (or list of values)
+            context (str): Take the value from the keyword arguments passed
+                to Schema.extract instead of the page (e.g. 'page')
+            required (bool): Skip the record when nothing matches
+            default: Value used when an optional field has no match
+        """
+        if selector is not None and xpath is not None:
+            raise ValueError("Give either a CSS selector or an XPath, not both")
+        self.selector = selector
+        self.xpath = xpath
+        self.attr = attr
+        self.strip = strip
+        self.many = many
+        self.transform = transform
+        self.context = context
+        self.required = required
+        self.default = default
+
+
+# Attributes BeautifulSoup splits into lists; returned space-joined by both paths
+MULTI_VALUED_ATTRS = frozenset(['class', 'rel', 'rev', 'accept-charset', 'headers', 'accesskey', 'dropzone'])
+
+
+class Schema:
+    """
+    Maps field names to selectors and transforms, compiled once and run
+    over every container element of a page.
+    
+    With lxml installed, parse() builds an lxml tree and extract_tree()
+    runs precompiled XPath expressions over it (CSS selectors are
+    translated once), which skips building a BeautifulSoup tree
+    altogether. extract_tree() also accepts an existing BeautifulSoup tree
+    and then uses precompiled soupsieve selectors. Both give the same
+    values as BeautifulSoup's get_text() and attribute access;
+    multi-valued attributes such as class come back as one
+    space-separated string.
+    """
+    
+    def __init__(self, container, fields, parser=None):
+        """
+        Args:
+            container (str): CSS selector of the repeating element
+            fields (dict): Field name -> Field, or a CSS selector string
+            parser (str): BeautifulSoup backend used when lxml is missing
+        """
+        self.container = container
+        self.fields = {name: field if isinstance(field, Field) else Field(field)
+                       for name, field in fields.items()}
+        self.parser = parser or 'html.parser'
+        
+        # Compile every selector once: XPath now, soupsieve (much slower to
+        # compile) on the first BeautifulSoup tree, so schemas defined at
+        # import time stay cheap
+        self._xpath_fields = self._css_fields = None
+        if etree is not None:
+            self._xpath_container = etree.XPath(css_to_xpath(container))
+            self._xpath_fields = [
+                (name, field, etree.XPath(field.xpath) if field.xpath is not None else
+                 etree.XPath(css_to_xpath(field.selector)) if field.selector is not None else None)
+                for name, field in self.fields.items()
+            ]
+            self._text = etree.XPath('.//text()', smart_strings=False)
+            self._parsers = {}
+    
+    def _compile_css(self):
+        if self._css_fields is None:
+            if soupsieve is None or any(field.xpath is not None for field in self.fields.values()):
+                raise ValueError("This schema needs lxml (XPath fields or no soupsieve)")
+            self._css_container = soupsieve.compile(self.container)
+            self._css_fields = [
+                (name, field, soupsieve.compile(field.selector).select if field.selector is not None else None)
+                for name, field in self.fields.items()
+            ]
+        return self._css_fields
+    
+    @classmethod
+    def from_spec(cls, container, spec):
+        """
+        Build a schema from a compact text spec, e.g. for interactive use:
+        'text=span.text, author=small.author, link=a@href'.
+        
+        Each field is name=selector, optionally followed by @attribute.
+        """
+        fields = {}
+        for item in spec.split(','):
+            name, sep, selector = item.partition('=')
+            if not sep or not name.strip():
+                raise ValueError(f"Expected name=selector, got {item.strip()!r}")
+            selector, _, attr = selector.partition('@')
+            fields[name.strip()] = Field(selector.strip() or None, attr=attr.strip() or None,
+                                         strip=True, required=False)
+        return cls(container, fields)
+    
+    def parse(self, content):
+        """
+        Parse raw HTML into the tree extract_tree() works on fastest.
+        
+        Bytes are decoded the way BeautifulSoup decodes them, so the text
+        values match. Returns an lxml root element, or a BeautifulSoup
+        tree when lxml is not installed.
+        """
+        if etree is None:
+            return BeautifulSoup(content, self.parser)
+        if isinstance(content, str):
+            content, encoding = content.encode('utf-8'), 'utf-8'
+        else:
+            encoding = UnicodeDammit(content, is_html=True).original_encoding or 'utf-8'
+        parser = self._parsers.get(encoding)
+        if parser is None:
+            parser = self._parsers[encoding] = lxml.html.HTMLParser(encoding=encoding)
+        return lxml.html.document_fromstring(content, parser=parser)
+    
+    def extract(self, content, on_error=None, **context):
+        """
+        Parse raw HTML and extract one record per container.
+        """
+        return self.extract_tree(self.parse(content), on_error, **context)
+    
+    def extract_tree(self, tree, on_error=None, **context):
+        """
+        Extract one record per container from an lxml or BeautifulSoup tree.
+        
+        Args:
+            tree: Result of parse(), or any BeautifulSoup object
+            on_error (callable): Called with (container index, SchemaError)
+                for every container that is skipped
+            **context: Values for fields declared with context=...
+            
+        Returns:
+            list of record dicts
+        """
+        if isinstance(tree, Tag):
+            fields = self._compile_css()
+            containers, value = self._css_container.select(tree), self._soup_value
+        else:
+            containers, fields, value = self._xpath_container(tree), self._xpath_fields, self._lxml_value
+        
+        records = []
+        for idx, container in enumerate(containers):
+            try:
+                records.append(self._record(container, fields, value, context))
+            except SchemaError as e:
+                if on_error is not None:
+                    on_error(idx, e)
+        return records
+    
+    def extract_element(self, container, **context):
+        """
+        Extract the record of one lxml container element, e.g. one handed
+        out by an incremental parser.
+        
+        Raises:
+            SchemaError: If a required field has no match
+        """
+        return self._record(container, self._xpath_fields, self._lxml_value, context)
+    
+    def container_test(self):
+        """
+        Describe the container for incremental parsers.
+        
+        Returns:
+            tuple: (tag name or None for any tag, compiled XPath that is
+            true for an lxml element matching the container selector)
+            
+        Raises:
+            ValueError: If the container is not a single compound selector
+                such as 'div.quote' (ancestors are not known while streaming)
+        """
+        path = css_to_xpath(self.container)
+        if '/' in path or ' | ' in path:
+            raise ValueError(f"Streaming needs a single compound container selector, got {self.container!r}")
+        step = path[len('descendant::'):]
+        tag = re.match(r'[\w*-]+', step).group(0)
+        return (None if tag == '*' else tag), etree.XPath('boolean(self::' + step + ')')
+    
+    @staticmethod
+    def _record(container, fields, value, context):
+        record = {}
+        for name, field, select in fields:
+            if field.context is not None:
+                record[name] = context[field.context]
+                continue
+            elements = [container] if select is None else select(container)
+            if field.many:
+                result = [value(element, field) for element in elements]
+            else:
+                result = value(elements[0], field) if elements else None
+                if result is None:
+                    if field.required:
+                        raise SchemaError(f"No match for field {name!r}")
+                    result = field.default
+            if field.transform is not None:
+                result = field.transform(result)
+            record[name] = result
+        return record
+    
+    def _lxml_value(self, element, field):
+        if field.attr is not None:
+            value = element.get(field.attr)
+            if value is not None and field.attr in MULTI_VALUED_ATTRS:
+                value = ' '.join(value.split())
+            return value
+        fragments = self._text(element)
+        if field.strip:
+            return ''.join(fragment.strip() for fragment in fragments)
+        return ''.join(fragments)
+    
+    @staticmethod
+    def _soup_value(element, field):
+        if field.attr is not None:
+            value = element.get(field.attr)
+            return ' '.join(value) if isinstance(value, list) else value
+        return element.get_text(strip=field.strip)
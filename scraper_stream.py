@@ -0,0 +1,273 @@
+# ============================================================
+# Streaming Download and Incremental Parsing for the Web Scraper
+# Features: Chunked Reads | Pull Parser | Per-record Memory | Size Limit
+# ============================================================
+
+import re
+
+from bs4.dammit import EncodingDetector
+
+try:
+    from lxml import etree
+except ImportError:  # Streaming needs lxml's incremental parser
+    etree = None
+
+from scraper_schema import SchemaError
+
+CHARSET_PATTERN = re.compile(r'charset=["\']?([\w-]+)', re.IGNORECASE)
+
+
+class BodyTooLarge(ValueError):
+    """
+    A response body went over the configured maximum size.
+    """
+
+
+def detect_encoding(first_chunk, content_type=None):
+    """
+    Pick the encoding for a streamed page the way BeautifulSoup would for
+    the whole body: a <meta> or XML declaration first, then the charset of
+    the Content-Type header, then UTF-8.
+    """
+    declared = EncodingDetector.find_declared_encoding(first_chunk, is_html=True)
+    if declared:
+        return declared
+    match = CHARSET_PATTERN.search(content_type or '')
+    return match.group(1) if match else 'utf-8'
+
+
+class MarkupScanner:
+    """
+    Tracks just enough of the HTML tokenizer state to find cut points.
+    
+    A cut point is the '<' of a start tag in normal content: not inside a
+    tag, a comment, or the raw text of <script>, <style>, <textarea> and
+    similar elements, where '<div ...' is text rather than markup. Input
+    arrives in chunks; an unfinished construct at the end of a chunk is
+    carried over to the next one. If a construct grows past max_pending
+    (e.g. a stray quote in a tag) scanning stops and no more cut points
+    are reported, which only costs memory, never correctness.
+    """
+    
+    NORMAL, COMMENT, RAW_TEXT, UNKNOWN = range(4)
+    RAW_TEXT_ELEMENTS = frozenset([b'script', b'style', b'textarea', b'title', b'xmp', b'iframe',
+                                   b'noembed', b'noframes', b'noscript', b'plaintext'])
+    TAG_NAME = re.compile(rb'<([A-Za-z][^\s/>]*)')
+    TAG_DELIMITER = re.compile(rb'[>=]')
+    SPACES = re.compile(rb'\s*')
+    # Text, an end tag, or a well-formed start tag of an element other
+    # than the raw text ones. Runs of these are consumed in one regex
+    # match; anything else (comments, raw text, odd syntax, a tag cut off
+    # by the chunk end) ends the run and is handled token by token
+    ORDINARY_TOKEN = (
+        rb'[^<]+'
+        rb'|</[A-Za-z][^>]*>'
+        rb'|<(?!(?:' + b'|'.join(sorted(RAW_TEXT_ELEMENTS)) + rb')[\s/>])[A-Za-z][^\s/>]*'
+        rb'(?:\s+[^\s"\'>/=]+(?:\s*=\s*(?:"[^"]*"|\'[^\']*\'|[^\s"\'=<>`]+))?)*\s*/?>'
+    )
+    ORDINARY = re.compile(ORDINARY_TOKEN, re.IGNORECASE)
+    ORDINARY_RUN = re.compile(rb'(?:' + ORDINARY_TOKEN + rb')*', re.IGNORECASE)
+    
+    def __init__(self, max_pending=256 * 1024):
+        self.max_pending = max_pending
+        self.state = self.NORMAL
+        self._pending = b''
+        self._raw_end = None
+    
+    def _tag_end(self, data, start):
+        """
+        Offset just past the '>' closing the start tag at `start`, skipping
+        quoted attribute values, or None if the tag is not complete yet.
+        """
+        pos = start + 1
+        while True:
+            match = self.TAG_DELIMITER.search(data, pos)
+            if match is None:
+                return None
+            if match.group() == b'>':
+                return match.end()
+            pos = self.SPACES.match(data, match.end()).end()
+            quote = data[pos:pos + 1]
+            if quote in (b'"', b"'"):
+                close = data.find(quote, pos + 1)
+                if close < 0:
+                    return None
+                pos = close + 1
+    
+    def scan(self, chunk):
+        """
+        Advance over one chunk.
+        
+        Returns:
+            int: Offset in the chunk of its first cut point, or None
+        """
+        if self.state == self.UNKNOWN:
+            return None
+        data = self._pending + chunk
+        carried = len(self._pending)
+        self._pending = b''
+        cut = None
+        pos = 0
+        while pos < len(data):
+            if self.state == self.COMMENT:
+                end = data.find(b'-->', pos)
+                if end < 0:
+                    self._pending = data[-2:]
+                    break
+                self.state, pos = self.NORMAL, end + 3
+            elif self.state == self.RAW_TEXT:
+                match = self._raw_end.search(data, pos)
+                if match is None:
+                    self._pending = data[-16:]  # Room for a split end tag
+                    break
+                self.state, pos = self.NORMAL, match.start()
+            else:
+                if pos >= carried:
+                    run_end = self.ORDINARY_RUN.match(data, pos).end()
+                    token = pos
+                    while cut is None and token < run_end:
+                        if data[token:token + 1] == b'<' and data[token + 1:token + 2].isalpha():
+                            cut = token - carried
+                        token = self.ORDINARY.match(data, token).end()
+                    pos = run_end
+                # One token the run could not take; the first token of a
+                # chunk completes what the previous chunk carried over
+                start = data.find(b'<', pos)
+                if start < 0:
+                    break
+                if len(data) - start < 4:
+                    self._pending = data[start:]
+                    break
+                follower = data[start + 1:start + 2]
+                if data.startswith(b'<!--', start):
+                    self.state, pos = self.COMMENT, start + 4
+                elif follower.isalpha():
+                    end = self._tag_end(data, start)
+                    if end is None:
+                        self._pending = data[start:]
+                        break
+                    if cut is None and start >= carried:
+                        cut = start - carried
+                    name = self.TAG_NAME.match(data, start).group(1).lower()
+                    if name in self.RAW_TEXT_ELEMENTS:
+                        self.state = self.RAW_TEXT
+                        self._raw_end = re.compile(rb'</' + re.escape(name) + rb'[\s/>]', re.IGNORECASE)
+                    pos = end
+                elif follower in (b'/', b'!', b'?'):
+                    end = data.find(b'>', start)
+                    if end < 0:
+                        self._pending = data[start:]
+                        break
+                    pos = end + 1
+                else:
+                    pos = start + 1  # A literal '<' in text
+        
+        if len(self._pending) > self.max_pending:
+            self.state, self._pending = self.UNKNOWN, b''
+        return cut
+
+
+class StreamingExtractor:
+    """
+    Incremental extraction of schema records from HTML fed in chunks.
+    
+    Chunks go into lxml's pull parser. Each time an element matching the
+    schema's container closes, its record is extracted and the element is
+    cleared and detached together with everything parsed before it.
+    
+    libxml2's HTML push parser keeps all input it was fed, so after
+    reset_bytes the parser is replaced by a fresh one at the next start
+    tag in normal content (see MarkupScanner) found while no container is
+    open. Containers are matched on their own tag and attributes only, so
+    they do not need the elements around them, and memory stays bounded
+    by about one chunk plus one record.
+    """
+    
+    def __init__(self, schema, encoding='utf-8', on_error=None, reset_bytes=1024 * 1024, **context):
+        """
+        Args:
+            schema (Schema): Container selector and fields to extract; the
+                container must be a single compound selector ('div.quote')
+            encoding (str): Encoding of the fed bytes (see detect_encoding)
+            on_error (callable): Called with (container index, SchemaError)
+                for every container that is skipped
+            reset_bytes (int): Input fed to one parser before it is replaced
+            **context: Values for fields declared with context=...
+        """
+        if etree is None:
+            raise ImportError("Streaming extraction needs lxml: pip install lxml")
+        self.schema = schema
+        self.encoding = encoding
+        self.on_error = on_error
+        self.reset_bytes = reset_bytes
+        self.context = context
+        self.containers = 0
+        self._tag, self._is_container = schema.container_test()
+        self._open = 0
+        self._scanner = MarkupScanner()
+        self._parser = self._new_parser()
+    
+    def _new_parser(self):
+        self._fed = 0
+        return etree.HTMLPullParser(events=('start', 'end'), tag=self._tag, encoding=self.encoding)
+    
+    def feed(self, chunk):
+        """
+        Parse one more chunk.
+        
+        Returns:
+            list of the records whose container closed in this chunk
+        """
+        records = []
+        cut = self._scanner.scan(chunk)
+        if self._fed >= self.reset_bytes:
+            if cut is not None:
+                # Everything before the start tag completes the pending
+                # markup; cut there if no container is open
+                records += self._feed(chunk[:cut])
+                chunk = chunk[cut:]
+                if not self._open:
+                    self._parser.close()
+                    records += self._collect()
+                    self._parser = self._new_parser()
+        records += self._feed(chunk)
+        return records
+    
+    def close(self):
+        """
+        Finish parsing and return the records of any containers left.
+        """
+        self._parser.close()
+        return self._collect()
+    
+    def _feed(self, data):
+        self._fed += len(data)
+        self._parser.feed(data)
+        return self._collect()
+    
+    def _collect(self):
+        records = []
+        for event, element in self._parser.read_events():
+            if not self._is_container(element):
+                continue
+            if event == 'start':
+                self._open += 1
+                continue
+            self._open -= 1
+            self.containers += 1
+            try:
+                records.append(self.schema.extract_element(element, **self.context))
+            except SchemaError as e:
+                if self.on_error is not None:
+                    self.on_error(self.containers - 1, e)
+            
+            # Free the container and everything parsed before it, at every
+            # level, so wrappers around earlier containers go as well
+            element.clear(keep_tail=False)
+            node = element
+            while node.getparent() is not None:
+                parent = node.getparent()
+                while node.getprevious() is not None:
+                    del parent[0]
+                node = parent
+        return records
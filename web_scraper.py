@@ -3,242 +3,1456 @@
 # Features: Data Extraction | Multiple Formats | Error Handling
 # ============================================================
 
-import requests
-from bs4 import BeautifulSoup
+import sys
+
+if __name__ == "__main__" and len(sys.argv) > 1:
+    # Arguments mean an unattended run: hand over to the batch CLI before
+    # the imports below, so `python web_scraper.py <args>` starts as fast
+    # as scraper_cli.py and the scraper is only imported once, by the
+    # commands that need it
+    from scraper_cli import main as batch_main
+    sys.exit(batch_main())
+
+import importlib
+from bs4 import BeautifulSoup, SoupStrainer
+from scraper_archive import ArchiveMiss
+from scraper_dedup import FingerprintSet
+from scraper_delta import ChangeTracker
+from scraper_index import IndexedRecordStore
+from scraper_metrics import ScraperMetrics
+from scraper_records import RecordStore
+from scraper_resilience import CircuitOpen, RetryPolicy
+from scraper_schema import Field, Schema
+from scraper_stream import BodyTooLarge, StreamingExtractor, detect_encoding
+from scraper_exporters import (
+    CsvRecordWriter, FanOutWriter, JsonRecordWriter, JsonLinesRecordWriter,
+    ParquetRecordWriter, TxtRecordWriter, create_writers
+)
 import csv
 import json
+import re
+import threading
 import time
+from functools import partial
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime
+from itertools import islice
+from urllib.parse import urljoin, urlsplit
 import os
 
+
+class _LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+    
+    The HTTP stack alone takes longer to import than the rest of the
+    scraper, and replay, cache-only and export runs never send a request;
+    asyncio and multiprocessing are only needed by the async and pipeline
+    scrapes.
+    """
+    
+    def __init__(self, name):
+        self._name = name
+    
+    def __getattr__(self, attr):
+        return getattr(importlib.import_module(self._name), attr)
+
+
+requests = _LazyModule('requests')
+asyncio = _LazyModule('asyncio')
+multiprocessing = _LazyModule('multiprocessing')
+
+
+def default_parser():
+    """
+    Pick the fastest installed BeautifulSoup parser backend.
+    
+    Returns:
+        str: 'lxml' when the C-backed lxml package is available, otherwise
+        the pure-Python 'html.parser'
+    """
+    try:
+        import lxml  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'html.parser'
+
+
+def css_class(name):
+    """
+    Match one CSS class inside a class attribute for a SoupStrainer.
+    
+    A plain string only matches single-class attributes while the strainer
+    runs during parsing (class="pager next" would be skipped).
+    """
+    return re.compile(rf'(?:^|\s){re.escape(name)}(?:\s|$)')
+
+
+# Per-process scraper used by the parse workers of WebScraper.iter_pipeline
+_worker_scraper = None
+
+
+def _init_parse_worker(scraper_class, parser):
+    global _worker_scraper
+    # Progress is reported in page order by the parent process instead
+    _worker_scraper = scraper_class('', parser=parser, log=None)
+
+
+def _parse_in_worker(kind, content, page):
+    return _worker_scraper.parse_records(kind, content, page)
+
+
 class WebScraper:
     """
     A comprehensive web scraper with error handling and multiple export formats.
     """
     
-    def __init__(self, base_url, headers=None):
+    # Only the subtrees each scrape method reads get parsed
+    QUOTE_STRAINER = SoupStrainer('div', class_=css_class('quote'))
+    BOOK_STRAINER = SoupStrainer('article', class_=css_class('product_pod'))
+    NEXT_STRAINER = SoupStrainer('li', class_=css_class('next'))
+    
+    # Records are extracted by these compiled schemas; the output matches
+    # the original find() chains field for field
+    QUOTE_SCHEMA = Schema('div.quote', {
+        'quote': Field('span.text'),
+        'author': Field('small.author'),
+        'tags': Field('a.tag', many=True, transform=', '.join),
+        'page': Field(context='page'),
+        'scraped_at': Field(context='scraped_at'),
+    })
+    BOOK_SCHEMA = Schema('article.product_pod', {
+        'title': Field('h3 a', attr='title'),
+        'price': Field('p.price_color'),
+        'rating': Field('p.star-rating', attr='class', transform=lambda classes: classes.split()[1]),
+        'availability': Field('p.instock.availability', strip=True),
+        'scraped_at': Field(context='scraped_at'),
+    })
+    
+    # Listing cards with their detail page link, for the detail crawl
+    BOOK_CARD_SCHEMA = Schema('article.product_pod', {**BOOK_SCHEMA.fields, 'url': Field('h3 a', attr='href')})
+    # Schemas by record kind for iter_stream, and its default body size limit
+    STREAM_SCHEMAS = {'quotes': QUOTE_SCHEMA, 'books': BOOK_SCHEMA}
+    MAX_BODY_BYTES = 512 * 1024 * 1024
+    # Detail pages: a one-record schema over the page plus one row per
+    # entry of the product information table (UPC, Availability, ...)
+    BOOK_DETAIL_SCHEMA = Schema('body', {
+        'description': Field('article.product_page > p', required=False, default=''),
+        'category': Field('ul.breadcrumb li a', many=True,
+                          transform=lambda links: links[-1] if links else None),
+    })
+    BOOK_INFO_SCHEMA = Schema('article.product_page table tr', {'name': Field('th'), 'value': Field('td')})
+    BOOK_DETAIL_FIELDS = ('upc', 'description', 'stock', 'category')
+    STOCK_PATTERN = re.compile(r'(\d+) available')
+    
+    # Pager "next" link, matched on the raw bytes so the next page can be
+    # requested before the current one is parsed
+    NEXT_LINK_PATTERN = re.compile(
+        rb'<li[^>]*class=["\'][^"\']*\bnext\b[^"\']*["\'][^>]*>\s*<a[^>]*href=["\']([^"\']+)["\']',
+        re.IGNORECASE
+    )
+    
+    def __init__(self, base_url, headers=None, pool_connections=10, pool_maxsize=10,
+                 keep_alive=True, max_retries=0, backoff_factor=0.5, cache=None,
+                 parser=None, rate_limiter=None, metrics=None, log=print, archive=None,
+                 replay=None, index=False):
         """
         Initialize the scraper with a base URL and optional headers.
         
         Args:
             base_url (str): The website URL to scrape
             headers (dict): Optional HTTP headers for requests
+            pool_connections (int): Number of hosts to keep connection pools for
+            pool_maxsize (int): Maximum connections kept open per host
+            keep_alive (bool): Reuse connections between requests
+            max_retries (int): Transport-level retries for failed connections
+                and 429/5xx responses
+            backoff_factor (float): Backoff between transport-level retries
+            cache (ResponseCache): Optional on-disk response cache
+            parser (str): BeautifulSoup parser backend, defaults to the
+                fastest one installed (see default_parser)
+            rate_limiter (AdaptiveRateLimiter): Optional per-host limiter
+                that replaces the fixed politeness and retry sleeps
+            metrics (ScraperMetrics): Phase timers and counters, a new one
+                by default (see self.metrics)
+            log (callable): Receives each progress message, e.g. print or
+                logging.getLogger(...).info; None silences the scraper
+            archive (ResponseArchive): Keep every downloaded response so it
+                can be re-parsed later without crawling again
+            replay (ResponseArchive): Serve all pages from this archive
+                instead of the network (no requests, no politeness sleeps)
+            index (bool): Index records by tag, author, rating and price as
+                they are scraped, so self.data.find() and display_data()
+                can filter without scanning (see IndexedRecordStore)
         """
         self.base_url = base_url
         self.headers = headers or {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        self.data = []
+        self.data = IndexedRecordStore() if index else RecordStore()
+        self.cache = cache
+        self.parser = parser or default_parser()
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics if metrics is not None else ScraperMetrics()
+        self.log_sink = log
+        self.archive = archive
+        self.replay = replay
+        self._session = None
+        self._session_options = (pool_connections, pool_maxsize, keep_alive, max_retries, backoff_factor)
+        self._session_lock = threading.Lock()
+    
+    @property
+    def session(self):
+        """
+        The pooled HTTP session, created (and requests imported) on first use.
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._create_session(*self._session_options)
+        return self._session
+    
+    def _create_session(self, pool_connections, pool_maxsize, keep_alive,
+                        max_retries, backoff_factor):
+        """
+        Create the pooled HTTP session shared by all scrape methods.
+        
+        Returns:
+            requests.Session with a mounted connection pool
+        """
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            raise_on_status=False,  # Let raise_for_status report the final status
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+        )
+        
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update(self.headers)
+        if not keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+    
+    def log(self, message):
+        """
+        Send a progress message to the log sink, if there is one.
+        """
+        if self.log_sink is not None:
+            self.log_sink(message)
+    
+    def report_error(self, message, error):
+        """
+        Log an error and count it by exception type, for the scraper itself
+        and for code driving it (e.g. crawl workers parsing its pages).
+        
+        Args:
+            message (str): Log line
+            error (Exception): The error, counted under its class name
+        """
+        self.metrics.inc('errors', label=type(error).__name__)
+        self.log(message)
     
-    def fetch_page(self, url):
+    def close(self):
+        """
+        Close all pooled connections and flush the response archive.
+        """
+        if self._session is not None:
+            self._session.close()
+        if self.archive is not None:
+            self.archive.flush()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def fetch_page(self, url, parse_only=None, throttle=True):
         """
         Fetch a webpage with error handling.
         
         Args:
             url (str): URL to fetch
+            parse_only (SoupStrainer): Only parse the matching subtrees
+            throttle (bool): Wait for the rate limiter (False when the
+                caller already has)
             
         Returns:
             BeautifulSoup object or None if error occurs
         """
+        content = self.fetch_raw(url, throttle)
+        if content is None:
+            return None
+        return self._soup(content, parse_only)
+    
+    def _soup(self, content, parse_only=None):
+        """
+        Parse a downloaded page for fetch_page(); None if parsing fails.
+        """
         try:
-            print(f"Fetching: {url}")
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()  # Raise exception for bad status codes
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            print("✅ Page fetched successfully")
+            with self.metrics.time('parse'):
+                soup = BeautifulSoup(content, self.parser, parse_only=parse_only)
+            self.log("✅ Page fetched successfully")
             return soup
             
-        except requests.exceptions.Timeout:
-            print("❌ Error: Request timed out")
-            return None
-        except requests.exceptions.ConnectionError:
-            print("❌ Error: Connection failed. Check your internet.")
-            return None
-        except requests.exceptions.HTTPError as e:
-            print(f"❌ HTTP Error: {e}")
+        except Exception as e:
+            self.report_error(f"❌ Unexpected error: {e}", e)
             return None
+    
+    def fetch_raw(self, url, throttle=True):
+        """
+        Download a webpage body without parsing it, with error handling.
+        
+        Args:
+            url (str): URL to fetch
+            throttle (bool): Wait for the rate limiter
+            
+        Returns:
+            bytes or None if error occurs
+        """
+        try:
+            self.log(f"Fetching: {url}")
+            return self._download(url, throttle)
         except Exception as e:
-            print(f"❌ Unexpected error: {e}")
+            self._fetch_error(e)
             return None
     
-    def scrape_quotes(self):
+    def _fetch_error(self, e):
         """
-        Example: Scrape quotes from quotes.toscrape.com
+        Log and count a failed download.
         """
-        print("\n" + "="*60)
-        print("SCRAPING QUOTES FROM QUOTES.TOSCRAPE.COM")
-        print("="*60 + "\n")
+        if isinstance(e, requests.exceptions.Timeout):
+            self.report_error("❌ Error: Request timed out", e)
+        elif isinstance(e, requests.exceptions.ConnectionError):
+            self.report_error("❌ Error: Connection failed. Check your internet.", e)
+        elif isinstance(e, requests.exceptions.HTTPError):
+            self.report_error(f"❌ HTTP Error: {e}", e)
+        elif isinstance(e, ArchiveMiss):
+            self.report_error(f"❌ Replay: {e}", e)
+        else:
+            self.report_error(f"❌ Unexpected error: {e}", e)
+    
+    def _request(self, url, headers=None, throttle=True, stream=False):
+        """
+        Send a GET through the pooled session, pacing it with the rate
+        limiter and reporting the outcome back to it.
+        
+        With stream=True only the headers are read; the caller reads the
+        body (and counts its bytes) itself.
+        """
+        limiter = self.rate_limiter
+        if limiter is not None and throttle:
+            self.metrics.observe('wait', limiter.acquire(url))
+        
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, headers=headers, timeout=10, stream=stream)
+        except requests.exceptions.RequestException:
+            if limiter is not None:
+                limiter.record(url)
+            raise
+        latency = time.perf_counter() - start
+        
+        # requests stops response.elapsed once the headers are parsed; the
+        # rest of the call is the body download
+        headers_done = min(response.elapsed.total_seconds(), latency)
+        self.metrics.observe('request', headers_done)
+        self.metrics.observe('download', latency - headers_done)
+        self.metrics.inc('responses', label=str(response.status_code))
+        if not stream:
+            self.metrics.inc('bytes_downloaded', len(response.content))
         
+        if limiter is not None:
+            limiter.record(url, latency, response.status_code, response.headers.get('Retry-After'))
+        return response
+    
+    def _polite_delay(self, seconds):
+        """
+        Fixed pause between requests, only used without a rate limiter.
+        """
+        if self.rate_limiter is None and self.replay is None:
+            with self.metrics.time('sleep'):
+                time.sleep(seconds)
+    
+    def _download(self, url, throttle=True):
+        """
+        Download a page body, going through the response cache if enabled.
+        
+        Args:
+            url (str): URL to fetch
+            throttle (bool): Wait for the rate limiter
+            
+        Returns:
+            bytes: The response body
+        """
+        if self.replay is not None:
+            body = self.replay.get(url).body
+            self.metrics.inc('cache', label='replayed')
+            self.metrics.inc('bytes_downloaded', len(body))
+            return body
+        
+        if self.cache is None:
+            response = self._request(url, throttle=throttle)
+            response.raise_for_status()  # Raise exception for bad status codes
+            self._archive(url, response)
+            return response.content
+        
+        entry = self.cache.lookup(url)
+        if entry is not None and self.cache.is_fresh(entry):
+            self.metrics.inc('cache', label='hit')
+            self.log("📦 Served from cache")
+            return self.cache.hit(entry)
+        
+        headers = self.cache.conditional_headers(entry) if entry is not None else {}
+        response = self._request(url, headers, throttle)
+        
+        if response.status_code == 304 and entry is not None:
+            self.metrics.inc('cache', label='revalidated')
+            self.log("📦 Not modified, served from cache")
+            return self.cache.revalidated(entry, response.headers)
+        
+        response.raise_for_status()  # Raise exception for bad status codes
+        self._archive(url, response)
+        self.cache.store(url, response.content, response.headers)
+        return response.content
+    
+    def _archive(self, url, response):
+        """
+        Keep a downloaded response in the archive, if one is configured.
+        """
+        if self.archive is not None:
+            with self.metrics.time('archive'):
+                self.archive.append(url, response.status_code, response.headers, response.content)
+    
+    async def fetch_many(self, urls, concurrency=10, per_host_limit=4, parse_only=None, raw=False):
+        """
+        Fetch several webpages concurrently.
+        
+        Each URL goes through fetch_page on a worker thread, so the same
+        error handling applies per URL. At most `concurrency` requests are
+        in flight overall and at most `per_host_limit` per host. Keep
+        `per_host_limit` at or below pool_maxsize so every worker gets a
+        pooled connection. With a rate limiter, waiting for a host's token
+        happens on the event loop, so a throttled host never holds up
+        requests to other hosts.
+        
+        Args:
+            urls (list): URLs to fetch
+            concurrency (int): Maximum number of requests in flight
+            per_host_limit (int): Maximum requests in flight per host
+            parse_only (SoupStrainer): Only parse the matching subtrees
+            raw (bool): Return the raw bodies instead of parsing them
+            
+        Returns:
+            list: BeautifulSoup objects (or bytes with raw, or None) in the
+            same order as urls
+        """
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        total_limit = asyncio.Semaphore(concurrency)
+        host_limits = {}
+        
+        async def fetch_one(url):
+            host = urlsplit(url).netloc
+            host_limit = host_limits.setdefault(host, asyncio.Semaphore(per_host_limit))
+            # Take the host slot first so a busy host never holds global slots
+            async with host_limit:
+                if self.rate_limiter is not None:
+                    self.metrics.observe('wait', await self.rate_limiter.acquire_async(url))
+                async with total_limit:
+                    if raw:
+                        fetch = partial(self.fetch_raw, url, throttle=False)
+                    else:
+                        fetch = partial(self.fetch_page, url, parse_only, throttle=False)
+                    return await loop.run_in_executor(executor, fetch)
+        
+        try:
+            return await asyncio.gather(*(fetch_one(url) for url in urls))
+        finally:
+            executor.shutdown(wait=False)
+    
+    def _extract(self, schema, label, tree, **context):
+        """
+        Run an extraction schema over one parsed page.
+        
+        Returns:
+            tuple: (records, number of containers found)
+        """
+        start = time.perf_counter()
+        skipped = []
+        
+        def warn(idx, error):
+            skipped.append(idx)
+            self.log(f"⚠️ Warning: Could not extract all data from a {label}: {error}")
+        
+        records = schema.extract_tree(tree, warn, **context)
+        self.metrics.observe('extract', time.perf_counter() - start)
+        self.metrics.inc('records', len(records))
+        return records, len(records) + len(skipped)
+    
+    def _extract_quotes(self, tree, page):
+        """
+        Extract quote records from one page.
+        
+        Args:
+            tree: Parsed quotes page (BeautifulSoup, or lxml from QUOTE_SCHEMA.parse)
+            page (int): Page number stored with each record
+            
+        Returns:
+            list of record dicts, or None if the page has no quotes
+        """
+        scraped_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        records, found = self._extract(self.QUOTE_SCHEMA, 'quote', tree, page=page, scraped_at=scraped_at)
+        
+        if not found:
+            self.log("No more quotes found.")
+            return None
+        
+        self.log(f"✅ Scraped {found} quotes from page {page}")
+        return records
+    
+    def iter_quotes(self, max_pages=3):
+        """
+        Yield quote records page by page as they are scraped.
+        
+        Only one page is held in memory at a time, so this can feed the
+        stream_to_* exporters for crawls of any size.
+        
+        Args:
+            max_pages (int): Number of pages to scrape
+            
+        Yields:
+            dict: One quote record
+        """
         page = 1
-        max_pages = 3  # Limit to 3 pages for demo
         
         while page <= max_pages:
             url = f"{self.base_url}/page/{page}/"
-            soup = self.fetch_page(url)
+            content = self.fetch_raw(url)
+            
+            if content is None:
+                break
             
-            if soup is None:
+            records = self.parse_records('quotes', content, page)
+            if records is None:
                 break
             
-            # Find all quote containers
-            quotes = soup.find_all('div', class_='quote')
+            yield from records
             
-            if not quotes:
-                print("No more quotes found.")
+            page += 1
+            self._polite_delay(1)  # Be polite to the server
+    
+    def scrape_quotes(self, max_pages=3):
+        """
+        Example: Scrape quotes from quotes.toscrape.com
+        
+        Args:
+            max_pages (int): Number of pages to scrape (3 for the demo)
+        """
+        self.log("\n" + "="*60)
+        self.log("SCRAPING QUOTES FROM QUOTES.TOSCRAPE.COM")
+        self.log("="*60 + "\n")
+        
+        self.data.extend(self.iter_quotes(max_pages))
+        
+        self.log(f"\n📊 Total quotes scraped: {len(self.data)}")
+    
+    async def scrape_quotes_async(self, max_pages=3, concurrency=10, per_host_limit=4):
+        """
+        Scrape quotes with all pages fetched concurrently.
+        
+        Pages are processed in order and stop at the first failed or empty
+        page, so self.data ends up with the same records as scrape_quotes.
+        The per-host limit replaces the fixed politeness delay.
+        
+        Args:
+            max_pages (int): Number of pages to scrape
+            concurrency (int): Maximum number of requests in flight
+            per_host_limit (int): Maximum requests in flight per host
+        """
+        self.log("\n" + "="*60)
+        self.log("SCRAPING QUOTES FROM QUOTES.TOSCRAPE.COM (ASYNC)")
+        self.log("="*60 + "\n")
+        
+        urls = [f"{self.base_url}/page/{page}/" for page in range(1, max_pages + 1)]
+        bodies = await self.fetch_many(urls, concurrency, per_host_limit, raw=True)
+        
+        for page, content in enumerate(bodies, 1):
+            if content is None:
                 break
             
-            for quote in quotes:
-                try:
-                    # Extract quote text
-                    text = quote.find('span', class_='text').get_text()
-                    
-                    # Extract author
-                    author = quote.find('small', class_='author').get_text()
-                    
-                    # Extract tags
-                    tags = [tag.get_text() for tag in quote.find_all('a', class_='tag')]
-                    
-                    # Store data
-                    self.data.append({
-                        'quote': text,
-                        'author': author,
-                        'tags': ', '.join(tags),
-                        'page': page,
-                        'scraped_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    })
-                    
-                except AttributeError as e:
-                    print(f"⚠️ Warning: Could not extract all data from a quote: {e}")
-                    continue
-            
-            print(f"✅ Scraped {len(quotes)} quotes from page {page}")
+            records = self.parse_records('quotes', content, page)
+            if records is None:
+                break
+            
+            self.data.extend(records)
+        
+        self.log(f"\n📊 Total quotes scraped: {len(self.data)}")
+    
+    def _extract_books(self, tree):
+        """
+        Extract book records from one catalogue page.
+        
+        Args:
+            tree: Parsed catalogue page (BeautifulSoup, or lxml from BOOK_SCHEMA.parse)
+            
+        Returns:
+            list of record dicts
+        """
+        scraped_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return self._extract(self.BOOK_SCHEMA, 'book', tree, scraped_at=scraped_at)[0]
+    
+    def iter_books(self, max_pages=1):
+        """
+        Yield book records from the catalogue as they are scraped.
+        
+        Args:
+            max_pages (int): Catalogue pages to follow from base_url through
+                the "next" links, None for the whole catalogue
+            
+        Yields:
+            dict: One book record
+        """
+        yield from self.iter_paginated(self.base_url, 'books', max_pages=max_pages)
+    
+    def parse_records(self, kind, content, page=1):
+        """
+        Parse a raw page body and extract its records.
+        
+        Args:
+            kind (str): 'quotes' or 'books'
+            content (bytes): Raw HTML
+            page (int): Page number stored with quote records
+            
+        Returns:
+            list of record dicts, or None if a quotes page has no quotes
+        """
+        if kind == 'quotes':
+            return self._extract_quotes(self._parse_tree(content, self.QUOTE_SCHEMA, self.QUOTE_STRAINER), page)
+        if kind == 'books':
+            return self._extract_books(self._parse_tree(content, self.BOOK_SCHEMA, self.BOOK_STRAINER))
+        raise ValueError(f"Unknown record kind: {kind!r}")
+    
+    def _parse_tree(self, content, schema, parse_only=None):
+        """
+        Parse a raw page into the tree `schema` extracts from: lxml with the
+        lxml parser (no soup needed), otherwise BeautifulSoup.
+        """
+        with self.metrics.time('parse'):
+            if self.parser == 'lxml':
+                return schema.parse(content)
+            return BeautifulSoup(content, self.parser, parse_only=parse_only)
+    
+    def find_next_link(self, content, url):
+        """
+        Find the absolute URL of the pager's "next" link in a raw page.
+        
+        Returns:
+            str or None on the last page
+        """
+        match = self.NEXT_LINK_PATTERN.search(content)
+        if match:
+            href = match.group(1).decode('utf-8', 'replace')
+        else:
+            # Unusual markup: fall back to a parse of just the pager item
+            item = BeautifulSoup(content, self.parser, parse_only=self.NEXT_STRAINER).find('a', href=True)
+            if item is None:
+                return None
+            href = item['href']
+        return urljoin(url, href)
+    
+    def _fetch_page(self, url, delay=None):
+        """
+        Download one listing page for _iter_pages.
+        
+        Returns:
+            (bytes or None, bool): The body, and whether a failed download
+            was a 404, i.e. possibly a page past the end of the listing
+        """
+        if delay is not None:
+            self._polite_delay(delay)
+        try:
+            self.log(f"Fetching: {url}")
+            return self._download(url), False
+        except Exception as e:
+            self._fetch_error(e)
+            response = getattr(e, 'response', None)
+            return None, response is not None and response.status_code == 404
+    
+    def iter_paginated(self, start_url, kind='quotes', url_template=None, max_pages=None, delay=1,
+                       seen=None, tracker=None):
+        """
+        Walk a paginated listing until it ends, prefetching the next page.
+        
+        The next page comes from the site's "next" link, or from
+        `url_template` (e.g. 'http://host/page/{page}/') when given. As soon
+        as page N is downloaded, page N+1 is requested on a background
+        thread while page N is parsed, so the network and the parser are
+        never idle waiting on each other. Only one request is in flight at
+        a time, and the politeness delay runs on the prefetch thread.
+        
+        Args:
+            start_url (str): First page (ignored with url_template)
+            kind (str): 'quotes' or 'books'
+            url_template (str): Page URL pattern with a {page} field
+            max_pages (int): Stop after this many pages, None for no limit
+            delay (float): Pause between requests without a rate limiter
+            seen (set, FingerprintSet or BloomFilter): Seen-URL set used to
+                stop on pager cycles; pages already in it are not fetched again
+            tracker (ChangeTracker): Skip parsing pages whose body has not
+                changed since the last run and record the changes
+            
+        Yields:
+            dict: One record
+        """
+        on_failure = tracker.fetch_failed if tracker is not None else None
+        for page, url, content in self._iter_pages(start_url, url_template, max_pages, delay, seen, on_failure):
+            unchanged = tracker.unchanged_page(url, content) if tracker is not None else None
+            if unchanged is not None:
+                if not unchanged:
+                    break  # Same empty page that ended the last run
+                records = unchanged
+            else:
+                records = self.parse_records(kind, content, page)
+                if records is None:
+                    break
+                if tracker is not None:
+                    tracker.observe(url, records)
+            
+            yield from records
+    
+    def _iter_pages(self, start_url, url_template=None, max_pages=None, delay=1, seen=None,
+                    on_failure=None):
+        """
+        Yield (page number, url, raw body) for each page of a listing,
+        downloading page N+1 while the caller works on page N (see
+        iter_paginated). Stops at the first failed download, which is
+        passed to on_failure(url) unless it is the 404 that ends a
+        url_template listing.
+        """
+        url = url_template.format(page=1) if url_template else start_url
+        prefetcher = ThreadPoolExecutor(max_workers=1)
+        seen = FingerprintSet() if seen is None else seen
+        seen.add(url)
+        page = 1
+        
+        try:
+            future = prefetcher.submit(self._fetch_page, url)
+            while url is not None:
+                content, missing = future.result()
+                if content is None:
+                    if on_failure is not None and not (url_template and page > 1 and missing):
+                        on_failure(url)
+                    break
+                
+                # Start the next download before parsing this page
+                if max_pages is not None and page >= max_pages:
+                    next_url = None
+                elif url_template:
+                    next_url = url_template.format(page=page + 1)
+                else:
+                    next_url = self.find_next_link(content, url)
+                    if next_url is not None:
+                        if next_url in seen:
+                            next_url = None  # Pager loops back
+                        else:
+                            seen.add(next_url)
+                if next_url is not None:
+                    future = prefetcher.submit(self._fetch_page, next_url, delay)
+                
+                yield page, url, content
+                
+                page += 1
+                url = next_url
+        finally:
+            prefetcher.shutdown(wait=False, cancel_futures=True)
+    
+    def scrape_paginated(self, kind='quotes', start_url=None, url_template=None, max_pages=None):
+        """
+        Scrape every page of a listing into self.data without guessing the
+        page count (see iter_paginated).
+        
+        Args:
+            kind (str): 'quotes' or 'books'
+            start_url (str): First page, defaults to base_url
+            url_template (str): Page URL pattern with a {page} field
+            max_pages (int): Stop after this many pages, None for no limit
+        """
+        self.log("\n" + "="*60)
+        self.log(f"SCRAPING ALL {kind.upper()} PAGES")
+        self.log("="*60 + "\n")
+        
+        self.data.extend(self.iter_paginated(start_url or self.base_url, kind, url_template, max_pages))
+        
+        self.log(f"\n📊 Total {kind} scraped: {len(self.data)}")
+    
+    def scrape_incremental(self, tracker, kind='quotes', delta_file='scraped_delta.jsonl',
+                           start_url=None, url_template=None, max_pages=None):
+        """
+        Scrape a whole listing and write only what changed since the last
+        run to a JSON Lines delta file next to the full exports.
+        
+        self.data still receives every record, so the usual full exports
+        work as before. Pages whose body is unchanged are not parsed. Run it
+        over the complete listing: records of pages that were not reached
+        are reported as deleted. If a page fails to download the listing
+        is incomplete, so nothing is written and the previous state is
+        kept for the next run.
+        
+        Args:
+            tracker (ChangeTracker): State from the previous run
+            kind (str): 'quotes' or 'books'
+            delta_file (str): Output file, one {"op", "key", "record"} per line
+            start_url (str): First page, defaults to base_url
+            url_template (str): Page URL pattern with a {page} field
+            max_pages (int): Stop after this many pages, None for no limit
+            
+        Returns:
+            dict: Number of inserts, updates and deletes, or None if a page
+            failed to download
+        """
+        self.log("\n" + "="*60)
+        self.log(f"INCREMENTAL {kind.upper()} SCRAPE")
+        self.log("="*60 + "\n")
+        
+        tracker.begin()
+        self.data.extend(self.iter_paginated(
+            start_url or self.base_url, kind, url_template, max_pages, tracker=tracker
+        ))
+        if tracker.failed:
+            # Records past the failed page were not seen, not deleted
+            tracker.rollback()
+            self.log(f"⚠️ Warning: Could not download {tracker.failed[0]}; listing incomplete, no delta written")
+            return None
+        changes = tracker.finish(commit=False)
+        
+        counts = {ChangeTracker.INSERT: 0, ChangeTracker.UPDATE: 0, ChangeTracker.DELETE: 0}
+        for op, _, _ in changes:
+            counts[op] += 1
+        
+        # Save the new state only once the delta is on disk, so a failed
+        # write reports the same changes again on the next run
+        try:
+            with JsonLinesRecordWriter(delta_file) as writer:
+                for op, key, record in changes:
+                    writer.write({'op': op, 'key': json.loads(key), 'record': record})
+        except IOError as e:
+            tracker.rollback()
+            self.report_error(f"❌ Error saving delta: {e}", e)
+            return counts
+        tracker.commit()
+        self.log(f"✅ Delta saved to {delta_file}")
+        
+        self.log(f"\n📊 {len(self.data)} {kind}: {counts['insert']} new, "
+                 f"{counts['update']} changed, {counts['delete']} removed")
+        return counts
+    
+    def scrape_with_schema(self, schema, start_url=None, max_pages=1):
+        """
+        Scrape any listing with a custom extraction schema, following the
+        pager's "next" links.
+        
+        Fields declared with context='page' or context='url' receive the
+        page number and URL.
+        
+        Args:
+            schema (Schema): Container selector and fields to extract
+            start_url (str): First page, defaults to base_url
+            max_pages (int): Stop after this many pages, None for no limit
+        """
+        url, page = start_url or self.base_url, 0
+        while url and (max_pages is None or page < max_pages):
+            content = self.fetch_raw(url)
+            if content is None:
+                break
             page += 1
-            time.sleep(1)  # Be polite to the server
+            
+            with self.metrics.time('parse'):
+                tree = schema.parse(content)
+            records, _ = self._extract(schema, 'record', tree, page=page, url=url)
+            self.data.extend(records)
+            self.log(f"✅ Scraped {len(records)} records from page {page}")
+            
+            url = self.find_next_link(content, url)
+            if url and (max_pages is None or page < max_pages):
+                self._polite_delay(1)  # Be polite to the server
         
-        print(f"\n📊 Total quotes scraped: {len(self.data)}")
+        self.log(f"\n📊 Total records scraped: {len(self.data)}")
     
-    def scrape_books(self):
+    def iter_stream(self, url, kind='quotes', chunk_size=64 * 1024, max_bytes=None, page=1):
         """
-        Example: Scrape books from books.toscrape.com
+        Stream one (very large) page: read the body in chunks, parse it
+        incrementally and yield each record as soon as its container closes.
+        
+        Only the current chunk and the open container are held in memory,
+        so peak memory stays around one record however big the page is.
+        Streamed pages bypass the response cache and the archive, which
+        would need the whole body; with replay the archived body is fed in
+        chunks.
+        
+        Args:
+            url (str): Page to stream
+            kind (str or Schema): 'quotes', 'books' or a custom schema whose
+                container is a single compound selector (e.g. 'div.quote')
+            chunk_size (int): Bytes read from the socket at a time
+            max_bytes (int): Abort once the body grows past this size,
+                MAX_BODY_BYTES by default
+            page (int): Page number stored with quote records
+            
+        Yields:
+            dict: One record
         """
-        print("\n" + "="*60)
-        print("SCRAPING BOOKS FROM BOOKS.TOSCRAPE.COM")
-        print("="*60 + "\n")
+        schema = kind if isinstance(kind, Schema) else self.STREAM_SCHEMAS.get(kind)
+        if schema is None:
+            raise ValueError(f"Unknown record kind: {kind!r}")
+        max_bytes = self.MAX_BODY_BYTES if max_bytes is None else max_bytes
+        scraped_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
-        soup = self.fetch_page(self.base_url)
+        def warn(idx, error):
+            self.log(f"⚠️ Warning: Could not extract all data from a record: {error}")
         
-        if soup is None:
+        self.log(f"Streaming: {url}")
+        found = 0
+        try:
+            content_type, chunks = self._open_stream(url, chunk_size, max_bytes)
+            try:
+                extractor = None
+                for chunk in chunks:
+                    if extractor is None:
+                        extractor = StreamingExtractor(schema, detect_encoding(chunk, content_type), warn,
+                                                       page=page, url=url, scraped_at=scraped_at)
+                    with self.metrics.time('parse'):
+                        records = extractor.feed(chunk)
+                    self.metrics.inc('records', len(records))
+                    found += len(records)
+                    yield from records
+                if extractor is not None:
+                    records = extractor.close()
+                    self.metrics.inc('records', len(records))
+                    found += len(records)
+                    yield from records
+            finally:
+                chunks.close()
+                
+        except BodyTooLarge as e:
+            self.report_error(f"❌ Page too large, aborted after {found} records: {e}", e)
+            return
+        except requests.exceptions.RequestException as e:
+            self.report_error(f"❌ Error streaming {url}: {e}", e)
+            return
+        except ArchiveMiss as e:
+            self.report_error(f"❌ Replay: {e}", e)
             return
         
-        # Find all book containers
-        books = soup.find_all('article', class_='product_pod')
+        self.log(f"✅ Streamed {found} records from {url}")
+    
+    def _open_stream(self, url, chunk_size, max_bytes):
+        """
+        Start a streamed download.
+        
+        Returns:
+            tuple: (Content-Type header, generator of body chunks that raises
+            BodyTooLarge once more than max_bytes have been read)
+        """
+        if self.replay is not None:
+            response = self.replay.get(url)
+            self.metrics.inc('cache', label='replayed')
+            body = response.body
+            chunks = (body[idx:idx + chunk_size] for idx in range(0, len(body), chunk_size))
+            return response.headers.get('Content-Type'), self._limit_body(url, chunks, max_bytes)
+        
+        response = self._request(url, stream=True)
+        try:
+            response.raise_for_status()
+            length = response.headers.get('Content-Length', '')
+            if length.isdigit() and int(length) > max_bytes:
+                raise BodyTooLarge(f"{url} announces {int(length):,} bytes, limit is {max_bytes:,}")
+        except Exception:
+            response.close()
+            raise
         
-        for book in books:
+        def chunks():
+            body = response.iter_content(chunk_size)
             try:
-                # Extract title
-                title = book.find('h3').find('a')['title']
-                
-                # Extract price
-                price = book.find('p', class_='price_color').get_text()
-                
-                # Extract rating
-                rating_class = book.find('p', class_='star-rating')['class']
-                rating = rating_class[1]  # Second class is the rating
+                while True:
+                    with self.metrics.time('download'):
+                        chunk = next(body, None)
+                    if chunk is None:
+                        return
+                    yield chunk
+            finally:
+                response.close()  # Also drops the connection after an early abort
+        
+        return response.headers.get('Content-Type'), self._limit_body(url, chunks(), max_bytes)
+    
+    def _limit_body(self, url, chunks, max_bytes):
+        """
+        Pass body chunks through, counting them and enforcing max_bytes.
+        """
+        size = 0
+        try:
+            for chunk in chunks:
+                size += len(chunk)
+                self.metrics.inc('bytes_downloaded', len(chunk))
+                if size > max_bytes:
+                    raise BodyTooLarge(f"{url} is larger than the limit of {max_bytes:,} bytes")
+                yield chunk
+        finally:
+            chunks.close()
+    
+    def iter_pipeline(self, urls, kind='quotes', fetch_workers=8, parse_workers=None,
+                      max_pending=None):
+        """
+        Yield records with fetching and parsing running as separate stages.
+        
+        Fetcher threads download raw bytes and hand them to a pool of worker
+        processes that parse and extract records, so parsing is not limited
+        by the GIL. At most `max_pending` pages are in flight across both
+        stages, which bounds memory and applies backpressure to the
+        fetchers. Pages are yielded in URL order and records in document
+        order, and the crawl stops at the first failed or empty page like
+        the sequential methods.
+        
+        Args:
+            urls (iterable): Page URLs in crawl order
+            kind (str): 'quotes' or 'books'
+            fetch_workers (int): Download threads
+            parse_workers (int): Parse processes, defaults to the CPU count
+            max_pending (int): Pages in flight, defaults to twice the workers
+            
+        Yields:
+            dict: One record
+        """
+        parse_workers = parse_workers or os.cpu_count() or 1
+        max_pending = max_pending or 2 * (fetch_workers + parse_workers)
+        
+        from concurrent.futures import ProcessPoolExecutor
+        
+        fetch_pool = ThreadPoolExecutor(max_workers=fetch_workers)
+        # Spawned (not forked) workers, since fetcher threads are already running
+        parse_pool = ProcessPoolExecutor(
+            max_workers=parse_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_parse_worker,
+            initargs=(type(self), self.parser),
+        )
+        
+        def submit(page, url):
+            result = Future()
+            
+            def on_parsed(parsed):
+                if parsed.cancelled():
+                    result.set_result(None)
+                elif parsed.exception() is not None:
+                    error = parsed.exception()
+                    self.report_error(f"❌ Unexpected error: {error}", error)
+                    result.set_result(None)
+                else:
+                    result.set_result(parsed.result())
+            
+            def on_fetched(fetched):
+                content = None if fetched.cancelled() else fetched.result()
+                if content is None:
+                    result.set_result(None)
+                    return
+                try:
+                    parse_pool.submit(_parse_in_worker, kind, content, page).add_done_callback(on_parsed)
+                except RuntimeError:  # Pool already shut down by an early stop
+                    result.set_result(None)
+            
+            fetch_pool.submit(self.fetch_raw, url).add_done_callback(on_fetched)
+            return result
+        
+        pending = deque()
+        urls = iter(enumerate(urls, 1))
+        try:
+            for page, url in urls:
+                pending.append(submit(page, url))
+                if len(pending) >= max_pending:
+                    break
+            
+            done = 0
+            while pending:
+                records = pending.popleft().result()
+                if records is None:
+                    self.log(f"No more {kind} found.")
+                    break
                 
-                # Extract availability
-                availability = book.find('p', class_='instock availability').get_text(strip=True)
+                done += 1
+                self.log(f"✅ Scraped {len(records)} {kind} from page {done}")
+                yield from records
                 
-                # Store data
-                self.data.append({
-                    'title': title,
-                    'price': price,
-                    'rating': rating,
-                    'availability': availability,
-                    'scraped_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                })
+                for page, url in urls:
+                    pending.append(submit(page, url))
+                    break
+        finally:
+            fetch_pool.shutdown(wait=True, cancel_futures=True)
+            parse_pool.shutdown(wait=True, cancel_futures=True)
+    
+    def scrape_pipeline(self, kind='quotes', max_pages=3, fetch_workers=8, parse_workers=None):
+        """
+        Scrape quote pages (or the books catalogue) into self.data using
+        the fetch/parse pipeline of iter_pipeline.
+        
+        Args:
+            kind (str): 'quotes' or 'books'
+            max_pages (int): Number of quote pages to scrape
+            fetch_workers (int): Download threads
+            parse_workers (int): Parse processes, defaults to the CPU count
+        """
+        self.log("\n" + "="*60)
+        self.log(f"SCRAPING {kind.upper()} WITH THE FETCH/PARSE PIPELINE")
+        self.log("="*60 + "\n")
+        
+        if kind == 'quotes':
+            urls = [f"{self.base_url}/page/{page}/" for page in range(1, max_pages + 1)]
+        else:
+            urls = [self.base_url]
+        
+        self.data.extend(self.iter_pipeline(urls, kind, fetch_workers, parse_workers))
+        
+        self.log(f"\n📊 Total {kind} scraped: {len(self.data)}")
+    
+    def scrape_books(self, max_pages=1):
+        """
+        Example: Scrape books from books.toscrape.com
+        
+        Args:
+            max_pages (int): Catalogue pages to follow, None for all of them
+        """
+        self.log("\n" + "="*60)
+        self.log("SCRAPING BOOKS FROM BOOKS.TOSCRAPE.COM")
+        self.log("="*60 + "\n")
+        
+        self.data.extend(self.iter_books(max_pages))
+        
+        self.log(f"✅ Scraped {len(self.data)} books")
+    
+    def _fetch_book_details(self, url):
+        """
+        Fetch one book page and extract its detail fields (runs on the
+        detail worker threads).
+        
+        Returns:
+            dict with BOOK_DETAIL_FIELDS, or None if the page failed
+        """
+        content = self.fetch_raw(url)
+        if content is None:
+            return None
+        
+        tree = self._parse_tree(content, self.BOOK_DETAIL_SCHEMA)
+        with self.metrics.time('extract'):
+            page = self.BOOK_DETAIL_SCHEMA.extract_tree(tree)
+            info = {row['name']: row['value'] for row in self.BOOK_INFO_SCHEMA.extract_tree(tree)}
+        if not page or 'UPC' not in info:
+            raise ValueError(f"{url} is not a book page")
+        
+        stock = self.STOCK_PATTERN.search(info.get('Availability', ''))
+        return {
+            'upc': info['UPC'],
+            'description': page[0]['description'],
+            'stock': int(stock.group(1)) if stock else 0,
+            'category': page[0]['category'],
+        }
+    
+    def iter_books_with_details(self, max_pages=1, concurrency=8, start_url=None):
+        """
+        Yield book records merged with the fields of each book's own page
+        (UPC, description, stock count, category).
+        
+        Listing pages are walked with iter_paginated's prefetching while
+        the detail pages are fetched on `concurrency` worker threads. At
+        most 4 x `concurrency` detail pages are pending at any time, so
+        memory stays bounded on large catalogues. Records come out in
+        catalogue order. A detail page that fails only leaves that book's
+        detail fields as None.
+        
+        Keep `concurrency` at or below pool_maxsize so every worker gets
+        a pooled connection.
+        
+        Args:
+            max_pages (int): Catalogue pages to follow, None for all of them
+            concurrency (int): Detail pages fetched at the same time
+            start_url (str): First catalogue page, defaults to base_url
+            
+        Yields:
+            dict: One book record with the detail fields added
+        """
+        workers = ThreadPoolExecutor(max_workers=concurrency)
+        pending = deque()
+        empty = dict.fromkeys(self.BOOK_DETAIL_FIELDS)
+        
+        def merged(record, future):
+            try:
+                details = future.result()
+            except Exception as e:
+                self.report_error(f"❌ Could not read details of {record['title']!r}: {e}", e)
+                details = None
+            if details is None:
+                self.metrics.inc('detail_failures')
+            return {**record, **(details or empty)}
+        
+        try:
+            for _, url, content in self._iter_pages(start_url or self.base_url, max_pages=max_pages):
+                tree = self._parse_tree(content, self.BOOK_CARD_SCHEMA, self.BOOK_STRAINER)
+                scraped_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                cards, _ = self._extract(self.BOOK_CARD_SCHEMA, 'book', tree, scraped_at=scraped_at)
                 
-            except (AttributeError, KeyError) as e:
-                print(f"⚠️ Warning: Could not extract all data from a book: {e}")
-                continue
+                for record in cards:
+                    detail_url = urljoin(url, record.pop('url'))
+                    pending.append((record, workers.submit(self._fetch_book_details, detail_url)))
+                    while len(pending) >= 4 * concurrency:
+                        yield merged(*pending.popleft())
+                    while pending and pending[0][1].done():
+                        yield merged(*pending.popleft())
+            
+            while pending:
+                yield merged(*pending.popleft())
+        finally:
+            workers.shutdown(wait=False, cancel_futures=True)
+    
+    def scrape_books_with_details(self, max_pages=1, concurrency=8):
+        """
+        Scrape books together with the details from each book's own page
+        (see iter_books_with_details).
+        
+        Args:
+            max_pages (int): Catalogue pages to follow, None for all of them
+            concurrency (int): Detail pages fetched at the same time
+        """
+        self.log("\n" + "="*60)
+        self.log("SCRAPING BOOKS AND BOOK DETAILS FROM BOOKS.TOSCRAPE.COM")
+        self.log("="*60 + "\n")
         
-        print(f"✅ Scraped {len(self.data)} books")
+        self.data.extend(self.iter_books_with_details(max_pages, concurrency))
+        
+        self.log(f"✅ Scraped {len(self.data)} books with details")
     
     def save_to_csv(self, filename='scraped_data.csv'):
         """
         Save scraped data to CSV file.
         """
         if not self.data:
-            print("❌ No data to save!")
+            self.log("❌ No data to save!")
             return
         
         try:
-            with open(filename, 'w', newline='', encoding='utf-8') as file:
+            with self.metrics.time('export_csv'), open(filename, 'w', newline='', encoding='utf-8') as file:
                 writer = csv.DictWriter(file, fieldnames=self.data[0].keys())
                 writer.writeheader()
                 writer.writerows(self.data)
             
-            print(f"✅ Data saved to {filename}")
+            self.log(f"✅ Data saved to {filename}")
         
         except IOError as e:
-            print(f"❌ Error saving CSV: {e}")
+            self.report_error(f"❌ Error saving CSV: {e}", e)
         except Exception as e:
-            print(f"❌ Unexpected error: {e}")
+            self.report_error(f"❌ Unexpected error: {e}", e)
     
     def save_to_json(self, filename='scraped_data.json'):
         """
         Save scraped data to JSON file.
         """
         if not self.data:
-            print("❌ No data to save!")
+            self.log("❌ No data to save!")
             return
         
         try:
-            with open(filename, 'w', encoding='utf-8') as file:
-                json.dump(self.data, file, indent=4, ensure_ascii=False)
+            # Streamed so the record store is never copied into one big list
+            with self.metrics.time('export_json'), JsonRecordWriter(filename, batch_size=1000) as writer:
+                for record in self.data:
+                    writer.write(record)
             
-            print(f"✅ Data saved to {filename}")
+            self.log(f"✅ Data saved to {filename}")
         
         except IOError as e:
-            print(f"❌ Error saving JSON: {e}")
+            self.report_error(f"❌ Error saving JSON: {e}", e)
         except Exception as e:
-            print(f"❌ Unexpected error: {e}")
+            self.report_error(f"❌ Unexpected error: {e}", e)
     
     def save_to_txt(self, filename='scraped_data.txt'):
         """
         Save scraped data to text file.
         """
         if not self.data:
-            print("❌ No data to save!")
+            self.log("❌ No data to save!")
             return
         
         try:
-            with open(filename, 'w', encoding='utf-8') as file:
+            with self.metrics.time('export_txt'), open(filename, 'w', encoding='utf-8') as file:
                 for idx, item in enumerate(self.data, 1):
                     file.write(f"--- Record {idx} ---\n")
                     for key, value in item.items():
                         file.write(f"{key}: {value}\n")
                     file.write("\n")
             
-            print(f"✅ Data saved to {filename}")
+            self.log(f"✅ Data saved to {filename}")
         
         except IOError as e:
-            print(f"❌ Error saving TXT: {e}")
+            self.report_error(f"❌ Error saving TXT: {e}", e)
         except Exception as e:
-            print(f"❌ Unexpected error: {e}")
+            self.report_error(f"❌ Unexpected error: {e}", e)
     
-    def display_data(self, limit=5):
+    def _stream_export(self, writer, records, label):
         """
-        Display scraped data in console.
+        Feed a record stream into an incremental writer.
+        
+        Returns:
+            int: Number of records written
+        """
+        try:
+            with self.metrics.time(f"export_{label.lower()}"), writer:
+                for record in records:
+                    writer.write(record)
+            
+            if writer.count:
+                self.log(f"✅ Streamed {writer.count} records to {writer.filename}")
+            else:
+                self.log("❌ No data to save!")
+            return writer.count
+        
+        except IOError as e:
+            self.report_error(f"❌ Error saving {label}: {e}", e)
+        except Exception as e:
+            self.report_error(f"❌ Unexpected error: {e}", e)
+        return writer.count
+    
+    def stream_to_csv(self, records, filename='scraped_data.csv', batch_size=100):
+        """
+        Write records to CSV as they arrive, flushing every batch_size rows.
+        
+        Args:
+            records (iterable): Records, e.g. from iter_quotes or iter_books
+            filename (str): Output file path
+            batch_size (int): Rows buffered between flushes
+        """
+        return self._stream_export(CsvRecordWriter(filename, batch_size), records, 'CSV')
+    
+    def stream_to_json(self, records, filename='scraped_data.json', batch_size=100, lines=False):
+        """
+        Write records as a streamed JSON array, or as JSON Lines.
+        
+        Args:
+            records (iterable): Records, e.g. from iter_quotes or iter_books
+            filename (str): Output file path
+            batch_size (int): Records buffered between flushes
+            lines (bool): Write one JSON object per line instead of an array
+        """
+        if lines:
+            writer = JsonLinesRecordWriter(filename, batch_size)
+        else:
+            writer = JsonRecordWriter(filename, batch_size)
+        return self._stream_export(writer, records, 'JSON')
+    
+    def stream_to_txt(self, records, filename='scraped_data.txt', batch_size=100):
+        """
+        Write records as numbered text blocks as they arrive.
+        
+        Args:
+            records (iterable): Records, e.g. from iter_quotes or iter_books
+            filename (str): Output file path
+            batch_size (int): Records buffered between flushes
+        """
+        return self._stream_export(TxtRecordWriter(filename, batch_size), records, 'TXT')
+    
+    def stream_to_parquet(self, records, filename='scraped_data.parquet', row_group_size=50000):
+        """
+        Write records to a Parquet file, one row group per batch.
+        
+        Only one row group is held in memory at a time. Needs pyarrow.
+        
+        Args:
+            records (iterable): Records, e.g. from iter_quotes or iter_books
+            filename (str): Output file path
+            row_group_size (int): Rows per row group
+        """
+        return self._stream_export(ParquetRecordWriter(filename, row_group_size), records, 'Parquet')
+    
+    def save_to_parquet(self, filename='scraped_data.parquet', row_group_size=50000):
+        """
+        Save scraped data to a columnar Parquet file. Needs pyarrow.
         """
         if not self.data:
+            self.log("❌ No data to save!")
+            return
+        
+        self.stream_to_parquet(self.data, filename, row_group_size)
+    
+    def export(self, formats=('csv', 'json', 'txt'), basename='scraped_data', records=None,
+               threaded=False, compact_json=False, batch_size=1000):
+        """
+        Save records in several formats with a single pass over the data.
+        
+        Args:
+            formats (iterable): Any of 'csv', 'json', 'jsonl', 'txt', 'parquet',
+                'sqlite'
+            basename (str): Output path without extension
+            records (iterable): Records to save, defaults to self.data
+            threaded (bool): Write each format on its own background thread
+            compact_json (bool): Write JSON without indentation
+            batch_size (int): Records buffered per writer between flushes
+            
+        Returns:
+            int: Number of records written
+        """
+        writers = create_writers(formats, basename, batch_size, compact_json)
+        records = iter(self.data if records is None else records)
+        first = next(records, None)
+        if first is None:
+            self.log("❌ No data to save!")
+            return 0
+        
+        fan_out = FanOutWriter(writers, threaded=threaded, batch_size=batch_size)
+        try:
+            with self.metrics.time('export'), fan_out:
+                fan_out.write(first)
+                batch = list(islice(records, batch_size))
+                while batch:
+                    fan_out.write_many(batch)
+                    batch = list(islice(records, batch_size))
+        except IOError as e:
+            self.report_error(f"❌ Error saving data: {e}", e)
+            return fan_out.count
+        except Exception as e:
+            self.report_error(f"❌ Unexpected error: {e}", e)
+            return fan_out.count
+        
+        for writer in writers:
+            self.log(f"✅ Data saved to {writer.filename}")
+        return fan_out.count
+    
+    def display_data(self, limit=5, **conditions):
+        """
+        Display scraped data in console.
+        
+        Args:
+            limit (int): Number of records to show
+            **conditions: Filters of IndexedRecordStore.find (tag, author,
+                rating, min_price, max_price); needs WebScraper(index=True)
+        """
+        if conditions and not isinstance(self.data, IndexedRecordStore):
+            raise ValueError("Filtering needs an index: create the scraper with index=True")
+        records = self.data.find(limit=limit, **conditions) if conditions else self.data[:limit]
+        if not records:
             print("❌ No data to display!")
             return
         
         print("\n" + "="*60)
-        print(f"DISPLAYING FIRST {min(limit, len(self.data))} RECORDS")
+        print(f"DISPLAYING FIRST {len(records)} RECORDS")
         print("="*60 + "\n")
         
-        for idx, item in enumerate(self.data[:limit], 1):
+        for idx, item in enumerate(records, 1):
             print(f"--- Record {idx} ---")
             for key, value in item.items():
                 print(f"{key}: {value}")
@@ -267,48 +1481,55 @@ def main():
     
     if choice == '1':
         # Scrape Quotes
-        scraper = WebScraper('http://quotes.toscrape.com')
-        scraper.scrape_quotes()
-        
-        # Display sample data
-        scraper.display_data(limit=3)
-        
-        # Save in multiple formats
-        print("\n" + "="*60)
-        print("SAVING DATA")
-        print("="*60 + "\n")
-        scraper.save_to_csv('quotes.csv')
-        scraper.save_to_json('quotes.json')
-        scraper.save_to_txt('quotes.txt')
+        with WebScraper('http://quotes.toscrape.com') as scraper:
+            scraper.scrape_quotes()
+            
+            # Display sample data
+            scraper.display_data(limit=3)
+            
+            # Save in multiple formats
+            print("\n" + "="*60)
+            print("SAVING DATA")
+            print("="*60 + "\n")
+            scraper.export(['csv', 'json', 'txt'], 'quotes')
     
     elif choice == '2':
         # Scrape Books
-        scraper = WebScraper('http://books.toscrape.com')
-        scraper.scrape_books()
-        
-        # Display sample data
-        scraper.display_data(limit=3)
-        
-        # Save in multiple formats
-        print("\n" + "="*60)
-        print("SAVING DATA")
-        print("="*60 + "\n")
-        scraper.save_to_csv('books.csv')
-        scraper.save_to_json('books.json')
-        scraper.save_to_txt('books.txt')
+        with WebScraper('http://books.toscrape.com') as scraper:
+            scraper.scrape_books()
+            
+            # Display sample data
+            scraper.display_data(limit=3)
+            
+            # Save in multiple formats
+            print("\n" + "="*60)
+            print("SAVING DATA")
+            print("="*60 + "\n")
+            scraper.export(['csv', 'json', 'txt'], 'books')
     
     elif choice == '3':
         # Custom URL scraping
         url = input("Enter the URL to scrape: ")
-        scraper = WebScraper(url)
-        
-        print("\n⚠️ Note: You'll need to customize the scraping logic")
-        print("for your specific website structure.")
-        
-        soup = scraper.fetch_page(url)
-        if soup:
-            print("\n✅ Page structure:")
-            print(soup.prettify()[:500] + "...\n")
+        container = input("Repeating element CSS selector (e.g. div.quote), "
+                          "blank to see the page structure: ").strip()
+        with WebScraper(url) as scraper:
+            if container:
+                spec = input("Fields as name=selector[@attribute], comma separated\n"
+                             "(e.g. text=span.text, link=a@href): ")
+                try:
+                    schema = Schema.from_spec(container, spec)
+                except ValueError as e:
+                    print(f"❌ Invalid schema: {e}")
+                    return
+                
+                scraper.scrape_with_schema(schema, url)
+                scraper.display_data(limit=3)
+                scraper.export(['csv', 'json', 'txt'], 'custom')
+            else:
+                soup = scraper.fetch_page(url)
+                if soup:
+                    print("\n✅ Page structure:")
+                    print(soup.prettify()[:500] + "...\n")
     
     else:
         print("❌ Invalid choice!")
@@ -325,36 +1546,204 @@ def main():
 class AdvancedScraper(WebScraper):
     """
     Extended scraper with advanced features.
+    
+    Pass a CrawlFrontier to scrape_quotes or scrape_with_pagination to make
+    the crawl resumable: a restarted run skips the pages that are already
+    done and reloads their records instead of fetching them again.
     """
     
-    def scrape_with_pagination(self, max_pages=5):
+    def __init__(self, *args, retry_policy=None, **kwargs):
+        """
+        Takes the WebScraper arguments plus:
+        
+        Args:
+            retry_policy (RetryPolicy): Backoff, hedging and circuit breaker
+                settings of scrape_with_retries, defaults if None
+        """
+        super().__init__(*args, **kwargs)
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self._hedge_pool = None
+    
+    def close(self):
+        """
+        Close the connections and stop the hedging threads.
+        """
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False)
+        super().close()
+    
+    def scrape_quotes(self, max_pages=3, frontier=None):
+        """
+        Scrape quotes, optionally resuming from a CrawlFrontier checkpoint.
+        
+        Args:
+            max_pages (int): Number of pages to scrape
+            frontier (CrawlFrontier): Persistent progress store
+        """
+        if frontier is None:
+            return super().scrape_quotes(max_pages)
+        
+        self.log("\n" + "="*60)
+        self.log("SCRAPING QUOTES FROM QUOTES.TOSCRAPE.COM (RESUMABLE)")
+        self.log("="*60 + "\n")
+        
+        frontier.add((f"{self.base_url}/page/{page}/", page) for page in range(1, max_pages + 1))
+        self.data.extend(frontier.completed_records())
+        if self.data:
+            self.log(f"♻️ Resumed with {len(self.data)} quotes from earlier runs")
+        
+        try:
+            for url, page in ([] if frontier.is_finished() else frontier.pending()):
+                content = self.fetch_raw(url)
+                
+                if content is None:
+                    break  # Left pending, so the next run retries it
+                
+                records = self.parse_records('quotes', content, page)
+                if records is None:
+                    frontier.mark_end(url)
+                    break
+                
+                self.data.extend(records)
+                frontier.mark_done(url, records)
+                self._polite_delay(1)  # Be polite to the server
+        finally:
+            frontier.checkpoint()
+        
+        self.log(f"\n📊 Total quotes scraped: {len(self.data)}")
+    
+    def scrape_with_pagination(self, max_pages=5, frontier=None):
         """
         Scrape multiple pages with pagination support.
+        
+        Args:
+            max_pages (int): Number of pages to scrape
+            frontier (CrawlFrontier): Optional persistent progress store
         """
-        for page in range(1, max_pages + 1):
-            url = f"{self.base_url}?page={page}"
-            soup = self.fetch_page(url)
-            
-            if soup is None:
-                break
-            
-            # Add your custom scraping logic here
-            print(f"Processing page {page}...")
-            time.sleep(1)  # Respectful delay
+        if frontier is None:
+            pages = [(f"{self.base_url}?page={page}", page) for page in range(1, max_pages + 1)]
+        else:
+            frontier.add((f"{self.base_url}?page={page}", page) for page in range(1, max_pages + 1))
+            pages = frontier.pending()
+        
+        try:
+            for url, page in pages:
+                soup = self.fetch_page(url)
+                
+                if soup is None:
+                    break
+                
+                # Add your custom scraping logic here
+                self.log(f"Processing page {page}...")
+                if frontier is not None:
+                    frontier.mark_done(url)
+                self._polite_delay(1)  # Respectful delay
+        finally:
+            if frontier is not None:
+                frontier.checkpoint()
     
     def scrape_with_retries(self, url, max_retries=3):
         """
         Fetch page with retry mechanism.
+        
+        Follows self.retry_policy: slow requests get a hedged duplicate,
+        timeouts, connection errors, 408/429 and 5xx responses are retried
+        after a jittered backoff, and other errors (e.g. 404) are not. While
+        the host's circuit breaker is open the call fails fast.
+        
+        Returns:
+            BeautifulSoup object or None if every attempt failed
         """
+        breaker = self.retry_policy.breaker
         for attempt in range(max_retries):
-            soup = self.fetch_page(url)
-            if soup is not None:
-                return soup
+            if not breaker.allow(url):
+                error = CircuitOpen(f"{urlsplit(url).netloc} is failing, circuit open")
+                self.report_error(f"🚫 Skipped {url}: {error}", error)
+                return None
+            
+            try:
+                self.log(f"Fetching: {url}")
+                content = self._hedged_download(url)
+            except Exception as e:
+                self._fetch_error(e)
+                if not self._retryable(e):
+                    breaker.record_success(url)  # The host answered; retrying will not help
+                    return None
+                breaker.record_failure(url)
+                if attempt + 1 < max_retries:
+                    self.log(f"Retrying... ({attempt + 1}/{max_retries})")
+                    # Jittered exponential backoff; the rate limiter backs
+                    # off (and honours Retry-After) on its own when there is one
+                    self._polite_delay(self.retry_policy.backoff(attempt))
+                continue
             
-            print(f"Retrying... ({attempt + 1}/{max_retries})")
-            time.sleep(2 ** attempt)  # Exponential backoff
+            breaker.record_success(url)
+            return self._soup(content)
         
         return None
+    
+    @staticmethod
+    def _retryable(error):
+        """
+        Whether a failed download may succeed when tried again.
+        """
+        if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+            return True
+        if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+            status = error.response.status_code
+            return status in (408, 429) or status >= 500
+        return False
+    
+    def _hedged_download(self, url):
+        """
+        Download a page; if it is still running after the host's hedge
+        delay, send a duplicate and take whichever answers first.
+        
+        The losing request is left to finish in the background.
+        """
+        policy = self.retry_policy
+        policy.count_request()
+        delay = policy.hedge_delay(url)
+        if delay is None or self.replay is not None:
+            return self._timed_download(url)
+        
+        primary = self._start_download(url)
+        done, _ = wait([primary], timeout=delay)
+        if done or not policy.take_hedge():
+            return primary.result()
+        
+        self.metrics.inc('hedges')
+        hedge = self._start_download(url)
+        pending, error = {primary, hedge}, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self.metrics.inc('hedge_wins')
+                    return future.result()
+                error = future.exception()
+        raise error
+    
+    def _start_download(self, url):
+        """
+        Run _timed_download on the hedging thread pool.
+        
+        Returns:
+            Future of the page body
+        """
+        if self._hedge_pool is None:
+            self._hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='hedge')
+        return self._hedge_pool.submit(self._timed_download, url)
+    
+    def _timed_download(self, url):
+        """
+        Download a page and add its latency to the host's history.
+        """
+        start = time.perf_counter()
+        body = self._download(url)
+        self.retry_policy.latency.observe(url, time.perf_counter() - start)
+        return body
 
 
 if __name__ == "__main__":